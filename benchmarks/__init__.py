@@ -0,0 +1,17 @@
+"""kronik benchmarks"""
+
+from pathlib import Path
+from typing import Callable
+
+# name -> (setup, repeat). `setup` receives a scratch directory and returns the timed callable
+BENCHMARKS: dict[str, tuple[Callable[[Path], Callable[[], object]], int]] = {}
+
+
+def benchmark(name: str, repeat: int = 10):
+    """Register a benchmark setup function for `benchmarks.suite`."""
+
+    def register(setup: Callable[[Path], Callable[[], object]]):
+        BENCHMARKS[name] = (setup, repeat)
+        return setup
+
+    return register
@@ -0,0 +1,72 @@
+"""
+benchmarks/av.py
+
+Compares serial `extract_audio` against `extract_audio_batch` over N synthetic clips.
+
+Usage: poetry run python -m benchmarks.av [--clips 16] [--duration 10] [--copy]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import ffmpeg
+
+from kronik.utils.av import _probe, extract_audio, extract_audio_batch
+
+
+def make_clips(out_dir: Path, n: int, duration: int) -> list[Path]:
+    """Generate `n` short H.264/AAC clips with a test pattern and a sine tone."""
+    clips = []
+    for i in range(n):
+        clip_fp = out_dir.joinpath(f"clip_{i:03d}.mp4")
+        video = ffmpeg.input(f"testsrc=size=540x960:rate=30:duration={duration}", f="lavfi")
+        audio = ffmpeg.input(f"sine=frequency={220 + i * 10}:duration={duration}", f="lavfi")
+        (
+            ffmpeg.output(
+                video, audio, str(clip_fp), vcodec="libx264", acodec="aac", preset="ultrafast"
+            )
+            .overwrite_output()
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+        clips.append(clip_fp)
+    return clips
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark batched audio extraction")
+    parser.add_argument("--clips", type=int, default=16, help="Number of synthetic clips")
+    parser.add_argument("--duration", type=int, default=10, help="Clip duration in seconds")
+    parser.add_argument("--copy", action="store_true", help="Stream-copy AAC instead of MP3")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clips = make_clips(Path(tmp), args.clips, args.duration)
+
+        start = time.perf_counter()
+        for clip_fp in clips:
+            extract_audio(clip_fp)
+        serial = time.perf_counter() - start
+
+        # Start the batch cold so it pays for its own probes
+        _probe.cache_clear()
+        start = time.perf_counter()
+        results = extract_audio_batch(clips, copy=args.copy)
+        batch = time.perf_counter() - start
+
+    failed = [result for result in results if result.error]
+    probe_time = sum(result.probe_time for result in results)
+    extract_time = sum(result.extract_time for result in results)
+
+    print(f"clips:   {args.clips} x {args.duration}s (copy={args.copy})")
+    print(f"serial:  {serial:.2f}s ({serial / args.clips * 1000:.0f} ms/clip)")
+    print(f"batch:   {batch:.2f}s ({batch / args.clips * 1000:.0f} ms/clip)")
+    print(f"speedup: {serial / batch:.1f}x")
+    print(f"worker time: probe {probe_time:.2f}s, extract {extract_time:.2f}s")
+    if failed:
+        print(f"failed:  {len(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+benchmarks/cases.py
+
+Benchmark cases for `benchmarks.suite`, built on the bundled `tests/data/tiktok-1.mp4`
+and synthetic clips. Imported by the suite after KRONIK_DATA_DIR is set.
+"""
+
+import asyncio
+import shutil
+from pathlib import Path
+
+import ffmpeg
+import numpy as np
+
+from benchmarks import benchmark
+from benchmarks.av import make_clips
+from benchmarks.serialization import make_info
+from kronik import PROJECT_ROOT
+from kronik.brain.prescreen import is_loading
+from kronik.brain.reuse import AnalysisIndex
+from kronik.brain.tiktok import _analyze_tiktok_generation_config
+from kronik.control import control
+from kronik.device.commands import screenshot, start_screenrecord, stop_screenrecord
+from kronik.device.replay import ReplayDriver, ReplaySession
+from kronik.device.screenshots import ScreenshotStore
+from kronik.llm.client import set_client
+from kronik.llm.fake import DEFAULT_ANALYSES, FakeGenAIClient
+from kronik.models import TikTokStats, dump_analyses, load_analyses
+from kronik.session import (
+    Session,
+    get_session_dir,
+    list_sessions,
+    save_session_metadata,
+)
+from kronik.utils.av import _probe, extract_audio, extract_audio_batch, sample_frames
+
+TIKTOK_FP = PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")
+
+
+@benchmark("extract_audio_tiktok", repeat=5)
+def extract_audio_tiktok(work_dir: Path):
+    video_fp = work_dir.joinpath(TIKTOK_FP.name)
+    shutil.copy(TIKTOK_FP, video_fp)
+    return lambda: extract_audio(video_fp)
+
+
+@benchmark("extract_audio_batch_synthetic", repeat=3)
+def extract_audio_batch_synthetic(work_dir: Path):
+    clips = make_clips(work_dir, n=4, duration=5)
+
+    def run():
+        _probe.cache_clear()
+        extract_audio_batch(clips)
+
+    return run
+
+
+@benchmark("prescreen_frames_tiktok", repeat=10)
+def prescreen_frames_tiktok(work_dir: Path):
+    # Frame sampling and the blank-screen check; the CLIP model is not part of the baseline
+    return lambda: is_loading(sample_frames(TIKTOK_FP))
+
+
+@benchmark("base64_decode_save", repeat=10)
+def base64_decode_save(work_dir: Path):
+    driver = ReplayDriver(ReplaySession(recordings=[TIKTOK_FP]))
+    session = Session()
+
+    def run():
+        recording_fp = start_screenrecord(driver, session)
+        stop_screenrecord(driver, session, recording_fp)
+
+    get_session_dir(session.id).mkdir(parents=True, exist_ok=True)
+    return run
+
+
+def screenshot_driver(work_dir: Path) -> ReplayDriver:
+    """Replay driver serving a frame of the bundled clip as a 1080x2400 PNG screenshot."""
+    png_fp = work_dir.joinpath("screen.png")
+    (
+        ffmpeg.input(str(TIKTOK_FP), ss=1)
+        .output(str(png_fp), vframes=1, vf="scale=1080:2400")
+        .run(quiet=True)
+    )
+    return ReplayDriver(ReplaySession(recordings=[TIKTOK_FP], screenshots=[png_fp]))
+
+
+@benchmark("screenshot_png_file", repeat=20)
+def screenshot_png_file(work_dir: Path):
+    driver = screenshot_driver(work_dir)
+    session = Session()
+    get_session_dir(session.id).mkdir(parents=True, exist_ok=True)
+    return lambda: screenshot(driver, session)
+
+
+@benchmark("screenshot_webp_capture", repeat=20)
+def screenshot_webp_capture(work_dir: Path):
+    # Only what the control loop waits for. The worker is idle between videos, so no save is
+    # queued: the first screenshot is saved up front and every later one is skipped.
+    driver = screenshot_driver(work_dir)
+    store = ScreenshotStore(Session(), every=10**9)
+    store.capture(driver).saved.result()
+    return lambda: store.capture(driver)
+
+
+@benchmark("screenshot_webp_store", repeat=20)
+def screenshot_webp_store(work_dir: Path):
+    # Includes the encode and write done in the worker thread
+    driver = screenshot_driver(work_dir)
+    store = ScreenshotStore(Session())
+    return lambda: store.capture(driver).saved.result()
+
+
+@benchmark("analysis_config_build", repeat=50)
+def analysis_config_build(work_dir: Path):
+    return _analyze_tiktok_generation_config
+
+
+@benchmark("analysis_json_persist", repeat=20)
+def analysis_json_persist(work_dir: Path):
+    analyses = DEFAULT_ANALYSES * 50
+
+    def run():
+        for i, analysis in enumerate(analyses):
+            work_dir.joinpath(f"{i}.json").write_text(analysis.model_dump_json())
+
+    return run
+
+
+@benchmark("analyses_json_roundtrip_100k", repeat=3)
+def analyses_json_roundtrip_100k(work_dir: Path):
+    analyses = DEFAULT_ANALYSES * 50_000
+    return lambda: load_analyses(dump_analyses(analyses))
+
+
+@benchmark("tiktok_stats_from_info_10k", repeat=5)
+def tiktok_stats_from_info_10k(work_dir: Path):
+    info = make_info()
+    return lambda: [TikTokStats.from_info(info) for _ in range(10_000)]
+
+
+@benchmark("reuse_index_search_10k", repeat=100)
+def reuse_index_search_10k(work_dir: Path):
+    rng = np.random.default_rng(0)
+    index = AnalysisIndex(dim=768)
+    for vector in rng.normal(size=(10_000, 768)):
+        index.add(vector, DEFAULT_ANALYSES[0])
+    query = rng.normal(size=768)
+    return lambda: index.search(query)
+
+
+@benchmark("list_sessions_500", repeat=10)
+def list_sessions_500(work_dir: Path):
+    for i in range(500):
+        session = Session()
+        session.id = f"session_bench_{i:04d}"
+        save_session_metadata(session)
+    return list_sessions
+
+
+@benchmark("control_loop_replay_10", repeat=3)
+def control_loop_replay_10(work_dir: Path):
+    driver = ReplayDriver(ReplaySession(recordings=[TIKTOK_FP]), seed=0)
+    set_client(FakeGenAIClient(seed=0))
+
+    def run():
+        asyncio.run(control(driver, Session(), record_seconds=0, scroll_pause=0, max_iterations=10))
+
+    return run
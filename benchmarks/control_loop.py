@@ -0,0 +1,105 @@
+"""
+benchmarks/control_loop.py
+
+Load-tests the full `control()` loop offline with a replayed device and a fake LLM.
+
+Usage: poetry run python -m benchmarks.control_loop [--iterations 50] [--llm-latency 0.5]
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    # Imported here so KRONIK_DATA_DIR is set before kronik resolves DATA_DIR
+    from kronik import PROJECT_ROOT
+    from kronik.control import control
+    from kronik.device.replay import ReplayDriver, ReplayLatency, ReplaySession
+    from kronik.llm.client import set_client
+    from kronik.llm.fake import FakeGenAIClient
+    from kronik.session import Session
+
+    replay_dir = (
+        Path(args.replay_dir) if args.replay_dir else PROJECT_ROOT.joinpath("tests", "data")
+    )
+    driver = ReplayDriver(
+        ReplaySession.from_dir(replay_dir),
+        latency=ReplayLatency(
+            command=args.appium_latency,
+            screenshot=args.appium_latency,
+            stop_recording=args.appium_latency,
+            gesture=args.appium_latency,
+            find_element=args.appium_latency,
+        ),
+        seed=0,
+    )
+    llm = FakeGenAIClient(
+        latency=args.llm_latency, jitter=args.llm_latency / 2, error_rate=args.error_rate, seed=0
+    )
+    set_client(llm)
+
+    # Pay the one-off google.genai import before timing steady-state iterations
+    import google.genai.types  # noqa: F401
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    await control(
+        driver,
+        Session(),
+        record_seconds=args.record_seconds,
+        scroll_pause=0,
+        max_iterations=args.iterations,
+    )
+    elapsed = time.perf_counter() - start
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stops = [start] + driver.recording_stops
+    iteration_times = [b - a for a, b in zip(stops, stops[1:])]
+    return {
+        "iterations": args.iterations,
+        "elapsed_s": elapsed,
+        "videos_per_min": args.iterations / elapsed * 60,
+        "iteration_p50_ms": percentile(iteration_times, 50) * 1000,
+        "iteration_p95_ms": percentile(iteration_times, 95) * 1000,
+        "iteration_p99_ms": percentile(iteration_times, 99) * 1000,
+        "iteration_mean_ms": statistics.fmean(iteration_times) * 1000,
+        "llm_calls": llm.calls,
+        "llm_errors": llm.errors,
+        "peak_traced_mb": peak_traced / 1e6,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the control loop offline")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--record-seconds", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--appium-latency", type=float, default=0.0)
+    parser.add_argument("--replay-dir", help="Recorded session directory (default: tests/data)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ["KRONIK_DATA_DIR"] = data_dir
+        results = asyncio.run(run(args))
+
+    for key, value in results.items():
+        print(f"{key:<20} {value:.2f}" if isinstance(value, float) else f"{key:<20} {value}")
+
+
+if __name__ == "__main__":
+    main()
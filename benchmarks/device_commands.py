@@ -0,0 +1,91 @@
+"""
+benchmarks/device_commands.py
+
+Compares the per-command overhead of the ways kronik talks to a device:
+
+- `adb shell <command>`, a new adb process per command
+- the persistent `AdbShell`
+- an Appium round trip and an Appium swipe (only with --appium)
+
+Without --serial the fake adb tools are used, which measures the host-side overhead only.
+
+Usage: poetry run python -m benchmarks.device_commands [--serial emulator-5554] [--appium]
+                                                       [--iterations 200]
+"""
+
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from kronik.device.fake import write_fake_tools
+from kronik.device.shell import AdbShell
+
+
+def measure(fn: Callable[[], object], iterations: int) -> list[float]:
+    """Milliseconds per call, after one warm-up call."""
+    fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{name:34} mean {statistics.mean(timings):8.2f} ms"
+        f"   p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark device command latency")
+    parser.add_argument("--serial", help="Device to use. Uses the fake adb tools if not given.")
+    parser.add_argument("--appium", action="store_true", help="Also time the Appium path")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per command")
+    args = parser.parse_args()
+    n = args.iterations
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.serial:
+            adb, target = "adb", ["-s", args.serial]
+        else:
+            tools = write_fake_tools(Path(tmp))
+            tools.attach()
+            adb, target = tools.adb, []
+
+        def spawn(command: str) -> Callable[[], object]:
+            return lambda: subprocess.run([adb, *target, "shell", command], capture_output=True)
+
+        report("adb shell true (spawn)", measure(spawn("true"), n))
+        report("adb shell getprop (spawn)", measure(spawn("getprop sys.boot_completed"), n))
+
+        with AdbShell(args.serial, adb) as shell:
+            report("AdbShell true", measure(lambda: shell.run("true"), n))
+            report("AdbShell getprop", measure(lambda: shell.getprop("sys.boot_completed"), n))
+            if args.serial:
+                width, height = shell.window_size()
+                start, end = (width // 2, int(height * 0.75)), (width // 2, int(height * 0.25))
+                report("AdbShell swipe", measure(lambda: shell.swipe(start, end), n // 10))
+
+        if args.appium:
+            from kronik.device.actions import scroll_up
+            from kronik.device.config import appium_driver, appium_options
+
+            driver = appium_driver(options=appium_options(udid=args.serial))
+            try:
+                report("Appium get_window_size", measure(driver.get_window_size, n))
+                report("Appium swipe (W3C actions)", measure(lambda: scroll_up(driver), n // 10))
+            finally:
+                driver.quit()
+
+
+if __name__ == "__main__":
+    main()
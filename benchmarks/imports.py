@@ -0,0 +1,69 @@
+"""
+benchmarks/imports.py
+
+Measures cold import time of kronik modules with `python -X importtime` and checks them
+against a budget. Exits non-zero if any module is over budget.
+
+Usage: poetry run python -m benchmarks.imports [--repeat 3]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from kronik import PROJECT_ROOT
+
+# Cumulative import time budgets in milliseconds
+BUDGETS_MS = {
+    "kronik": 50,
+    "kronik.session": 60,
+    "kronik.models": 250,
+    "kronik.llm.client": 60,
+    "kronik.store.client": 60,
+    "kronik.utils": 60,
+    "kronik.utils.av": 150,
+    "kronik.utils.tiktok_downloader": 350,
+    "kronik.brain.tiktok": 350,
+}
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of `module` in a fresh interpreter, in milliseconds."""
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        if name == module:
+            return int(cumulative) / 1000
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark kronik import times")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module (best is kept)")
+    args = parser.parse_args()
+
+    over_budget = []
+    for module, budget in BUDGETS_MS.items():
+        best = min(import_time_ms(module) for _ in range(args.repeat))
+        status = "ok" if best <= budget else "OVER"
+        print(f"{module:<35} {best:>8.1f} ms  (budget {budget} ms)  {status}")
+        if best > budget:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
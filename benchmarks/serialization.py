@@ -0,0 +1,107 @@
+"""
+benchmarks/serialization.py
+
+Compares the ways kronik serializes `Analysis` and builds `TikTokStats` over many records.
+
+Usage: poetry run python -m benchmarks.serialization [--records 100000]
+"""
+
+import argparse
+import json
+import time
+
+from kronik.llm.fake import DEFAULT_ANALYSES
+from kronik.models import Analysis, Category, TikTokStats, dump_analyses, load_analyses
+
+
+def make_info(i: int = 0) -> dict:
+    """A yt-dlp info dict shaped like the TikTok extractor output."""
+    return {
+        "title": f"Video {i}",
+        "channel": "tiktok",
+        "channel_id": "107955",
+        "channel_url": "https://www.tiktok.com/@tiktok",
+        "webpage_url": f"https://www.tiktok.com/@tiktok/video/{6635480525911887110 + i}",
+        "thumbnails": [
+            {"id": "dynamicCover", "url": f"https://p16-sign.tiktokcdn.com/{i}/dynamic.image"},
+            {"id": "originCover", "url": f"https://p16-sign.tiktokcdn.com/{i}/origin.image"},
+            {"id": "cover", "url": f"https://p16-sign.tiktokcdn.com/{i}/cover.image"},
+        ],
+        "timestamp": 1544756837 + i,
+        "view_count": 1_000_000 + i,
+        "like_count": 50_000,
+        "repost_count": 1_000,
+        "comment_count": 2_000,
+        "duration": 15,
+        "track": "original sound",
+    }
+
+
+def _legacy_dumps(analysis: Analysis) -> str:
+    # The hand-written encoder previously used by the control loop
+    return json.dumps(
+        {
+            "transcript": analysis.transcript,
+            "analysis": analysis.analysis,
+            "tags": analysis.tags,
+            "category": analysis.category.value,
+            "rating": analysis.rating,
+            "like": analysis.like,
+        },
+        indent=2,
+    )
+
+
+def _legacy_thumbnail(info: dict) -> str | None:
+    # The previous three-pass thumbnail selection
+    for priority in ["cover", "originCover", "dynamicCover"]:
+        thumbnail_url = next(
+            (t.get("url") for t in info.get("thumbnails", []) if t.get("id") == priority), None
+        )
+        if thumbnail_url:
+            return thumbnail_url
+    return None
+
+
+def _construct(data: bytes) -> list[Analysis]:
+    # Skipping validation for trusted input still needs a Python-side parse and enum lookup
+    return [
+        Analysis.model_construct(**{**d, "category": Category(d["category"])})
+        for d in json.loads(data)
+    ]
+
+
+def _time(label: str, fn, records: int) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:>9.1f} ms  {records / elapsed:>12,.0f} records/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Analysis/TikTokStats serialization")
+    parser.add_argument("--records", type=int, default=100_000, help="Number of records")
+    args = parser.parse_args()
+    n = args.records
+
+    analyses = (DEFAULT_ANALYSES * (n // len(DEFAULT_ANALYSES) + 1))[:n]
+    infos = [make_info(i) for i in range(n)]
+    data = dump_analyses(analyses)
+
+    print(f"Analysis serialization ({n:,} records)")
+    _time("json.dumps encoder, indent=2", lambda: [_legacy_dumps(a) for a in analyses], n)
+    _time("model_dump_json per record", lambda: [a.model_dump_json() for a in analyses], n)
+    _time("TypeAdapter.dump_json batch", lambda: dump_analyses(analyses), n)
+
+    print(f"\nAnalysis parsing ({n:,} records)")
+    _time("json.loads + model_validate", lambda: [Analysis(**d) for d in json.loads(data)], n)
+    _time("json.loads + model_construct", lambda: _construct(data), n)
+    _time("TypeAdapter.validate_json", lambda: load_analyses(data), n)
+
+    print(f"\nTikTokStats.from_info ({n:,} records)")
+    _time("three-pass thumbnail selection", lambda: [_legacy_thumbnail(i) for i in infos], n)
+    _time("from_info", lambda: [TikTokStats.from_info(i) for i in infos], n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+benchmarks/startup.py
+
+Times device startup against the fake emulator, adb and Appium tools:
+
+- the previous sequential sleep-and-poll startup
+- time until a run holds a driver from the device pool, which boots the emulator while Appium
+  starts: after a cold boot, after a snapshot boot, and from an already warm pool
+
+Usage: poetry run python -m benchmarks.startup [--attach 1] [--boot 4] [--appium 3]
+"""
+
+import argparse
+import asyncio
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from kronik.device.fake import FakeTools, write_fake_tools
+from kronik.device.pool import DevicePool
+from kronik.device.replay import ReplayDriver, ReplaySession
+
+# Nothing listens on the discard port, so only Appium's log signals readiness
+UNREACHABLE = "http://127.0.0.1:9"
+
+
+def legacy_start(tools: FakeTools, initial_wait: float = 5, poll: float = 1) -> float:
+    """The previous startup: each tool in turn, a fixed wait, then one probe per `poll`."""
+    start = time.perf_counter()
+
+    emulator = subprocess.Popen([tools.emulator], stdout=subprocess.DEVNULL)
+    time.sleep(initial_wait)
+    while (
+        subprocess.run(
+            [tools.adb, "shell", "getprop", "sys.boot_completed"], capture_output=True
+        ).stdout.strip()
+        != b"1"
+    ):
+        time.sleep(poll)
+
+    appium = subprocess.Popen([tools.appium, "--port", "4723"], stdout=subprocess.PIPE)
+    time.sleep(initial_wait)
+    # The fake has no HTTP server, so a marker file stands in for the status probe
+    while not tools.state.joinpath("appium").exists():
+        time.sleep(poll)
+    elapsed = time.perf_counter() - start
+
+    for process in (appium, emulator):
+        process.terminate()
+        process.wait()
+    return elapsed
+
+
+async def time_to_driver(tools: FakeTools) -> dict[str, float]:
+    """Seconds until a lease is handed out, for each state the pool can be in."""
+    recording = Path(__file__).parents[1].joinpath("tests", "data", "tiktok-1.mp4")
+
+    def pool() -> DevicePool:
+        return DevicePool(
+            appium_url=UNREACHABLE,
+            driver_factory=lambda slot: ReplayDriver(ReplaySession(recordings=[recording])),
+            emulator_path=tools.emulator,
+            adb_path=tools.adb,
+            appium_path=tools.appium,
+        )
+
+    timings = {}
+    for name in ("cold boot", "snapshot boot"):
+        tools.reset()
+        start = time.perf_counter()
+        async with pool() as devices:
+            async with devices.lease():
+                timings[name] = time.perf_counter() - start
+            # A later run of a long-lived runner leases the already warm device
+            start = time.perf_counter()
+            async with devices.lease():
+                timings["warm pool"] = time.perf_counter() - start
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark emulator and Appium startup")
+    parser.add_argument("--attach", type=float, default=1, help="Seconds until adb sees the device")
+    parser.add_argument("--boot", type=float, default=4, help="Seconds from attach until booted")
+    parser.add_argument("--appium", type=float, default=3, help="Seconds until Appium listens")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tools = write_fake_tools(Path(tmp), args.attach, args.boot, args.appium)
+        # Let the legacy loop see when Appium would answer its status probe
+        script = Path(tools.appium)
+        script.write_text(
+            script.read_text().replace("exec sleep", f'touch "{tools.state}/appium"\nexec sleep')
+        )
+
+        legacy = legacy_start(tools)
+        pool = asyncio.run(time_to_driver(tools))
+
+    print(f"sleep-polling, sequential:    {legacy:6.2f}s")
+    for name in ("cold boot", "snapshot boot", "warm pool"):
+        print(f"time to driver, {name + ':':14}{pool[name]:6.2f}s")
+    print(f"saved on a cold boot:         {legacy - pool['cold boot']:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
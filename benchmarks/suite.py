@@ -0,0 +1,117 @@
+"""
+benchmarks/suite.py
+
+Runs the kronik benchmark suite, writes machine-readable results and compares them
+against stored baselines. Exits non-zero if any benchmark regressed beyond the threshold.
+
+Usage:
+    poetry run python -m benchmarks.suite [--only NAME ...] [--threshold 0.25]
+    poetry run python -m benchmarks.suite --update-baselines
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from importlib import import_module
+from pathlib import Path
+
+from benchmarks import BENCHMARKS
+
+BENCHMARKS_DIR = Path(__file__).parent
+BASELINES_FP = BENCHMARKS_DIR.joinpath("baselines.json")
+RESULTS_FP = BENCHMARKS_DIR.parent.joinpath("bench_output.json")
+
+
+@dataclass
+class Result:
+    name: str
+    repeat: int
+    min_ms: float
+    median_ms: float
+    max_ms: float
+
+
+def run_benchmark(name: str, scratch_dir: Path) -> Result:
+    """Set up a benchmark, warm it up once and time `repeat` runs."""
+    setup, repeat = BENCHMARKS[name]
+    work_dir = scratch_dir.joinpath(name)
+    work_dir.mkdir(parents=True)
+
+    fn = setup(work_dir)
+    fn()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return Result(name, repeat, min(times), statistics.median(times), max(times))
+
+
+def compare(results: list[Result], baselines: dict, threshold: float) -> list[str]:
+    """Names of benchmarks whose median is more than `threshold` slower than the baseline."""
+    regressions = []
+    for result in results:
+        baseline = baselines.get(result.name)
+        if baseline and result.median_ms > baseline["median_ms"] * (1 + threshold):
+            regressions.append(result.name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the kronik benchmark suite")
+    parser.add_argument("--only", nargs="*", help="Run only these benchmarks")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown ratio")
+    parser.add_argument("--update-baselines", action="store_true", help="Store results as baseline")
+    parser.add_argument("--output", type=Path, default=RESULTS_FP, help="Results JSON path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch_dir = Path(scratch)
+
+        # Keep session output out of ./data, then register the benchmark cases
+        os.environ["KRONIK_DATA_DIR"] = str(scratch_dir.joinpath("data"))
+        import_module("benchmarks.cases")
+
+        names = args.only or list(BENCHMARKS)
+        results = [run_benchmark(name, scratch_dir) for name in names]
+
+    baselines = json.loads(BASELINES_FP.read_text()) if BASELINES_FP.exists() else {}
+    regressions = compare(results, baselines, args.threshold)
+
+    print(f"{'benchmark':<32} {'median':>10} {'baseline':>10} {'change':>8}")
+    for result in results:
+        baseline = baselines.get(result.name, {}).get("median_ms")
+        change = f"{result.median_ms / baseline - 1:+.0%}" if baseline else "new"
+        baseline = f"{baseline:.2f}" if baseline else "-"
+        print(f"{result.name:<32} {result.median_ms:>10.2f} {baseline:>10} {change:>8}")
+
+    args.output.write_text(
+        json.dumps(
+            {
+                "machine": platform.platform(),
+                "python": platform.python_version(),
+                "results": [asdict(result) for result in results],
+                "regressions": regressions,
+            },
+            indent=2,
+        )
+    )
+
+    if args.update_baselines:
+        baselines.update({result.name: asdict(result) for result in results})
+        BASELINES_FP.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"Updated baselines in {BASELINES_FP}")
+    elif regressions:
+        print(f"Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,14 @@
 """kronik"""
 
+import os
 from pathlib import Path
 
 from dotenv import load_dotenv
 
 from kronik.logger import app_logger as logger
+from kronik.logger import configure_logging
 
 PROJECT_ROOT = Path(__file__).parents[1]
-DATA_DIR = PROJECT_ROOT.joinpath("data")
 
 # Load environment variables
 env_loaded = load_dotenv(PROJECT_ROOT.joinpath(".env"))
@@ -15,3 +16,8 @@ if not env_loaded:
     logger.error("No .env file found to load environment variables")
 else:
     logger.info("Loaded environment variables from .env file")
+
+DATA_DIR = Path(os.environ.get("KRONIK_DATA_DIR") or PROJECT_ROOT.joinpath("data"))
+
+# Apply log levels and outputs now that the environment is loaded
+configure_logging(DATA_DIR.joinpath("logs"))
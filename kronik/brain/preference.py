@@ -0,0 +1,332 @@
+"""
+kronik/brain/preference.py
+
+A local like/skip model that decides confident clips without calling the LLM.
+
+Clips are described by cheap features: caption words, author, audio track and bands of a
+perceptual hash of the screen, so near-identical frames share features. The features are
+hashed into a fixed-size vector and fed to an online logistic regression trained on every
+clip the LLM labels. Only clips the model is unsure about are sent to `analyze_tiktok`.
+
+A confident score alone is not enough to skip the LLM: with a skewed like rate the bias
+weight makes every clip look confident. The model also counts how often each feature slot was
+seen and liked, and only decides when one of the clip's features has been seen often enough
+and is liked clearly more or less often than clips overall.
+
+Usage:
+    python -m kronik.brain.preference evaluate
+"""
+
+import argparse
+import io
+import math
+import random
+import re
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+
+from kronik import DATA_DIR
+from kronik.logger import setup_logger
+
+logger = setup_logger("kronik.preference")
+
+PREFERENCE_FP = DATA_DIR.joinpath("models", "preference.npz")
+
+_WORD = re.compile(r"#?\w+")
+
+
+@dataclass
+class ClipFeatures:
+    """Cheap, pre-LLM signals about a clip."""
+
+    caption: str | None = None
+    author: str | None = None
+    track: str | None = None
+    phash: int | None = None
+
+
+def author_from_link(link: str | None) -> str | None:
+    """The `@author` segment of a TikTok video link, if present."""
+    if not link:
+        return None
+    for part in urlparse(link).path.split("/"):
+        if part.startswith("@") and len(part) > 1:
+            return part[1:].lower()
+    return None
+
+
+def dhash(image: bytes | Path, size: int = 8) -> int:
+    """64-bit difference hash of an image. Similar frames differ in few bits."""
+    from PIL import Image
+
+    source = io.BytesIO(image) if isinstance(image, bytes) else image
+    with Image.open(source) as img:
+        pixels = np.asarray(img.convert("L").resize((size + 1, size)), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _sigmoid(score: float) -> float:
+    return 1.0 / (1.0 + math.exp(-max(min(score, 30.0), -30.0)))
+
+
+def feature_names(features: ClipFeatures) -> list[str]:
+    """Named binary features of a clip."""
+    names = ["bias"]
+    if features.caption:
+        names.extend(f"w:{word}" for word in set(_WORD.findall(features.caption.lower())))
+    if features.author:
+        names.append(f"a:{features.author.lower()}")
+    if features.track:
+        names.append(f"t:{features.track.lower()}")
+    if features.phash is not None:
+        # One feature per byte, so hashes a few bits apart still share most of them
+        names.extend(f"p{i}:{(features.phash >> (8 * i)) & 0xFF}" for i in range(8))
+    return names
+
+
+@dataclass
+class PreferenceStats:
+    """
+    Running evaluation of the model.
+
+    Every clip the LLM labels is first scored by the model, so precision and recall of the
+    `like` class are measured on confident predictions the model would have acted on.
+    """
+
+    clips: int = 0
+    llm_calls: int = 0
+    llm_calls_saved: int = 0
+    true_positives: int = 0
+    false_positives: int = 0
+    false_negatives: int = 0
+    true_negatives: int = 0
+
+    def record(self, predicted: bool, actual: bool) -> None:
+        if predicted and actual:
+            self.true_positives += 1
+        elif predicted:
+            self.false_positives += 1
+        elif actual:
+            self.false_negatives += 1
+        else:
+            self.true_negatives += 1
+
+    def report(self) -> dict:
+        """Precision, recall and LLM calls saved as a plain dict."""
+        tp, fp, fn = self.true_positives, self.false_positives, self.false_negatives
+        evaluated = tp + fp + fn + self.true_negatives
+        return {
+            "clips": self.clips,
+            "llm_calls": self.llm_calls,
+            "llm_calls_saved": self.llm_calls_saved,
+            "evaluated": evaluated,
+            "accuracy": (tp + self.true_negatives) / evaluated if evaluated else None,
+            "precision": tp / (tp + fp) if tp + fp else None,
+            "recall": tp / (tp + fn) if tp + fn else None,
+        }
+
+
+@dataclass
+class PreferenceModel:
+    """
+    Online logistic regression over hashed clip features.
+
+    Args:
+        dim: Number of hashed feature slots
+        learning_rate: Base AdaGrad learning rate
+        threshold: Minimum probability of the predicted class to skip the LLM
+        min_examples: Labelled clips needed before the model makes any decision
+        explore_rate: Share of confident clips still sent to the LLM to keep measuring accuracy
+        min_support: Labelled clips a feature needs before it can back a decision
+        min_lift: Log-odds a feature's like rate must differ from the overall rate by
+        prior: Pseudo-clips at the overall rate that smooth each feature's like rate
+        seed: Seed for exploration
+    """
+
+    dim: int = 1 << 18
+    learning_rate: float = 1.0
+    threshold: float = 0.9
+    min_examples: int = 200
+    explore_rate: float = 0.1
+    min_support: int = 10
+    min_lift: float = 1.0
+    prior: float = 20.0
+    seed: int | None = None
+    examples: int = 0
+    stats: PreferenceStats = field(default_factory=PreferenceStats)
+
+    def __post_init__(self):
+        self.weights = np.zeros(self.dim, dtype=np.float32)
+        self._grad_sq = np.ones(self.dim, dtype=np.float32)
+        # Labelled and liked clips per slot, for the evidence behind a decision
+        self._seen = np.zeros(self.dim, dtype=np.int32)
+        self._liked = np.zeros(self.dim, dtype=np.int32)
+        self._random = random.Random(self.seed)
+
+    def _indices(self, features: ClipFeatures) -> np.ndarray:
+        names = feature_names(features)
+        return np.fromiter((zlib.crc32(name.encode()) % self.dim for name in names), np.int64)
+
+    def predict_proba(self, features: ClipFeatures) -> float:
+        """Probability that the clip is liked."""
+        return _sigmoid(float(self.weights[self._indices(features)].sum()))
+
+    def update(self, features: ClipFeatures, like: bool) -> float:
+        """Train on one labelled clip. Returns the probability predicted before the update."""
+        indices = self._indices(features)
+        p = _sigmoid(float(self.weights[indices].sum()))
+        grad = p - float(like)
+        self._grad_sq[indices] += grad * grad
+        self.weights[indices] -= self.learning_rate * grad / np.sqrt(self._grad_sq[indices])
+        self._seen[indices] += 1
+        self._liked[indices] += int(like)
+        self.examples += 1
+        return p
+
+    def confident(self, p: float) -> bool:
+        return self.examples >= self.min_examples and max(p, 1.0 - p) >= self.threshold
+
+    def supported(self, features: ClipFeatures, like: bool) -> bool:
+        """Whether a feature other than the bias backs deciding `like` for the clip."""
+        indices = self._indices(features)
+        # The bias slot is part of every clip, so it holds the overall like rate
+        base = (self._liked[indices[0]] + 1.0) / (self._seen[indices[0]] + 2.0)
+        seen, liked = self._seen[indices[1:]], self._liked[indices[1:]]
+        rate = (liked + self.prior * base) / (seen + self.prior)
+        lift = np.log(rate / (1.0 - rate)) - math.log(base / (1.0 - base))
+        backed = lift >= self.min_lift if like else lift <= -self.min_lift
+        return bool(np.any((seen >= self.min_support) & backed))
+
+    def decide(self, features: ClipFeatures) -> bool | None:
+        """
+        Like/skip decision for a clip, or None if it should go to the LLM.
+        Call `observe` with the LLM's answer for clips that were not decided here.
+        """
+        self.stats.clips += 1
+        p = self.predict_proba(features)
+        if (
+            not self.confident(p)
+            or not self.supported(features, p >= 0.5)
+            or self._random.random() < self.explore_rate
+        ):
+            self.stats.llm_calls += 1
+            return None
+        self.stats.llm_calls_saved += 1
+        return p >= 0.5
+
+    def observe(self, features: ClipFeatures, like: bool) -> None:
+        """Learn from an LLM-labelled clip, scoring it first for the running evaluation."""
+        p = self.update(features, like)
+        if self.confident(p):
+            self.stats.record(p >= 0.5, like)
+
+    def save(self, fp: Path = PREFERENCE_FP) -> None:
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        with open(fp, "wb") as f:
+            np.savez_compressed(
+                f,
+                weights=self.weights,
+                grad_sq=self._grad_sq,
+                seen=self._seen,
+                liked=self._liked,
+                examples=self.examples,
+            )
+        logger.debug("Saved preference model to %s", fp)
+
+    @classmethod
+    def load(cls, fp: Path = PREFERENCE_FP, **kwargs) -> "PreferenceModel":
+        """Load saved weights. `kwargs` override the decision settings."""
+        with np.load(fp) as data:
+            model = cls(dim=len(data["weights"]), **kwargs)
+            model.weights = data["weights"]
+            model._grad_sq = data["grad_sq"]
+            # Models saved without counts decide nothing until they have seen new clips
+            if "seen" in data:
+                model._seen = data["seen"]
+                model._liked = data["liked"]
+            model.examples = int(data["examples"])
+        return model
+
+
+def stored_examples(root: Path | None = None) -> list[tuple[ClipFeatures, bool]]:
+    """Labelled clips from the analysis store, oldest first."""
+    from kronik.store.analytics import read_analyses
+
+    columns = [
+        "recorded_at",
+        "like",
+        "link",
+        "phash",
+        "caption",
+        "author",
+        "track",
+        "stats_title",
+        "stats_channel",
+        "stats_track",
+    ]
+    table = read_analyses(root, columns=columns).sort_by("recorded_at")
+    # What the app showed when the clip was recorded, else what yt-dlp reported
+    return [
+        (
+            ClipFeatures(
+                caption=row["caption"] or row["stats_title"],
+                author=row["author"] or row["stats_channel"] or author_from_link(row["link"]),
+                track=row["track"] or row["stats_track"],
+                phash=row["phash"],
+            ),
+            row["like"],
+        )
+        for row in table.to_pylist()
+    ]
+
+
+def train(model: PreferenceModel, examples: list[tuple[ClipFeatures, bool]]) -> PreferenceModel:
+    """Train on labelled clips in order, as if the LLM had labelled each of them."""
+    for features, like in examples:
+        model.observe(features, like)
+    logger.info("Trained preference model on %d clips", len(examples))
+    return model
+
+
+def load_or_train(fp: Path = PREFERENCE_FP, **kwargs) -> PreferenceModel:
+    """Load the saved model, or train a new one from the analysis store."""
+    if fp.exists():
+        return PreferenceModel.load(fp, **kwargs)
+    return train(PreferenceModel(**kwargs), stored_examples())
+
+
+def evaluate(examples: list[tuple[ClipFeatures, bool]], **kwargs) -> dict:
+    """
+    Simulate the model gating the LLM over labelled clips, in order.
+
+    Undecided clips are labelled with their stored answer, like the LLM would.
+    Returns the model's report.
+    """
+    model = PreferenceModel(**kwargs)
+    for features, like in examples:
+        if model.decide(features) is None:
+            model.observe(features, like)
+    return model.stats.report()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluate the local preference model")
+    parser.add_argument("command", choices=["evaluate"])
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--min-examples", type=int, default=200)
+    args = parser.parse_args()
+
+    report = evaluate(
+        stored_examples(), threshold=args.threshold, min_examples=args.min_examples, seed=0
+    )
+    for key, value in report.items():
+        print(f"{key:<16} {value:.3f}" if isinstance(value, float) else f"{key:<16} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+kronik/brain/prescreen.py
+
+A cheap local check that runs before a clip is uploaded for full analysis.
+
+A few keyframes are sampled from the recording and classified as an ad, a live-stream preview,
+a loading screen or normal content. Loading and blank screens are caught by a pixel statistics
+check. Everything else goes through a small zero-shot CLIP model on the CPU. The control loop
+scrolls straight past anything that is not normal content.
+"""
+
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from kronik.logger import setup_logger
+from kronik.metrics import timed
+from kronik.utils.av import sample_frames
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = setup_logger("kronik.prescreen")
+
+
+class ScreenClass(Enum):
+    AD = "ad"
+    LIVE = "live"
+    LOADING = "loading"
+    NORMAL = "normal"
+
+
+# Zero-shot text prompts describing each class
+PROMPTS = {
+    ScreenClass.AD: "a sponsored advertisement with a shop now or learn more button",
+    ScreenClass.LIVE: "a live stream preview with a red LIVE badge and a viewer count",
+    ScreenClass.LOADING: "a blank, black or loading screen with a spinner",
+    ScreenClass.NORMAL: "a short video of people, animals, food, places or activities",
+}
+
+
+@dataclass
+class PreScreenResult:
+    label: ScreenClass
+    confidence: float
+    seconds: float
+    scores: dict[ScreenClass, float] = field(default_factory=dict)
+
+    @property
+    def skip(self) -> bool:
+        """Whether the clip is not worth a full analysis."""
+        return self.label != ScreenClass.NORMAL
+
+
+def is_loading(frames: "np.ndarray", min_uniform: float = 0.97, tolerance: int = 12) -> bool:
+    """
+    Whether every frame is nearly uniform, as on black, blank or spinner-only screens.
+
+    Args:
+        frames: uint8 RGB frames of shape (n, h, w, 3)
+        min_uniform: Share of pixels that must be close to the frame's median brightness
+        tolerance: Largest luminance difference from the median that counts as close
+    """
+    if len(frames) == 0:
+        return True
+    import numpy as np
+
+    luma = (frames.astype(np.float32) @ np.array([0.299, 0.587, 0.114], np.float32)).reshape(
+        len(frames), -1
+    )
+    close = np.abs(luma - np.median(luma, axis=1, keepdims=True)) <= tolerance
+    return bool((close.mean(axis=1) >= min_uniform).all())
+
+
+class PreScreener:
+    """
+    Classifies clips as ad, live, loading or normal content.
+
+    Args:
+        model: CLIP checkpoint used for zero-shot classification
+        frames: Maximum number of frames sampled per clip
+        min_confidence: A clip is only skipped if the non-content class is at least this likely
+        device: Torch device for the model
+    """
+
+    def __init__(
+        self,
+        model: str = "openai/clip-vit-base-patch32",
+        frames: int = 4,
+        min_confidence: float = 0.6,
+        device: str = "cpu",
+    ):
+        self.model = model
+        self.frames = frames
+        self.min_confidence = min_confidence
+        self.device = device
+        self._loaded = False
+
+    def load(self) -> None:
+        """Load the model and encode the class prompts once."""
+        if self._loaded:
+            return
+        import torch
+        from transformers import CLIPModel, CLIPProcessor
+
+        logger.info("Loading pre-screen model: %s", self.model)
+        self._torch = torch
+        self._processor = CLIPProcessor.from_pretrained(self.model)
+        self._model = CLIPModel.from_pretrained(self.model).to(self.device).eval()
+
+        inputs = self._processor(text=list(PROMPTS.values()), return_tensors="pt", padding=True)
+        with torch.inference_mode():
+            text = self._model.get_text_features(**inputs.to(self.device))
+        self._text_features = text / text.norm(dim=-1, keepdim=True)
+        self._loaded = True
+
+    def _zero_shot(self, frames: "np.ndarray") -> dict[ScreenClass, float]:
+        """Class probabilities averaged over frames."""
+        self.load()
+        torch = self._torch
+        inputs = self._processor(images=list(frames), return_tensors="pt")
+        with torch.inference_mode():
+            image = self._model.get_image_features(**inputs.to(self.device))
+            image = image / image.norm(dim=-1, keepdim=True)
+            logits = self._model.logit_scale.exp() * image @ self._text_features.T
+            probs = logits.softmax(dim=-1).mean(dim=0).tolist()
+        return dict(zip(PROMPTS, probs))
+
+    def classify_frames(self, frames: "np.ndarray") -> PreScreenResult:
+        """Classify already decoded frames."""
+        start = time.perf_counter()
+        if is_loading(frames):
+            return PreScreenResult(ScreenClass.LOADING, 1.0, time.perf_counter() - start)
+
+        scores = self._zero_shot(frames)
+        label = max(scores, key=scores.get)
+        if label != ScreenClass.NORMAL and scores[label] < self.min_confidence:
+            label = ScreenClass.NORMAL
+        return PreScreenResult(label, scores[label], time.perf_counter() - start, scores)
+
+    @timed("brain.prescreen")
+    def classify(self, video_fp: Path) -> PreScreenResult:
+        """Sample frames from a recording and classify them."""
+        start = time.perf_counter()
+        result = self.classify_frames(sample_frames(video_fp, count=self.frames))
+        result.seconds = time.perf_counter() - start
+        logger.debug(
+            "Pre-screened %s as %s (%.2f) in %.0f ms",
+            video_fp,
+            result.label.value,
+            result.confidence,
+            result.seconds * 1000,
+        )
+        return result
@@ -1,4 +1,39 @@
-analyze_tiktok_prompt = """
+"""
+kronik/brain/prompts.py
+
+Versioned prompts and personas for the TikTok analysis.
+
+The system prompt is shared by every persona and rendered from a template, with the category
+list generated from `Category`. It is large and the same on every call, so it is cached by the
+provider (see `kronik.llm.cache`) and each call only sends the persona and the video. Changing
+a prompt means registering a new version, so old analyses can be traced to the prompt that
+produced them and stale caches are not reused.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from string import Template
+
+from kronik.models import Category
+
+# Examples of each category, listed in the prompt
+CATEGORY_HINTS = {
+    Category.ENTERTAINMENT: "Dance, Comedy, Memes, Pranks, Magic Tricks, Stand-Up, Reaction Videos, Bloopers",
+    Category.EDUCATION: "General Education, Tutorials, Science, Language Learning, Productivity, Financial Literacy",
+    Category.LIFESTYLE: "Beauty, Fashion, Fitness, Skincare, Mental Health, Wellness, Home Decor, Parenting, Weddings",
+    Category.FOOD: "Food, Cooking, Recipes, Culinary Tips",
+    Category.CREATIVITY: "Art, Drawing, DIY, Crafts, Photography, Videography, Music, Experimental Art, Tattoo Art",
+    Category.TRAVEL: "Travel, Adventures, Urban Exploration",
+    Category.BUSINESS_FINANCE: "Business, Finance, Cryptocurrency, Career Tips",
+    Category.TECH: "Technology, Emerging Tech, Tech Reviews, Tech Hacks",
+    Category.GAMING: "Gaming, VR/AR",
+    Category.SPORTS: "Sports, Extreme Sports",
+    Category.CULTURE_HISTORY: "History, Culture, Traditions, Storytelling, Nostalgia, Festivals",
+    Category.SOCIAL_ISSUES: "LGBTQ+ Content, Accessibility, Awareness Campaigns, Sustainability, Environmental Issues",
+    Category.MISC: "Anything else not covered above (e.g., Astrology, ASMR, etc.)",
+}
+
+_ANALYZE_TIKTOK_V1 = """
 ```
 # Short-Form Video Content Analysis for TikTok
 
@@ -8,7 +43,7 @@ You are a specialized AI assistant working on video content analysis for TikTok.
 
 ## Persona
 
-Assume the personal of a 20 year old male who watches TikTok for entertainment after a long day of classes. He is a pre-medical student who loves neuroscience and loves brain research. He likes "brain-rot" which is a lingo used to describe videos that are random, unpredictable with a wierd sensor of humor. He also likes videos that are funny and make his laugh. He has a software engineering boyfriend and send him cute couples videos. He likes to listen to R&B and hip hop music. 
+You assume the persona described with each video, and judge the video as that persona would.
 
 ## Task
 
@@ -32,19 +67,7 @@ Your output should strictly adhere to the following JSON schema:
 ```
 
 Categories:
-  "ENTERTAINMENT",       # Dance, Comedy, Memes, Pranks, Magic Tricks, Stand-Up, Reaction Videos, Bloopers
-  "EDUCATION",           # General Education, Tutorials, Science, Language Learning, Productivity, Financial Literacy
-  "LIFESTYLE",           # Beauty, Fashion, Fitness, Skincare, Mental Health, Wellness, Home Decor, Parenting, Weddings
-  "FOOD",                # Food, Cooking, Recipes, Culinary Tips
-  "CREATIVITY",          # Art, Drawing, DIY, Crafts, Photography, Videography, Music, Experimental Art, Tattoo Art
-  "TRAVEL",              # Travel, Adventures, Urban Exploration
-  "BUSINESS_FINANCE",    # Business, Finance, Cryptocurrency, Career Tips
-  "TECH",                # Technology, Emerging Tech, Tech Reviews, Tech Hacks
-  "GAMING",              # Gaming, VR/AR
-  "SPORTS",              # Sports, Extreme Sports
-  "CULTURE_HISTORY",     # History, Culture, Traditions, Storytelling, Nostalgia, Festivals
-  "SOCIAL_ISSUES",       # LGBTQ+ Content, Accessibility, Awareness Campaigns, Sustainability, Environmental Issues
-  "MISC"                 # Anything else not covered above (e.g., Astrology, ASMR, etc.)
+$categories
 
 ## Examples
 
@@ -106,4 +129,117 @@ Here are a couple of examples to illustrate the expected behavior and output:
 
 All responses are based on the input video and the persona's perspective.
 ```
-""".strip()
+"""
+
+
+def category_list() -> str:
+    """The categories the model chooses from, one per line with examples."""
+    lines = []
+    for i, category in enumerate(Category):
+        name = f'"{category.value}"' + ("," if i < len(Category) - 1 else "")
+        hint = CATEGORY_HINTS.get(category)
+        lines.append(f"  {name:<21}  # {hint}" if hint else f"  {name}")
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """
+    A versioned system prompt template.
+
+    Args:
+        name: Prompt name
+        version: Version, increased on every change
+        template: `string.Template` text. `$categories` is replaced by the category list.
+    """
+
+    name: str
+    version: int
+    template: str
+
+    @cached_property
+    def text(self) -> str:
+        return Template(self.template).substitute(categories=category_list()).strip()
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+
+@dataclass(frozen=True)
+class Persona:
+    """
+    Who the analysis is written for, sent with each video.
+
+    Args:
+        name: Persona name
+        description: Who the persona is and what they like
+        version: Version, increased on every change
+    """
+
+    name: str
+    description: str
+    version: int = 1
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+    def render(self) -> str:
+        return f"## Persona\n\n{self.description.strip()}"
+
+
+_PROMPTS: dict[str, dict[int, Prompt]] = {}
+_PERSONAS: dict[str, Persona] = {}
+
+
+def register_prompt(prompt: Prompt) -> Prompt:
+    """Add a prompt version. Versions cannot be replaced."""
+    versions = _PROMPTS.setdefault(prompt.name, {})
+    if prompt.version in versions and versions[prompt.version] != prompt:
+        raise ValueError(f"Prompt {prompt.key} is already registered")
+    versions[prompt.version] = prompt
+    return prompt
+
+
+def get_prompt(name: str, version: int | None = None) -> Prompt:
+    """A registered prompt, by default its latest version."""
+    if name not in _PROMPTS:
+        raise KeyError(f"Unknown prompt: {name}")
+    versions = _PROMPTS[name]
+    if version is None:
+        version = max(versions)
+    if version not in versions:
+        raise KeyError(f"Unknown prompt version: {name}@v{version}")
+    return versions[version]
+
+
+def register_persona(persona: Persona) -> Persona:
+    """Add or replace a persona."""
+    _PERSONAS[persona.name] = persona
+    return persona
+
+
+def get_persona(name: str) -> Persona:
+    if name not in _PERSONAS:
+        raise KeyError(f"Unknown persona: {name}")
+    return _PERSONAS[name]
+
+
+def list_personas() -> list[str]:
+    return sorted(_PERSONAS)
+
+
+ANALYZE_TIKTOK = register_prompt(Prompt("analyze_tiktok", 1, _ANALYZE_TIKTOK_V1))
+
+DEFAULT_PERSONA = register_persona(
+    Persona(
+        "premed",
+        "Assume the personal of a 20 year old male who watches TikTok for entertainment after a "
+        "long day of classes. He is a pre-medical student who loves neuroscience and loves brain "
+        'research. He likes "brain-rot" which is a lingo used to describe videos that are random, '
+        "unpredictable with a wierd sensor of humor. He also likes videos that are funny and make "
+        "his laugh. He has a software engineering boyfriend and send him cute couples videos. He "
+        "likes to listen to R&B and hip hop music.",
+    )
+)
@@ -0,0 +1,253 @@
+"""
+kronik/brain/reuse.py
+
+Reuse analyses of near-identical clips instead of calling the LLM again.
+
+Clips are embedded by their transcript with `kronik.llm.embed`. Embeddings and their analyses
+are persisted in a Chroma collection and mirrored in an in-memory NumPy index, so lookups in
+the control loop never leave the process. When the nearest neighbours are above a similarity
+threshold (reposts, trends, the same sound), their analyses are blended into one.
+"""
+
+import asyncio
+import hashlib
+import os
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+from kronik.llm.embed import embed_text
+from kronik.logger import setup_logger
+from kronik.models import Analysis
+
+if TYPE_CHECKING:
+    import chromadb
+
+logger = setup_logger("kronik.reuse")
+
+COLLECTION_NAME = "analyses"
+
+
+def default_threshold() -> float:
+    """Cosine similarity needed to reuse an analysis, from `KRONIK_REUSE_THRESHOLD`."""
+    return float(os.environ.get("KRONIK_REUSE_THRESHOLD") or 0.95)
+
+
+@dataclass
+class Neighbour:
+    similarity: float
+    analysis: Analysis
+
+
+class AnalysisIndex:
+    """
+    Cosine-similarity index over unit-normalized embeddings held in memory.
+
+    Small indexes are searched exactly. Past `exact_limit` rows, the embeddings are clustered
+    into about sqrt(n) cells with a few rounds of k-means (an inverted file index), and only
+    the `nprobe` cells closest to the query are scanned. Near-duplicates share a cell, so this
+    keeps lookups well under a millisecond at tens of thousands of analyses.
+
+    Args:
+        dim: Embedding size
+        capacity: Initial number of rows. The index doubles when full.
+        exact_limit: Search exactly up to this many rows
+        nprobe: Cells scanned per query once clustered
+    """
+
+    def __init__(
+        self, dim: int = 768, capacity: int = 1024, exact_limit: int = 4096, nprobe: int = 8
+    ):
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.analyses: list[Analysis] = []
+        self.exact_limit = exact_limit
+        self.nprobe = nprobe
+        self._centroids: np.ndarray | None = None
+        self._cells: list[list[int]] = []
+        self._clustered_size = 0
+
+    def __len__(self) -> int:
+        return len(self.analyses)
+
+    def add(self, embedding: list[float] | np.ndarray, analysis: Analysis) -> None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        row = len(self)
+        if row == len(self._vectors):
+            self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+        self._vectors[row] = vector / (np.linalg.norm(vector) or 1.0)
+        self.analyses.append(analysis)
+
+        if self._centroids is not None:
+            self._cells[int(np.argmax(self._centroids @ self._vectors[row]))].append(row)
+        if len(self) > self.exact_limit and len(self) >= 2 * self._clustered_size:
+            self._cluster()
+
+    def _cluster(self, iterations: int = 4) -> None:
+        vectors = self._vectors[: len(self)]
+        rng = np.random.default_rng(0)
+        n_cells = int(np.sqrt(len(vectors)))
+        centroids = vectors[rng.choice(len(vectors), n_cells, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._cells = [np.flatnonzero(assignment == cell).tolist() for cell in range(n_cells)]
+        self._clustered_size = len(vectors)
+        logger.debug("Clustered %d analyses into %d cells", len(vectors), n_cells)
+
+    def search(self, embedding: list[float] | np.ndarray, k: int = 5) -> list[Neighbour]:
+        """The `k` most similar analyses, most similar first."""
+        if not self.analyses:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        if self._centroids is None:
+            rows = np.arange(len(self))
+            scores = self._vectors[: len(self)] @ query
+        else:
+            nprobe = min(self.nprobe, len(self._centroids))
+            probed = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+            rows = np.fromiter((row for cell in probed for row in self._cells[cell]), np.int64)
+            scores = self._vectors[rows] @ query
+
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [Neighbour(float(scores[i]), self.analyses[rows[i]]) for i in top]
+
+
+def blend(neighbours: list[Neighbour]) -> Analysis:
+    """
+    Combine neighbour analyses, weighting each by its similarity.
+
+    The closest neighbour supplies the text fields and category. `like` is a weighted vote,
+    `rating` a weighted mean and `tags` the most common tags.
+    """
+    closest = neighbours[0].analysis
+    if len(neighbours) == 1:
+        return closest
+
+    weights = np.array([n.similarity for n in neighbours])
+    likes = np.array([n.analysis.like for n in neighbours], dtype=np.float64)
+    ratings = np.array([n.analysis.rating for n in neighbours], dtype=np.float64)
+    tags = Counter(tag for n in neighbours for tag in n.analysis.tags)
+
+    return closest.model_copy(
+        update={
+            "like": bool(weights @ likes >= weights.sum() / 2),
+            "rating": int(round(weights @ ratings / weights.sum())),
+            "tags": [tag for tag, _ in tags.most_common(max(len(closest.tags), 1))],
+        }
+    )
+
+
+class AnalysisReuse:
+    """
+    Similarity-gated shortcut in front of `analyze_tiktok`.
+
+    Args:
+        threshold: Minimum cosine similarity to reuse. Defaults to `KRONIK_REUSE_THRESHOLD`.
+        k: Number of neighbours to blend
+        collection: Chroma collection that persists embeddings and analyses. In-memory only if None.
+        transcriber: Turns a recording into text to embed. Defaults to local transcription.
+        min_chars: Shorter transcripts (e.g. music only) are never matched
+    """
+
+    def __init__(
+        self,
+        threshold: float | None = None,
+        k: int = 5,
+        collection: "chromadb.Collection | None" = None,
+        transcriber: Callable[[Path], str] | None = None,
+        min_chars: int = 20,
+    ):
+        self.threshold = default_threshold() if threshold is None else threshold
+        self.k = k
+        self.collection = collection
+        self.transcriber = transcriber
+        self.min_chars = min_chars
+        self.index: AnalysisIndex | None = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_chroma(cls, name: str = COLLECTION_NAME, **kwargs) -> "AnalysisReuse":
+        """Open the persistent collection and load it into the in-memory index."""
+        from kronik.store.client import get_chroma
+
+        collection = get_chroma().get_or_create_collection(name, metadata={"hnsw:space": "cosine"})
+        reuse = cls(collection=collection, **kwargs)
+
+        stored = collection.get(include=["embeddings", "metadatas"])
+        embeddings = stored["embeddings"] if stored["embeddings"] is not None else []
+        for embedding, metadata in zip(embeddings, stored["metadatas"]):
+            reuse._index_for(len(embedding)).add(
+                embedding, Analysis.model_validate_json(metadata["analysis"])
+            )
+        logger.info("Loaded %d analyses for reuse", len(stored["metadatas"]))
+        return reuse
+
+    def _index_for(self, dim: int) -> AnalysisIndex:
+        if self.index is None:
+            self.index = AnalysisIndex(dim)
+        return self.index
+
+    async def transcript(self, recording_fp: Path) -> str:
+        """Text of a recording to match on, transcribed off the event loop."""
+        if self.transcriber is None:
+            from kronik.utils.transcribe import transcribe_video
+
+            self.transcriber = transcribe_video
+        return (await asyncio.to_thread(self.transcriber, recording_fp)).strip()
+
+    async def lookup(self, text: str) -> tuple[Analysis | None, list[float] | None]:
+        """
+        Find a reusable analysis for `text`.
+
+        Returns:
+            The blended analysis, or None on a miss, and the embedding of `text`
+            (None if the text is too short to match) to pass to `remember`
+        """
+        if len(text) < self.min_chars:
+            return None, None
+
+        embedding = await embed_text(text)
+        neighbours = [
+            n
+            for n in self._index_for(len(embedding)).search(embedding, self.k)
+            if n.similarity >= self.threshold
+        ]
+        if not neighbours:
+            self.misses += 1
+            return None, embedding
+
+        self.hits += 1
+        logger.info(
+            "Reusing analysis of %d similar clips (similarity %.3f): %.40s",
+            len(neighbours),
+            neighbours[0].similarity,
+            text,
+        )
+        return blend(neighbours), embedding
+
+    def remember(self, text: str, embedding: list[float], analysis: Analysis) -> None:
+        """Index a freshly analyzed clip so later look-alikes can reuse it."""
+        self._index_for(len(embedding)).add(embedding, analysis)
+        if self.collection is not None:
+            self.collection.upsert(
+                ids=[hashlib.sha256(text.encode()).hexdigest()],
+                embeddings=[embedding],
+                documents=[text],
+                metadatas=[{"analysis": analysis.model_dump_json(), "like": analysis.like}],
+            )
@@ -1,21 +1,35 @@
+import asyncio
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from google.genai.types import (
-    GenerateContentConfig,
-    HarmBlockThreshold,
-    HarmCategory,
-    Part,
-    SafetySetting,
-)
-
-from kronik.llm.client import client
+from kronik.llm.cache import PromptCache
+from kronik.llm.client import get_client
 from kronik.logger import brain_logger as logger
+from kronik.metrics import span
 from kronik.models import Analysis, Category
 
-from .prompts import analyze_tiktok_prompt
+from .prompts import ANALYZE_TIKTOK, DEFAULT_PERSONA, Persona, Prompt, get_persona
+
+if TYPE_CHECKING:
+    from google.genai.types import GenerateContentConfig, Part
+
+MODEL = "gemini-1.5-flash-8b"
 
+# The system prompt is cached once and shared by every call and persona. It is below the
+# model's cache minimum, so for now every call still sends it.
+prompt_cache = PromptCache()
+
+
+def _analyze_tiktok_generation_config(
+    system_instruction: str | None = None, cached_content: str | None = None
+) -> "GenerateContentConfig":
+    from google.genai.types import (
+        GenerateContentConfig,
+        HarmBlockThreshold,
+        HarmCategory,
+        SafetySetting,
+    )
 
-def _analyze_tiktok_generation_config() -> GenerateContentConfig:
     response_schema = {
         "type": "OBJECT",
         "required": ["transcript", "analysis", "tags", "category", "rating", "like"],
@@ -42,8 +56,10 @@ def _analyze_tiktok_generation_config() -> GenerateContentConfig:
         for harm_category in harm_categories
     ]
 
+    # A cached system instruction is referred to by name and must not be sent again
     generation_config = GenerateContentConfig(
-        system_instruction=analyze_tiktok_prompt,
+        system_instruction=None if cached_content else system_instruction,
+        cached_content=cached_content,
         temperature=1.5,
         safety_settings=safety_settings,
         response_schema=response_schema,
@@ -53,43 +69,119 @@ def _analyze_tiktok_generation_config() -> GenerateContentConfig:
     return generation_config
 
 
-async def analyze_tiktok(tiktok_fp: Path) -> Analysis | None:
-    """
-    Analyze a TikTok
-    """
-    logger.info(f"Starting TikTok analysis for: {tiktok_fp}")
+def _is_cache_missing(error: Exception) -> bool:
+    """Whether a call failed because its context cache expired or was deleted."""
+    from google.genai.errors import ClientError
+
+    if not isinstance(error, ClientError):
+        return False
+    # A 403 is usually a permission or quota problem, so only one about the cache counts
+    return error.code == 404 or "cachedcontent" in (error.message or "").lower()
+
+
+async def _generate(video: "Part", persona: Persona, prompt: Prompt) -> Analysis:
+    """Analyze a video as `persona`, sending only the persona and the video with a cached prompt."""
+    cached = await prompt_cache.get(MODEL, prompt.text)
+    contents = [
+        persona.render(),
+        "Please analyze this TikTok video from the persona's perspective.",
+        # TODO: Add metadata content
+        video,
+    ]
+    logger.info("Sending TikTok to Gemini for analysis as %s (%s)", persona.key, prompt.key)
+    try:
+        with span("brain.generate_content"):
+            response = await get_client().aio.models.generate_content(
+                model=MODEL,
+                contents=contents,
+                config=_analyze_tiktok_generation_config(prompt.text, cached),
+            )
+    except Exception as e:
+        if cached is None or not _is_cache_missing(e):
+            raise
+        logger.warning("Context cache %s is gone, recreating it", cached)
+        prompt_cache.invalidate(MODEL, prompt.text)
+        cached = await prompt_cache.get(MODEL, prompt.text)
+        with span("brain.generate_content"):
+            response = await get_client().aio.models.generate_content(
+                model=MODEL,
+                contents=contents,
+                config=_analyze_tiktok_generation_config(prompt.text, cached),
+            )
+
+    logger.debug(
+        "Successfully received response from Gemini: %s",
+        response.candidates[0].content.parts[0].text,
+    )
+    with span("brain.parse"):
+        return Analysis.model_validate_json(response.candidates[0].content.parts[0].text)
+
 
+def _read_video(tiktok_fp: Path) -> "Part":
     # Ensure the file exists
     if not tiktok_fp.exists():
         logger.error(f"TikTok file not found: {tiktok_fp}")
         raise FileNotFoundError(f"File not found: {tiktok_fp}")
 
-    logger.debug(f"Reading TikTok file: {tiktok_fp}")
-    with open(tiktok_fp, "rb") as f:
+    logger.debug("Reading TikTok file: %s", tiktok_fp)
+    with span("brain.read_video"), open(tiktok_fp, "rb") as f:
         tiktok_bytes = f.read()
 
+    from google.genai.types import Part
+
     tiktok_content = Part.from_bytes(
         data=tiktok_bytes,
         mime_type="video/mp4",
     )
     logger.debug("Created TikTok content part for Gemini")
+    return tiktok_content
 
-    logger.info("Sending TikTok to Gemini for analysis")
-    try:
-        response = await client.aio.models.generate_content(
-            model="gemini-1.5-flash-8b",
-            contents=[
-                "Please analyze this TikTok video from the persona's perspective.",
-                # TODO: Add metadata content
-                tiktok_content,
-            ],
-            config=_analyze_tiktok_generation_config(),
-        )
-        logger.debug(
-            f"Successfully received response from Gemini: {response.candidates[0].content.parts[0].text}"
-        )
-        return Analysis.model_validate_json(response.candidates[0].content.parts[0].text)
 
+async def analyze_tiktok(
+    tiktok_fp: Path, persona: Persona | str | None = None, prompt: Prompt | None = None
+) -> Analysis | None:
+    """
+    Analyze a TikTok
+
+    Args:
+        tiktok_fp: Video file
+        persona: Persona or registered persona name. Defaults to `DEFAULT_PERSONA`.
+        prompt: System prompt. Defaults to the latest `analyze_tiktok` prompt.
+    """
+    logger.info("Starting TikTok analysis for: %s", tiktok_fp)
+    tiktok_content = _read_video(tiktok_fp)
+    if isinstance(persona, str):
+        persona = get_persona(persona)
+
+    try:
+        return await _generate(tiktok_content, persona or DEFAULT_PERSONA, prompt or ANALYZE_TIKTOK)
     except Exception as e:
         logger.error(f"Error during TikTok analysis: {str(e)}")
         raise
+
+
+async def analyze_tiktok_personas(
+    tiktok_fp: Path, personas: list[Persona | str], prompt: Prompt | None = None
+) -> dict[str, Analysis | None]:
+    """
+    Analyze a TikTok as several personas at once, reading the video once and sharing the
+    cached prompt.
+
+    Returns:
+        dict[str, Analysis | None]: Analyses by persona name, None where the call failed
+    """
+    tiktok_content = _read_video(tiktok_fp)
+    personas = [get_persona(p) if isinstance(p, str) else p for p in personas]
+    prompt = prompt or ANALYZE_TIKTOK
+
+    results = await asyncio.gather(
+        *(_generate(tiktok_content, persona, prompt) for persona in personas),
+        return_exceptions=True,
+    )
+    analyses = {}
+    for persona, result in zip(personas, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Error during TikTok analysis as {persona.key}: {str(result)}")
+            result = None
+        analyses[persona.name] = result
+    return analyses
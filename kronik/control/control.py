@@ -6,42 +6,308 @@ It handles the device and brain integration and control.
 """
 
 import asyncio
-import json
 from pathlib import Path
 
 from appium.webdriver import Remote
 
+from kronik.brain.preference import (
+    ClipFeatures,
+    PreferenceModel,
+    author_from_link,
+    dhash,
+)
+from kronik.brain.prescreen import PreScreener
+from kronik.brain.reuse import AnalysisReuse
 from kronik.brain.tiktok import analyze_tiktok
+from kronik.control.dwell import DwellController
 from kronik.control.tiktok import TikTokController
-from kronik.device.app import SupportedApp, open_app, verify_app_installed
-from kronik.device.commands import screenshot, start_screenrecord, stop_screenrecord
+from kronik.device.app import SupportedApp, missing_apps, open_app
+from kronik.device.screenrecord import AppiumRecorder, ScreenRecorder
+from kronik.device.screenshots import ScreenshotStore
+from kronik.device.shell import AdbShell
 from kronik.logger import control_logger as logger
+from kronik.metrics import span
 from kronik.models import Analysis
-from kronik.session import Session
+from kronik.session import Session, write_atomic
+from kronik.store import journal as events
+from kronik.store.analytics import AnalysisSink
+from kronik.store.journal import ClipState, SessionJournal
+from kronik.store.storage import read_packed
 
 
-class TikTokAnalysisEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Analysis):
-            return {
-                "transcript": obj.transcript,
-                "analysis": obj.analysis,
-                "tags": obj.tags,
-                "category": obj.category.value,
-                "rating": obj.rating,
-                "like": obj.like,
-            }
-        return super().default(obj)
+async def _analyze(recording_fp: Path, reuse: AnalysisReuse | None) -> Analysis | None:
+    """Analyze a recording, reusing the analysis of a near-identical clip when there is one."""
+    if reuse is None:
+        with span("control.analyze"):
+            return await analyze_tiktok(recording_fp)
 
+    # Reuse is only an optimization, so the clip goes to the LLM if it fails
+    try:
+        with span("control.reuse_lookup"):
+            text = await reuse.transcript(recording_fp)
+            analysis, embedding = await reuse.lookup(text)
+    except Exception as e:
+        logger.warning(f"Analysis reuse failed for {recording_fp.name}: {str(e)}")
+        reuse.misses += 1
+        text, analysis, embedding = None, None, None
+    if analysis is not None:
+        return analysis
+
+    with span("control.analyze"):
+        analysis = await analyze_tiktok(recording_fp)
+    if analysis is not None and embedding is not None:
+        try:
+            reuse.remember(text, embedding, analysis)
+        except Exception as e:
+            logger.warning(f"Failed to remember analysis for reuse: {str(e)}")
+    return analysis
+
+
+def _persist(
+    recording_path: Path,
+    analysis: Analysis,
+    sink: AnalysisSink,
+    journal: SessionJournal,
+    link: str | None,
+    features: ClipFeatures,
+) -> None:
+    """Save an analysis next to its recording and to the analytics store, then journal it."""
+    with span("control.persist"):
+        write_atomic(recording_path.with_suffix(".json"), analysis.model_dump_json())
+        sink.append(
+            analysis,
+            video_id=recording_path.stem,
+            link=link,
+            phash=features.phash,
+            caption=features.caption,
+            author=features.author,
+            track=features.track,
+        )
+        journal.append(events.ANALYZED, recording_path.stem, like=analysis.like)
+
+
+async def _resume(
+    pending: list[ClipState],
+    journal: SessionJournal,
+    sink: AnalysisSink,
+    preference: PreferenceModel | None,
+    reuse: AnalysisReuse | None,
+) -> None:
+    """Finish the analyses a crashed run left pending. The videos are no longer on screen."""
+    if pending:
+        logger.info("Resuming %d pending analyses", len(pending))
+    for clip in pending:
+        if not clip.path.exists():
+            logger.warning("Pending recording is gone: %s", clip.path)
+            journal.append(events.SKIPPED, clip.clip, reason="missing")
+            continue
+        try:
+            # The analysis may have been saved right before the crash, and packed since
+            saved = read_packed(clip.path.parent, f"{clip.clip}.json")
+            if saved is not None:
+                analysis = Analysis.model_validate_json(saved)
+            else:
+                analysis = await _analyze(clip.path, reuse)
+            if analysis is None:
+                continue
+            features = ClipFeatures(
+                caption=clip.caption,
+                author=author_from_link(clip.link),
+                track=clip.track,
+                phash=clip.phash,
+            )
+            _persist(clip.path, analysis, sink, journal, clip.link, features)
+            if preference is not None:
+                preference.observe(features, analysis.like)
+        except Exception as e:
+            logger.error(f"Error resuming analysis of {clip.clip}: {str(e)}")
+
+
+async def _replay_likes(tiktok: TikTokController, journal: SessionJournal) -> None:
+    """Like the clips a crashed run meant to like but never did, by opening their links."""
+    for clip in journal.unliked():
+        if not clip.link:
+            logger.warning("Cannot send the missed like of %s without its link", clip.clip)
+            continue
+        with span("control.like"):
+            liked = await asyncio.to_thread(tiktok.like_link, clip.link)
+        if liked:
+            journal.append(events.LIKED, clip.clip, by="resume")
+            logger.info("Sent the missed like of %s", clip.clip)
+
+
+async def _interact(
+    driver: Remote,
+    session: Session,
+    tiktok: TikTokController,
+    recorder: ScreenRecorder,
+    sink: AnalysisSink,
+    preference: PreferenceModel | None,
+    reuse: AnalysisReuse | None,
+    prescreen: PreScreener | None,
+    record_seconds: float,
+    scroll_pause: float,
+    dwell: DwellController | None,
+    screenshots: ScreenshotStore,
+    journal: SessionJournal,
+) -> None:
+    """Record, analyze and react to the current video, then scroll to the next one."""
+    # Take a screenshot and start recording
+    with span("control.screenshot"):
+        shot = screenshots.capture(driver)
+    with span("control.start_recording"):
+        recording_fp = recorder.start_screenrecord(session)
+    with span("control.record"):
+        if dwell is None:
+            await asyncio.sleep(record_seconds)
+        else:
+            watched = await dwell.watch()
+            logger.info("Recorded %.1f s (%s)", watched.seconds, watched.reason)
+    with span("control.stop_recording"):
+        recording_fp = recorder.stop_screenrecord(session, recording_fp)
+
+    if recording_fp is None:
+        logger.error("Failed to get recording file")
+        return
+    recording_path = Path(recording_fp)
+    clip = recording_path.stem
+    journal.append(events.RECORDED, clip, path=str(recording_path))
+
+    # Scroll straight past ads, live previews and loading screens
+    if prescreen is not None:
+        with span("control.prescreen"):
+            screen = await asyncio.to_thread(prescreen.classify, recording_path)
+        if screen.skip:
+            logger.info("Skipping %s clip (%.2f)", screen.label.value, screen.confidence)
+            journal.append(events.SKIPPED, clip, reason=screen.label.value)
+            await _scroll(tiktok, recorder, scroll_pause, dwell, journal)
+            return
+
+    # Get the current video link
+    with span("control.get_link"):
+        video_link = tiktok.get_link()
+    if video_link:
+        logger.info("Current video: %s", video_link)
+
+    # Cheap features for the local preference model and the analysis store
+    with span("control.features"):
+        caption, track = tiktok.get_details()
+        features = ClipFeatures(
+            caption=caption, author=author_from_link(video_link), track=track, phash=dhash(shot.png)
+        )
+    journal.append(
+        events.LINK,
+        clip,
+        link=video_link,
+        phash=features.phash,
+        caption=features.caption,
+        track=features.track,
+    )
+
+    # Let the preference model decide confident clips without the LLM
+    decision = preference.decide(features) if preference is not None else None
+    if decision is not None:
+        if decision:
+            with span("control.like"):
+                tiktok.like()
+            journal.append(events.LIKED, clip, by="preference")
+        journal.append(events.DECIDED, clip, like=decision)
+        logger.info("Preference model %s video without the LLM", "liked" if decision else "skipped")
+
+    # Analyze the TikTok
+    else:
+        try:
+            analysis = await _analyze(recording_path, reuse)
+            if analysis:
+                # Save analysis to JSON
+                _persist(recording_path, analysis, sink, journal, video_link, features)
+                if preference is not None:
+                    preference.observe(features, analysis.like)
 
-async def control(driver: Remote, session: Session) -> None:
+                # Like the video if the analysis suggests it
+                if analysis.like:
+                    with span("control.like"):
+                        tiktok.like()
+                    journal.append(events.LIKED, clip, by="analysis")
+                    logger.info("Liked video based on analysis")
+
+        except Exception as e:
+            logger.error(f"Error during TikTok analysis: {str(e)}")
+
+    await _scroll(tiktok, recorder, scroll_pause, dwell, journal)
+
+
+async def _scroll(
+    tiktok: TikTokController,
+    recorder: ScreenRecorder,
+    scroll_pause: float,
+    dwell: DwellController | None,
+    journal: SessionJournal,
+) -> None:
+    """Scroll to the next video."""
+    with span("control.scroll"):
+        if dwell is None:
+            if tiktok.scroll_next():
+                # A continuous recording starts the next clip here
+                recorder.scrolled()
+                journal.append(events.SCROLLED)
+            await asyncio.sleep(scroll_pause)  # Brief pause between videos
+            return
+
+        # Wait until the next video is shown instead of pausing, and scroll again if it is not
+        before = await dwell.sample()
+        for _ in range(2):
+            if tiktok.scroll_next() and await dwell.wait_for_next(before):
+                recorder.scrolled()
+                journal.append(events.SCROLLED)
+                return
+            logger.warning("The feed did not move after scrolling")
+
+
+async def control(
+    driver: Remote,
+    session: Session,
+    record_seconds: float = 10,
+    scroll_pause: float = 1,
+    max_iterations: int | None = None,
+    preference: PreferenceModel | None = None,
+    reuse: AnalysisReuse | None = None,
+    prescreen: PreScreener | None = None,
+    verify_apps: bool = True,
+    shell: AdbShell | None = None,
+    recorder: ScreenRecorder | None = None,
+    dwell: DwellController | None = None,
+    screenshots: ScreenshotStore | None = None,
+    journal: SessionJournal | None = None,
+) -> None:
+    """
+    Run the TikTok interaction loop.
+
+    Args:
+        driver: Appium driver instance
+        session: The current session instance
+        record_seconds: How long to record each video
+        scroll_pause: Pause after scrolling to the next video
+        max_iterations: Stop after this many videos. Runs forever if None.
+        preference: Local like/skip model. Confident clips skip the LLM; the rest train it.
+        reuse: Reuse analyses of near-identical clips instead of calling the LLM again
+        prescreen: Local classifier that skips ads, live previews and loading screens
+        verify_apps: Check the required apps are installed. Leased devices are already checked.
+        shell: Persistent adb shell for gestures. Appium is used if None.
+        recorder: Screen recording backend. Records through Appium if None.
+        dwell: Decides how long to record each video and waits for the next one to show,
+            instead of `record_seconds` and `scroll_pause`
+        screenshots: Where screenshots are kept. Downscaled WebP files if None.
+        journal: Journal of the session. Its pending analyses, left by a crashed run of a
+            resumed session, are finished next to the loop. Opened in the session directory
+            if None.
+    """
     # Verify all required apps are installed
-    missing_apps = []
-    for app in SupportedApp:
-        if not verify_app_installed(driver, app):
-            missing_apps.append(app.display_name)
-    if missing_apps:
-        raise Exception(f"Required apps not installed: {', '.join(missing_apps)}")
+    missing = missing_apps(driver) if verify_apps else []
+    if missing:
+        raise Exception(
+            f"Required apps not installed: {', '.join(app.display_name for app in missing)}"
+        )
 
     # Launch TikTok app and wait for it to load
     try:
@@ -51,55 +317,61 @@ async def control(driver: Remote, session: Session) -> None:
         raise
 
     # Initialize TikTok controller
-    tiktok = TikTokController(driver, session)
+    tiktok = TikTokController(driver, session, shell)
+    recorder = recorder or AppiumRecorder(driver)
 
-    # Take initial screenshot
-    screenshot(driver, session)
-
-    logger.info("Starting infinite TikTok interaction loop")
+    # Analyses are also appended to the columnar store for analytics
+    sink = AnalysisSink(session.id)
 
-    try:
-        while True:  # Infinite loop
-            # Take a screenshot and start recording for 10 seconds
-            screenshot(driver, session)
-            recording_fp = start_screenrecord(driver, session)
-            await asyncio.sleep(10)
-            recording_fp = stop_screenrecord(driver, session, recording_fp)
-
-            if recording_fp is None:
-                logger.error("Failed to get recording file")
-                continue
+    # Take initial screenshot
+    screenshots = screenshots or ScreenshotStore(session)
+    screenshots.capture(driver)
 
-            # Analyze the TikTok
-            try:
-                analysis = await analyze_tiktok(Path(recording_fp))
-                if analysis:
-                    # Save analysis to JSON
-                    recording_path = Path(recording_fp)
-                    json_path = recording_path.with_suffix(".json")
-                    with open(json_path, "w") as f:
-                        json.dump(analysis, f, indent=2, cls=TikTokAnalysisEncoder)
-
-                    # Like the video if the analysis suggests it
-                    if analysis.like:
-                        tiktok.like()
-                        logger.info("Liked video based on analysis")
+    # Send the likes a crashed run of this session missed, before the feed is used. Clips whose
+    # analysis is finished next to the loop are liked on the next resume.
+    journal = journal or SessionJournal(session.id)
+    await _replay_likes(tiktok, journal)
 
-            except Exception as e:
-                logger.error(f"Error during TikTok analysis: {str(e)}")
+    # Finish what a crashed run of this session left pending, next to the loop
+    resumed = asyncio.create_task(_resume(journal.pending(), journal, sink, preference, reuse))
 
-            # Get the current video link
-            video_link = tiktok.get_link()
-            if video_link:
-                logger.info(f"Current video: {video_link}")
+    logger.info("Starting infinite TikTok interaction loop")
 
-            # Scroll to next video
-            tiktok.scroll_next()
-            await asyncio.sleep(1)  # Brief pause between videos
+    iteration = 0
+    try:
+        while max_iterations is None or iteration < max_iterations:
+            iteration += 1
+            with span("control.iteration"):
+                await _interact(
+                    driver,
+                    session,
+                    tiktok,
+                    recorder,
+                    sink,
+                    preference,
+                    reuse,
+                    prescreen,
+                    record_seconds,
+                    scroll_pause,
+                    dwell,
+                    screenshots,
+                    journal,
+                )
+        await resumed
 
     except Exception as e:
         logger.error(f"Error during TikTok interaction loop: {str(e)}")
         raise
 
     finally:
+        if not resumed.done():
+            resumed.cancel()
+        recorder.close()
+        screenshots.close()
+        sink.close()
+        journal.close()
+        if preference is not None:
+            logger.info("Preference model: %s", preference.stats.report())
+        if reuse is not None:
+            logger.info("Reused %d analyses, %d misses", reuse.hits, reuse.misses)
         logger.info("Completed all actions")
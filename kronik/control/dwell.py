@@ -0,0 +1,204 @@
+"""
+kronik/control/dwell.py
+
+Adaptive dwell time for the control loop.
+
+Instead of recording every video for a fixed time, the screen is sampled a few times a second
+as tiny grayscale frames and compared with NumPy. Recording stops early once the video loops
+back to its first frame, when nothing on screen moves, when the video's known duration has
+passed, or when the progress bar in the page source jumps back to the start. After a scroll,
+the next video counts as shown once the screen differs from the frame before the scroll and
+has stopped sliding. A scroll that changes nothing is reported so it can be retried.
+"""
+
+import asyncio
+import io
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+from appium.webdriver import Remote
+from selenium.common.exceptions import WebDriverException
+
+from kronik.logger import setup_logger
+from kronik.metrics import span
+
+logger = setup_logger("kronik.dwell")
+
+# `text` of a SeekBar or ProgressBar node, which UiAutomator2 sets to the current progress
+_PROGRESS = re.compile(
+    r'<android\.widget\.(?:SeekBar|ProgressBar)\b[^>]*?\btext="(\d+(?:\.\d+)?)"', re.DOTALL
+)
+
+
+def grab_frame(driver: Remote, size: int = 32) -> np.ndarray:
+    """Screenshot as a `size` x `size` grayscale frame with values from 0 to 1."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(driver.get_screenshot_as_png())) as img:
+        img.draft("L", (size, size))
+        small = img.convert("L").resize((size, size), Image.Resampling.BILINEAR)
+    return np.asarray(small, dtype=np.float32) / 255.0
+
+
+def frame_diff(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute difference of two frames, from 0 (identical) to 1."""
+    return float(np.abs(a - b).mean())
+
+
+def page_progress(page_source: str) -> float | None:
+    """Playback progress of the first progress bar in a page source, if it shows one."""
+    match = _PROGRESS.search(page_source)
+    return float(match.group(1)) if match else None
+
+
+@dataclass
+class DwellPolicy:
+    """
+    Args:
+        min_seconds: Record at least this long
+        max_seconds: Record at most this long
+        interval: Seconds between screen samples
+        settle_seconds: How long to wait for the next video after a scroll
+        change: Difference from the previous frame that counts as a new screen
+        still: Differences below this count as the same frame
+        progress_every: Read the progress bar every this many samples. Never if 0.
+    """
+
+    min_seconds: float = 3.0
+    max_seconds: float = 10.0
+    interval: float = 0.5
+    settle_seconds: float = 3.0
+    change: float = 0.1
+    still: float = 0.01
+    progress_every: int = 4
+
+
+@dataclass
+class Dwell:
+    """How long a video was watched and why watching stopped."""
+
+    seconds: float
+    reason: str
+    samples: int
+
+
+class DwellController:
+    """
+    Decides when to stop recording a video and when the next one is on screen.
+
+    Args:
+        grab: Returns the current screen as a small grayscale frame
+        policy: Thresholds and timings
+        page_source: Returns the page source, for the progress bar. Not read if None.
+    """
+
+    def __init__(
+        self,
+        grab: Callable[[], np.ndarray],
+        policy: DwellPolicy | None = None,
+        page_source: Callable[[], str] | None = None,
+    ):
+        self.grab = grab
+        self.policy = policy or DwellPolicy()
+        self.page_source = page_source
+
+    @classmethod
+    def for_driver(cls, driver: Remote, policy: DwellPolicy | None = None) -> "DwellController":
+        """Sample the screen and page source through Appium."""
+        return cls(lambda: grab_frame(driver), policy, lambda: driver.page_source)
+
+    async def sample(self) -> np.ndarray:
+        """Grab the current screen."""
+        with span("dwell.sample"):
+            return await asyncio.to_thread(self.grab)
+
+    async def _progress(self) -> float | None:
+        try:
+            return page_progress(await asyncio.to_thread(self.page_source))
+        except WebDriverException as exc:
+            logger.debug("Failed to read the page source: %s", exc)
+            return None
+
+    async def watch(self, duration: float | None = None) -> Dwell:
+        """
+        Wait while the current video plays, until there is nothing more to see.
+
+        Args:
+            duration: Length of the video in seconds, if known
+
+        Returns:
+            Dwell: Seconds watched and the reason for stopping
+        """
+        policy = self.policy
+        limit = policy.max_seconds
+        if duration:
+            limit = min(limit, max(duration, policy.min_seconds))
+
+        start = time.monotonic()
+        first = previous = await self.sample()
+        moved = left = False
+        progress = await self._progress() if self.page_source and policy.progress_every else None
+        samples = 1
+
+        while True:
+            await asyncio.sleep(max(0.0, start + samples * policy.interval - time.monotonic()))
+            elapsed = time.monotonic() - start
+            if elapsed >= limit:
+                reason = "duration" if limit < policy.max_seconds else "max"
+                break
+
+            frame = await self.sample()
+            samples += 1
+            moved = moved or frame_diff(frame, previous) > policy.still
+            left = left or frame_diff(frame, first) > policy.change
+            previous = frame
+            if elapsed < policy.min_seconds:
+                continue
+
+            if not moved:
+                reason = "still"
+                break
+            # A video plays in a loop, so coming back to its first frame means it has ended
+            if left and frame_diff(frame, first) <= policy.still:
+                reason = "looped"
+                break
+            if self.page_source and policy.progress_every and samples % policy.progress_every == 0:
+                current = await self._progress()
+                if progress is not None and current is not None and current < progress:
+                    reason = "progress"
+                    break
+                progress = current
+
+        seconds = time.monotonic() - start
+        logger.debug("Watched for %.1f s (%s, %d samples)", seconds, reason, samples)
+        return Dwell(seconds, reason, samples)
+
+    async def wait_for_next(self, before: np.ndarray) -> bool:
+        """
+        Wait until the next video has replaced `before` on screen after a scroll.
+
+        The screen has to differ from `before` and stop sliding, so that two samples in a row
+        are close to each other.
+
+        Args:
+            before: Frame taken right before scrolling
+
+        Returns:
+            bool: True once the next video is shown, False if the screen did not change
+        """
+        deadline = time.monotonic() + self.policy.settle_seconds
+        previous = before
+        while True:
+            await asyncio.sleep(self.policy.interval / 2)
+            frame = await self.sample()
+            if (
+                frame_diff(frame, before) > self.policy.change
+                and frame_diff(frame, previous) <= self.policy.change
+            ):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            previous = frame
@@ -1,3 +1,6 @@
+import html
+import re
+import time
 from pathlib import Path
 
 from appium.webdriver import Remote
@@ -7,16 +10,44 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 from kronik.device.actions import scroll_up
+from kronik.device.app import SupportedApp
+from kronik.device.shell import AdbShell, AdbShellError
 from kronik.logger import control_logger as logger
 from kronik.models import TikTokStats
 from kronik.session import Session, get_session_dir
 from kronik.utils.tiktok_downloader import DownloadConfig, TikTokDownloader
 
+# Seconds for a video opened by its link to show before it is liked
+LINK_SETTLE_SECONDS = 2.0
+
+# `text` of each TextView in a page source
+_TEXT = re.compile(r'<android\.widget\.TextView\b[^>]*?\btext="([^"]+)"', re.DOTALL)
+# The sound button is described as e.g. "Sound: original sound - someone"
+_TRACK = re.compile(r'content-desc="(?:Sound|Music)\s*:\s*([^"]+)"')
+
+
+def page_details(page_source: str) -> tuple[str | None, str | None]:
+    """
+    Caption and audio track of the video shown in a page source.
+
+    The caption is taken to be the longest text of several words that is not the track.
+
+    Returns:
+        tuple[str | None, str | None]: Caption and track, None where not shown
+    """
+    match = _TRACK.search(page_source)
+    track = html.unescape(match.group(1)).strip() if match else None
+    texts = (html.unescape(text).strip() for text in _TEXT.findall(page_source))
+    captions = [text for text in texts if len(text.split()) >= 3 and text != track]
+    return max(captions, key=len, default=None), track
+
 
 class TikTokController:
-    def __init__(self, driver: Remote, session: Session):
+    def __init__(self, driver: Remote, session: Session, shell: AdbShell | None = None):
         self.driver: Remote = driver
         self.session: Session = session
+        # Gestures go through the persistent adb shell when there is one
+        self.shell: AdbShell | None = shell
 
         # Configure downloader with session's download directory
         download_dir = get_session_dir(session.id)
@@ -49,8 +80,41 @@ class TikTokController:
             logger.error(f"Error performing like action: {str(exc)}")
             return False
 
+    def like_link(self, link: str, settle: float | None = None) -> bool:
+        """
+        Open a video by its link, like it and go back.
+
+        Args:
+            link: TikTok video link
+            settle: Seconds to wait for the video to show. Defaults to `LINK_SETTLE_SECONDS`.
+
+        Returns:
+            bool: True if the video was opened and liked
+        """
+        try:
+            self.driver.execute_script(
+                "mobile: deepLink", {"url": link, "package": SupportedApp.TIKTOK.package_id}
+            )
+        except WebDriverException as exc:
+            logger.error(f"Error opening {link}: {str(exc)}")
+            return False
+        time.sleep(LINK_SETTLE_SECONDS if settle is None else settle)
+        liked = self.like()
+        try:
+            self.driver.back()
+        except WebDriverException:
+            pass
+        return liked
+
     def scroll_next(self) -> bool:
         """Scroll down to the next tiktok. Returns True if successful."""
+        if self.shell is not None:
+            try:
+                width, height = self.shell.window_size()
+                self.shell.swipe((width // 2, int(height * 0.75)), (width // 2, int(height * 0.25)))
+                return True
+            except AdbShellError as exc:
+                logger.warning(f"adb shell swipe failed, falling back to Appium: {str(exc)}")
         try:
             scroll_up(self.driver)
             return True
@@ -58,6 +122,14 @@ class TikTokController:
             logger.error(f"Error scrolling to next video: {str(exc)}")
             return False
 
+    def get_details(self) -> tuple[str | None, str | None]:
+        """Caption and audio track of the current video, read from the page source."""
+        try:
+            return page_details(self.driver.page_source)
+        except WebDriverException as exc:
+            logger.warning(f"Error reading the page source: {str(exc)}")
+            return None, None
+
     def get_link(self) -> str | None:
         """Get the sharable link for the tiktok"""
         try:
@@ -78,7 +150,7 @@ class TikTokController:
             # Get the copied link from clipboard
             clipboard_text = self.driver.get_clipboard_text()
             if clipboard_text:
-                logger.debug(f"Copied TikTok link: {clipboard_text}")
+                logger.debug("Copied TikTok link: %s", clipboard_text)
                 return clipboard_text
 
             return None
@@ -74,3 +74,16 @@ def verify_app_installed(driver: Remote, app: SupportedApp) -> bool:
     except Exception as e:
         logger.error(f"Error checking if {app.display_name} is installed: {str(e)}")
         return False
+
+
+def missing_apps(driver: Remote) -> list[SupportedApp]:
+    """
+    Find the supported apps that are not installed on the device.
+
+    Args:
+        driver: Appium driver instance
+
+    Returns:
+        list[SupportedApp]: Apps that are missing
+    """
+    return [app for app in SupportedApp if not verify_app_installed(driver, app)]
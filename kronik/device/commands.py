@@ -9,6 +9,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 from kronik.logger import commands_logger as logger
+from kronik.metrics import span, timed
 from kronik.session import Session, get_session_dir
 
 # Global state for screen recording
@@ -38,6 +39,7 @@ def home(driver: Remote) -> None:
         raise
 
 
+@timed("commands.screenshot")
 def screenshot(driver: Remote, session: Session) -> str:
     """
     Take a screenshot and save it to the current session's screenshots directory.
@@ -58,7 +60,7 @@ def screenshot(driver: Remote, session: Session) -> str:
         filename = f"screenshot_{timestamp}.png"
         filepath = screenshots_dir / filename
 
-        logger.info(f"Taking screenshot: {filename}")
+        logger.info("Taking screenshot: %s", filename)
 
         # Take and save screenshot
         driver.get_screenshot_as_file(str(filepath))
@@ -70,6 +72,7 @@ def screenshot(driver: Remote, session: Session) -> str:
         raise
 
 
+@timed("commands.start_screenrecord")
 def start_screenrecord(driver: Remote, session: Session) -> Path | None:
     """
     Start screen recording using media projection.
@@ -94,7 +97,7 @@ def start_screenrecord(driver: Remote, session: Session) -> Path | None:
         filename = f"recording_{timestamp}.mp4"
         filepath = recordings_dir.joinpath(filename)
 
-        logger.info(f"Starting screen recording: {filename}")
+        logger.info("Starting screen recording: %s", filename)
 
         # Start recording with specific options for better reliability
         driver.start_recording_screen(
@@ -113,6 +116,7 @@ def start_screenrecord(driver: Remote, session: Session) -> Path | None:
         raise
 
 
+@timed("commands.stop_screenrecord")
 def stop_screenrecord(
     driver: Remote, session: Session, filepath: Path | None = None
 ) -> Path | None:
@@ -134,10 +138,11 @@ def stop_screenrecord(
             logger.warning("No screen recording in progress")
             return None
 
-        logger.info(f"Stopping screen recording: {filepath}")
+        logger.info("Stopping screen recording: %s", filepath)
 
         # Stop recording and get base64 data
-        base64_data = driver.stop_recording_screen()
+        with span("commands.stop_recording_screen"):
+            base64_data = driver.stop_recording_screen()
 
         # Save the recording
         if filepath is None:
@@ -147,10 +152,12 @@ def stop_screenrecord(
             filepath = recordings_dir.joinpath(filename)
 
         # Decode and save the file
-        with open(filepath, "wb") as f:
-            f.write(base64.b64decode(base64_data))
+        with span("commands.base64_decode"):
+            data = base64.b64decode(base64_data)
+        with span("commands.write_recording"), open(filepath, "wb") as f:
+            f.write(data)
 
-        logger.debug(f"Screen recording saved: {filepath}")
+        logger.debug("Screen recording saved: %s", filepath)
 
         # Reset state
         _is_recording = False
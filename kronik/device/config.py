@@ -7,7 +7,19 @@ def appium_server_url():
     return "http://localhost:4723"
 
 
-def appium_options() -> AppiumOptions:
+def appium_options(
+    udid: str | None = None,
+    system_port: int | None = None,
+    new_command_timeout: int | None = None,
+) -> AppiumOptions:
+    """
+    UiAutomator2 session options.
+
+    Args:
+        udid: Serial of the device to drive when several are attached, e.g. `emulator-5556`
+        system_port: UiAutomator2 server port on the host. Must differ per device.
+        new_command_timeout: Seconds without commands before Appium ends the session. 0 never.
+    """
     options = UiAutomator2Options()
 
     options.platformName = "Android"
@@ -17,6 +29,12 @@ def appium_options() -> AppiumOptions:
     options.appActivity = ".Settings"
     options.language = "en"
     options.locale = "US"
+    if udid is not None:
+        options.udid = udid
+    if system_port is not None:
+        options.system_port = system_port
+    if new_command_timeout is not None:
+        options.new_command_timeout = new_command_timeout
 
     return options
 
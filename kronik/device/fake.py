@@ -0,0 +1,189 @@
+"""
+kronik/device/fake.py
+
+Stand-ins for the `emulator`, `adb` and `appium` command line tools, and the `getprop`,
+`input`, `wm` and `screenrecord` device commands.
+
+They are small shell scripts that boot and start after configurable delays, so device
+startup can be exercised and timed without the Android SDK or Node. Device state and saved
+snapshots live in marker files under the tools directory, one set per emulator port.
+"""
+
+import stat
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+_EMULATOR = """#!/bin/sh
+port=5554
+boot={boot}
+while [ $# -gt 0 ]; do
+  case "$1" in
+    -port) port=$2; shift ;;
+    -snapshot) [ -f "{state}/snapshot-$2" ] && boot={snapshot_boot}; shift ;;
+  esac
+  shift
+done
+trap 'kill $! 2>/dev/null; rm -f "{state}/device-$port" "{state}/booted-$port"; exit 0' TERM
+sleep {attach} & wait $!
+touch "{state}/device-$port"
+sleep $boot & wait $!
+touch "{state}/booted-$port"
+sleep 3600 & wait $!
+"""
+
+_ADB = """#!/bin/sh
+port=5554
+if [ "$1" = "-s" ]; then port=${{2#emulator-}}; shift 2; fi
+device="{state}/device-$port"
+[ "$1" = "wait-for-device" ] || [ -f "$device" ] || {{
+  echo "error: device 'emulator-$port' not found" >&2; exit 1; }}
+case "$1" in
+  wait-for-device)
+    while [ ! -f "$device" ]; do sleep 0.05; done ;;
+  shell)
+    shift
+    export FAKE_PORT=$port PATH="{bin}:$PATH"
+    [ $# -eq 0 ] && exec sh
+    exec sh -c "$*" ;;
+  exec-out)
+    shift
+    export FAKE_PORT=$port PATH="{bin}:$PATH"
+    # Like adbd, drop the stream when adb is killed, whatever is still writing to it
+    sh -c "$*" | cat &
+    trap 'kill $! 2>/dev/null; exit 0' TERM
+    wait $! ;;
+  emu)
+    case "$4" in
+      save) touch "{state}/snapshot-$5" ;;
+      list) ls "{state}" | sed -n 's/^snapshot-//p' ;;
+    esac
+    echo OK ;;
+esac
+"""
+
+_GETPROP = """#!/bin/sh
+[ -f "{state}/booted-${{FAKE_PORT:-5554}}" ] && echo 1 || echo 0
+"""
+
+_INPUT = """#!/bin/sh
+echo "$*" >> "{state}/input-${{FAKE_PORT:-5554}}"
+"""
+
+_WM = """#!/bin/sh
+echo "Physical size: 1080x2400"
+"""
+
+# Records a test pattern in real time. Like screenrecord, it finishes the file on SIGINT and
+# writes a raw H.264 stream to stdout when the output is `-`. ffmpeg is asked to stop with `q`
+# on its stdin, which works however signals were set up for the script.
+_SCREENRECORD = """#!{python}
+import signal
+import subprocess
+import sys
+
+args = sys.argv[1:]
+limit = args[args.index("--time-limit") + 1] if "--time-limit" in args else "180"
+fmt = "h264" if "--output-format=h264" in args else "mp4"
+ffmpeg = subprocess.Popen(
+    ["ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=size=180x320:rate=15,realtime",
+     "-t", limit, "-c:v", "libx264", "-preset", "ultrafast", "-g", "15", "-pix_fmt", "yuv420p",
+     "-f", fmt, "-y", args[-1]],
+    stdin=subprocess.PIPE,
+)
+
+
+def finish(*_):
+    try:
+        ffmpeg.stdin.write(b"q")
+        ffmpeg.stdin.flush()
+    except OSError:
+        pass
+
+
+signal.signal(signal.SIGINT, finish)
+sys.exit(ffmpeg.wait())
+"""
+
+_APPIUM = """#!/bin/sh
+echo "[Appium] Welcome to Appium"
+sleep {ready}
+echo "[Appium] Appium REST http interface listener started on http://0.0.0.0:$2"
+exec sleep 3600
+"""
+
+_NEVER_READY = """#!/bin/sh
+echo "[Appium] Welcome to Appium"
+exec sleep 3600
+"""
+
+
+@dataclass
+class FakeTools:
+    """Paths of the fake tools, to pass as `emulator_path`, `adb_path` and `appium_path`."""
+
+    emulator: str
+    adb: str
+    appium: str
+    state: Path
+
+    def attach(self, port: int = 5554, booted: bool = True) -> None:
+        """Pretend an emulator on `port` is already attached, and booted if `booted`."""
+        self.state.joinpath(f"device-{port}").touch()
+        if booted:
+            self.state.joinpath(f"booted-{port}").touch()
+
+    def reset(self, snapshots: bool = False) -> None:
+        """Forget attached and booted devices, and saved snapshots if `snapshots`."""
+        for fp in self.state.iterdir():
+            if snapshots or not fp.name.startswith("snapshot-"):
+                fp.unlink()
+
+
+def _script(fp: Path, content: str) -> str:
+    fp.write_text(content)
+    fp.chmod(fp.stat().st_mode | stat.S_IXUSR)
+    return str(fp)
+
+
+def write_fake_tools(
+    directory: Path,
+    attach: float = 0.2,
+    boot: float = 0.5,
+    snapshot_boot: float = 0.1,
+    appium_ready: float | None = 0.5,
+) -> FakeTools:
+    """
+    Write the fake tools into `directory`.
+
+    Args:
+        directory: Where the scripts and device state are written
+        attach: Seconds until the emulator shows up in adb
+        boot: Seconds from attaching until `sys.boot_completed` is 1 on a cold boot
+        snapshot_boot: The same when booting from a saved snapshot
+        appium_ready: Seconds until Appium logs that it is listening. Never if None.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    state = directory.joinpath("state")
+    state.mkdir(exist_ok=True)
+    values = {
+        "state": state,
+        "bin": directory,
+        "attach": attach,
+        "boot": boot,
+        "snapshot_boot": snapshot_boot,
+    }
+
+    _script(directory.joinpath("getprop"), _GETPROP.format(**values))
+    _script(directory.joinpath("input"), _INPUT.format(**values))
+    _script(directory.joinpath("wm"), _WM)
+    _script(directory.joinpath("screenrecord"), _SCREENRECORD.format(python=sys.executable))
+    appium = _NEVER_READY if appium_ready is None else _APPIUM.format(ready=appium_ready)
+    tools = FakeTools(
+        emulator=_script(directory.joinpath("emulator"), _EMULATOR.format(**values)),
+        adb=_script(directory.joinpath("adb"), _ADB.format(**values)),
+        appium=_script(directory.joinpath("appium"), appium),
+        state=state,
+    )
+    tools.reset(snapshots=True)
+    return tools
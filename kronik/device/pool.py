@@ -0,0 +1,395 @@
+"""
+kronik/device/pool.py
+
+A pool of warm emulators with open Appium sessions, handed out to runs as leases.
+
+Emulators boot from a saved snapshot, so a device is usable seconds after launch instead of
+after a cold boot. The first cold boot saves the snapshot once the device is set up. Each
+device keeps its UiAutomator2 session and its verified apps between leases. A device whose
+session stops answering is recycled with a new session, and relaunched if the emulator died.
+
+Usage: poetry run python -m kronik.device.pool snapshot [--avd KronikPixel]
+"""
+
+import argparse
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+
+from appium.webdriver import Remote
+
+from kronik.device.app import missing_apps
+from kronik.device.config import appium_driver, appium_options, appium_server_url
+from kronik.device.shell import AdbShell
+from kronik.device.startup import (
+    DeviceProcesses,
+    adb,
+    is_appium_responsive,
+    is_emulator_booted,
+    start_appium,
+    start_emulator,
+    wait_for_appium,
+    wait_for_emulator,
+)
+from kronik.logger import setup_logger
+
+logger = setup_logger("kronik.pool")
+
+EMULATOR_NAME = "KronikPixel"
+SNAPSHOT_NAME = "kronik-warm"
+APPIUM_PORT = "4723"
+
+# Emulators take an even console port from 5554 and adb names them after it
+FIRST_EMULATOR_PORT = 5554
+# UiAutomator2 server ports on the host, one per device
+FIRST_SYSTEM_PORT = 8200
+
+
+@dataclass
+class DeviceSlot:
+    """One emulator of the pool with its Appium session and adb shell."""
+
+    index: int
+    port: int
+    system_port: int
+    emulator: asyncio.subprocess.Process | None = None
+    driver: Remote | None = None
+    shell: AdbShell | None = None
+    verified: bool = False
+    leases: int = 0
+    recycles: int = 0
+
+    @property
+    def serial(self) -> str:
+        return f"emulator-{self.port}"
+
+
+@dataclass
+class Lease:
+    """A device handed out by `DevicePool.lease`."""
+
+    slot: DeviceSlot
+    driver: Remote
+    waited: float
+    healthy: bool = True
+
+    @property
+    def shell(self) -> AdbShell | None:
+        return self.slot.shell
+
+    def mark_unhealthy(self) -> None:
+        """Have the device recycled instead of handed out again."""
+        self.healthy = False
+
+
+def driver_alive(driver: Remote) -> bool:
+    """Whether the Appium session still answers a command."""
+    try:
+        return driver.current_package is not None
+    except Exception:
+        return False
+
+
+@dataclass
+class PoolStats:
+    boots: int = 0
+    sessions: int = 0
+    leases: int = 0
+    recycles: int = 0
+    boot_seconds: list[float] = field(default_factory=list)
+
+
+class DevicePool:
+    """
+    Keeps `size` emulators booted with open Appium sessions and leases them out.
+
+    Args:
+        size: Number of devices
+        avd: Virtual device to launch
+        snapshot: Emulator snapshot to boot from, saved after the first cold boot.
+            Always cold boots if None.
+        appium_url: Appium server URL
+        appium_port: Port to launch the Appium server on
+        driver_factory: Opens a session on a slot. Defaults to a UiAutomator2 session on its
+            serial and system port that never times out.
+        health_check: Whether a driver still works. Checked before every lease.
+        external: Use an emulator and Appium server that are already running instead of
+            launching them. Only a single device is supported then.
+        boot_timeout: Seconds to wait for a device or Appium to be ready
+        emulator_path: Emulator executable
+        adb_path: adb executable
+        appium_path: Appium executable
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        avd: str = EMULATOR_NAME,
+        snapshot: str | None = SNAPSHOT_NAME,
+        appium_url: str | None = None,
+        appium_port: str = APPIUM_PORT,
+        driver_factory: Callable[[DeviceSlot], Remote] | None = None,
+        health_check: Callable[[Remote], bool] = driver_alive,
+        external: bool = False,
+        boot_timeout: float = 120,
+        emulator_path: str = "emulator",
+        adb_path: str = "adb",
+        appium_path: str = "appium",
+    ):
+        if external and size != 1:
+            raise ValueError("An external device pool has exactly one device")
+
+        self.avd = avd
+        self.snapshot = snapshot
+        self.appium_url = appium_url or appium_server_url()
+        self.appium_port = appium_port
+        self.driver_factory = driver_factory or self._appium_session
+        self.health_check = health_check
+        self.external = external
+        self.boot_timeout = boot_timeout
+        self.emulator_path = emulator_path
+        self.adb_path = adb_path
+        self.appium_path = appium_path
+
+        self.slots = [
+            DeviceSlot(i, FIRST_EMULATOR_PORT + 2 * i, FIRST_SYSTEM_PORT + i) for i in range(size)
+        ]
+        self.stats = PoolStats()
+        self._idle: asyncio.Queue[DeviceSlot] = asyncio.Queue()
+        self._appium = DeviceProcesses()
+        self._appium_ready = asyncio.Event()
+        self._recycling: set[asyncio.Task] = set()
+        self._snapshot_saved = False
+        self._started = False
+
+    def _appium_session(self, slot: DeviceSlot) -> Remote:
+        options = appium_options(
+            udid=None if self.external else slot.serial,
+            system_port=slot.system_port,
+            new_command_timeout=0,
+        )
+        return appium_driver(self.appium_url, options)
+
+    async def start(self) -> None:
+        """Launch Appium and every device concurrently and open their sessions."""
+        start = time.perf_counter()
+        await asyncio.wait_for(
+            asyncio.gather(self._start_appium(), *(self._warm(slot) for slot in self.slots)),
+            self.boot_timeout,
+        )
+        for slot in self.slots:
+            self._idle.put_nowait(slot)
+        self._started = True
+        logger.info("%d devices ready in %.1fs", len(self.slots), time.perf_counter() - start)
+
+    async def _start_appium(self) -> None:
+        if self.external:
+            if not await is_appium_responsive(self.appium_url):
+                raise RuntimeError(f"No running Appium server found at {self.appium_url}")
+            self._appium_ready.set()
+            return
+        self._appium.appium = await start_appium(self.appium_port, self.appium_path)
+        await wait_for_appium(
+            self.appium_url, self._appium.appium.stdout, tasks=self._appium._tasks
+        )
+        self._appium_ready.set()
+
+    async def _boot(self, slot: DeviceSlot) -> None:
+        """Boot the slot's emulator, from the snapshot if it has been saved."""
+        if self.external:
+            if not await is_emulator_booted(self.adb_path):
+                raise RuntimeError("No running emulator found")
+            return
+
+        start = time.perf_counter()
+        # The emulator cold boots by itself when the snapshot does not exist yet
+        slot.emulator = await start_emulator(self.avd, self.emulator_path, slot.port, self.snapshot)
+        await wait_for_emulator(self.adb_path, slot.serial)
+        seconds = time.perf_counter() - start
+
+        self.stats.boots += 1
+        self.stats.boot_seconds.append(seconds)
+        logger.info("%s booted in %.1fs", slot.serial, seconds)
+
+    async def has_snapshot(self, slot: DeviceSlot) -> bool:
+        """Whether the pool's snapshot exists, asked through the slot's running emulator."""
+        code, out = await adb(
+            "emu", "avd", "snapshot", "list", adb_path=self.adb_path, serial=slot.serial
+        )
+        return code == 0 and self.snapshot.encode() in out
+
+    async def save_snapshot(self, slot: DeviceSlot) -> None:
+        """Save the slot's current state as the pool's snapshot."""
+        code, _ = await adb(
+            "emu",
+            "avd",
+            "snapshot",
+            "save",
+            self.snapshot,
+            adb_path=self.adb_path,
+            serial=slot.serial,
+        )
+        if code != 0:
+            logger.warning("Could not save snapshot %s from %s", self.snapshot, slot.serial)
+            return
+        self._snapshot_saved = True
+        logger.info("Saved snapshot %s from %s", self.snapshot, slot.serial)
+
+    async def _warm(self, slot: DeviceSlot) -> None:
+        """Boot the slot if needed, open its session and check its apps once."""
+        if self.external or slot.emulator is None or slot.emulator.returncode is not None:
+            await self._boot(slot)
+
+        if slot.shell is None:
+            slot.shell = AdbShell(None if self.external else slot.serial, self.adb_path)
+        await asyncio.to_thread(slot.shell.open)
+
+        await self._appium_ready.wait()
+        slot.driver = await asyncio.to_thread(self.driver_factory, slot)
+        self.stats.sessions += 1
+
+        if not slot.verified:
+            missing = await asyncio.to_thread(missing_apps, slot.driver)
+            if missing:
+                raise RuntimeError(
+                    f"Required apps not installed on {slot.serial}: "
+                    f"{', '.join(app.display_name for app in missing)}"
+                )
+            slot.verified = True
+
+        # Snapshot a set-up device so later boots skip the cold boot
+        if (
+            self.snapshot is not None
+            and not self.external
+            and not self._snapshot_saved
+            and not await self.has_snapshot(slot)
+        ):
+            await self.save_snapshot(slot)
+
+    async def _recycle(self, slot: DeviceSlot) -> None:
+        """Replace the slot's session, relaunching the emulator if it is gone."""
+        slot.recycles += 1
+        self.stats.recycles += 1
+        logger.warning("Recycling %s", slot.serial)
+        if slot.driver is not None:
+            try:
+                await asyncio.to_thread(slot.driver.quit)
+            except Exception as e:
+                logger.debug("Failed to end session on %s: %s", slot.serial, e)
+            slot.driver = None
+
+        if slot.emulator is not None and not await is_emulator_booted(self.adb_path, slot.serial):
+            if slot.emulator.returncode is None:
+                slot.emulator.terminate()
+                await slot.emulator.wait()
+            slot.emulator = None
+            # The shell went with the emulator
+            if slot.shell is not None:
+                slot.shell.close()
+        await asyncio.wait_for(self._warm(slot), self.boot_timeout)
+
+    async def _recycle_and_return(self, slot: DeviceSlot) -> None:
+        try:
+            await self._recycle(slot)
+        except Exception as e:
+            logger.error("Failed to recycle %s: %s", slot.serial, e)
+        # Handed back either way; the next lease checks it again
+        self._idle.put_nowait(slot)
+
+    @asynccontextmanager
+    async def lease(self, timeout: float | None = None) -> AsyncIterator[Lease]:
+        """
+        Borrow a healthy device until the block exits.
+
+        An exception in the block or `Lease.mark_unhealthy` has the device recycled in the
+        background before it is handed out again.
+
+        Raises:
+            TimeoutError: If no device is free within `timeout` seconds
+        """
+        if not self._started:
+            await self.start()
+
+        start = time.perf_counter()
+        slot = await asyncio.wait_for(self._idle.get(), timeout)
+        if slot.driver is None or not await asyncio.to_thread(self.health_check, slot.driver):
+            try:
+                await self._recycle(slot)
+            except BaseException:
+                self._idle.put_nowait(slot)
+                raise
+
+        slot.leases += 1
+        self.stats.leases += 1
+        lease = Lease(slot, slot.driver, time.perf_counter() - start)
+        logger.debug("Leased %s after %.2fs", slot.serial, lease.waited)
+        try:
+            yield lease
+        except Exception:
+            lease.mark_unhealthy()
+            raise
+        finally:
+            if lease.healthy:
+                self._idle.put_nowait(slot)
+            else:
+                task = asyncio.create_task(self._recycle_and_return(slot))
+                self._recycling.add(task)
+                task.add_done_callback(self._recycling.discard)
+
+    async def close(self) -> None:
+        """End the sessions and stop what the pool launched."""
+        for task in list(self._recycling):
+            task.cancel()
+        for slot in self.slots:
+            if slot.driver is not None:
+                try:
+                    await asyncio.to_thread(slot.driver.quit)
+                except Exception as e:
+                    logger.warning("Failed to end session on %s: %s", slot.serial, e)
+                slot.driver = None
+            if slot.shell is not None:
+                slot.shell.close()
+            if slot.emulator is not None and slot.emulator.returncode is None:
+                slot.emulator.terminate()
+                await slot.emulator.wait()
+        self._appium.terminate()
+        if self._appium.appium is not None:
+            await self._appium.appium.wait()
+        self._started = False
+
+    async def __aenter__(self) -> "DevicePool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+async def make_snapshot(avd: str = EMULATOR_NAME, snapshot: str = SNAPSHOT_NAME) -> None:
+    """Cold boot the device, check it is set up and save the snapshot pools boot from."""
+    pool = DevicePool(avd=avd, snapshot=snapshot)
+    try:
+        await pool.start()
+        # Refresh an existing snapshot too
+        if not pool._snapshot_saved:
+            await pool.save_snapshot(pool.slots[0])
+    finally:
+        await pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the warm device pool")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    snapshot = subparsers.add_parser("snapshot", help="Save the snapshot devices boot from")
+    snapshot.add_argument("--avd", default=EMULATOR_NAME, help="Virtual device name")
+    snapshot.add_argument("--name", default=SNAPSHOT_NAME, help="Snapshot name")
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        asyncio.run(make_snapshot(args.avd, args.name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+kronik/device/replay.py
+
+A stand-in for the Appium `Remote` driver that replays recorded sessions.
+
+It serves canned screen recordings, screenshots, page sources and clipboard links
+with configurable latencies. The control loop can then run on a plain machine,
+without an emulator or an Appium server.
+"""
+
+import base64
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from selenium.common.exceptions import NoSuchElementException
+
+from kronik.logger import setup_logger
+
+logger = setup_logger("kronik.replay")
+
+# 1x1 transparent PNG used when a recording has no screenshots
+BLANK_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+DEFAULT_PAGE_SOURCE = (
+    "<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>"
+    '<hierarchy rotation="0"><android.widget.FrameLayout package="com.zhiliaoapp.musically" />'
+    "</hierarchy>"
+)
+
+
+@dataclass
+class ReplayLatency:
+    """Simulated round-trip time in seconds for each kind of driver call."""
+
+    command: float = 0.0
+    screenshot: float = 0.0
+    start_recording: float = 0.0
+    stop_recording: float = 0.0
+    gesture: float = 0.0
+    find_element: float = 0.0
+    jitter: float = 0.0
+
+
+@dataclass
+class ReplaySession:
+    """Canned device outputs that are served in a loop."""
+
+    recordings: list[Path]
+    screenshots: list[Path] = field(default_factory=list)
+    page_sources: list[str] = field(default_factory=list)
+    links: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dir(cls, session_dir: Path) -> "ReplaySession":
+        """
+        Load a recorded session directory.
+
+        Uses `*.mp4` as recordings, `*.png`, `*.webp` and `*.jpg` as screenshots, `*.xml` as
+        page sources and one link per line from `links.txt`, if present.
+        """
+        session_dir = Path(session_dir)
+        links_fp = session_dir.joinpath("links.txt")
+        return cls(
+            recordings=sorted(session_dir.glob("*.mp4")),
+            screenshots=sorted(
+                fp for suffix in ("png", "webp", "jpg") for fp in session_dir.glob(f"*.{suffix}")
+            ),
+            page_sources=[fp.read_text() for fp in sorted(session_dir.glob("*.xml"))],
+            links=links_fp.read_text().split() if links_fp.exists() else [],
+        )
+
+
+class ReplayElement:
+    """A UI element that can be clicked."""
+
+    def __init__(self, driver: "ReplayDriver", locator: tuple[str, str]):
+        self._driver = driver
+        self.locator = locator
+
+    def click(self) -> None:
+        self._driver._wait(self._driver.latency.command)
+        self._driver.calls["click"] += 1
+
+
+class ReplayDriver:
+    """
+    Replays a `ReplaySession` through the subset of the Appium driver API kronik uses.
+
+    Args:
+        session: Canned outputs to replay
+        latency: Simulated latencies
+        window_size: Reported screen size
+        missing_element_rate: Probability that `find_element` finds nothing
+        seed: Seed for latency jitter and failures
+    """
+
+    def __init__(
+        self,
+        session: ReplaySession,
+        latency: ReplayLatency | None = None,
+        window_size: tuple[int, int] = (1080, 2400),
+        missing_element_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        if not session.recordings:
+            raise ValueError("Replay session has no recordings")
+
+        self.session = session
+        self.latency = latency or ReplayLatency()
+        self.window_size = {"width": window_size[0], "height": window_size[1]}
+        self.missing_element_rate = missing_element_rate
+        self.current_package = ""
+        self.installed_packages: set[str] | None = None
+
+        self.calls: dict[str, int] = {
+            key: 0
+            for key in ("click", "tap", "gesture", "back", "screenshot", "recording", "script")
+        }
+        self.scripts: list[tuple[str, tuple]] = []
+        self.recording_stops: list[float] = []
+
+        self._random = random.Random(seed)
+        self._recordings = itertools.cycle(session.recordings)
+        self._screenshots = itertools.cycle(session.screenshots or [None])
+        self._page_sources = itertools.cycle(session.page_sources or [DEFAULT_PAGE_SOURCE])
+        self._links = itertools.cycle(session.links or [None])
+        self._recording = False
+
+        logger.info(f"Replaying {len(session.recordings)} recordings")
+
+    def _wait(self, seconds: float) -> None:
+        if self.latency.jitter:
+            seconds += self._random.uniform(0, self.latency.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    # App management
+
+    def is_app_installed(self, package_id: str) -> bool:
+        self._wait(self.latency.command)
+        return self.installed_packages is None or package_id in self.installed_packages
+
+    def activate_app(self, package_id: str) -> None:
+        self._wait(self.latency.command)
+        self.current_package = package_id
+
+    def implicitly_wait(self, seconds: float) -> None:
+        pass
+
+    def press_keycode(self, keycode: int) -> None:
+        self._wait(self.latency.command)
+
+    def back(self) -> None:
+        self._wait(self.latency.command)
+        self.calls["back"] += 1
+
+    def quit(self) -> None:
+        pass
+
+    # Screen
+
+    def get_window_size(self) -> dict:
+        self._wait(self.latency.command)
+        return dict(self.window_size)
+
+    def get_screenshot_as_png(self) -> bytes:
+        self._wait(self.latency.screenshot)
+        self.calls["screenshot"] += 1
+        screenshot_fp = next(self._screenshots)
+        return screenshot_fp.read_bytes() if screenshot_fp else BLANK_PNG
+
+    def get_screenshot_as_file(self, filename: str) -> bool:
+        Path(filename).write_bytes(self.get_screenshot_as_png())
+        return True
+
+    @property
+    def page_source(self) -> str:
+        self._wait(self.latency.command)
+        return next(self._page_sources)
+
+    def start_recording_screen(self, **options) -> None:
+        self._wait(self.latency.start_recording)
+        self._recording = True
+
+    def stop_recording_screen(self, **options) -> str:
+        self._wait(self.latency.stop_recording)
+        self._recording = False
+        self.calls["recording"] += 1
+        self.recording_stops.append(time.perf_counter())
+        return base64.b64encode(next(self._recordings).read_bytes()).decode()
+
+    # Interaction
+
+    def tap(self, positions: list[tuple[int, int]], duration: int | None = None) -> None:
+        self._wait(self.latency.gesture)
+        self.calls["tap"] += 1
+
+    def execute(self, driver_command: str, params: dict | None = None) -> dict:
+        # W3C actions (swipes, scrolls) built with ActionBuilder end up here
+        self._wait(self.latency.gesture)
+        self.calls["gesture"] += 1
+        return {"value": None}
+
+    def execute_script(self, script: str, *args) -> None:
+        # Mobile commands such as `mobile: deepLink`
+        self._wait(self.latency.command)
+        self.calls["script"] += 1
+        self.scripts.append((script, args))
+
+    def find_element(self, by: str, value: str) -> ReplayElement:
+        self._wait(self.latency.find_element)
+        if self._random.random() < self.missing_element_rate:
+            raise NoSuchElementException(f"Replay element not found: {value}")
+        return ReplayElement(self, (by, value))
+
+    def get_clipboard_text(self) -> str:
+        self._wait(self.latency.command)
+        return next(self._links) or ""
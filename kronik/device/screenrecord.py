@@ -0,0 +1,447 @@
+"""
+kronik/device/screenrecord.py
+
+Screen recording backends with the start/stop API of `kronik.device.commands`.
+
+`AppiumRecorder` goes through Appium, which returns the whole video base64-encoded in one
+HTTP response. `AdbRecorder` runs `screenrecord` on the device itself, back to back in
+segments of up to `segment_seconds`. Finished segments are streamed to the session directory
+with `adb exec-out` as raw bytes while recording continues, and deleted from the device.
+Stopping finalizes the current segment and joins the segments into one file.
+
+`SessionRecorder` never stops between videos. It streams one recording for the whole session
+and cuts a clip per video out of it at the times the feed was scrolled.
+
+`screenrecord` captures video only. Clips from `AdbRecorder` and `SessionRecorder` are silent,
+so the LLM analyzes them without their audio and local transcripts for reuse are empty. Use
+`AppiumRecorder`, which records with audio, when the sound matters.
+"""
+
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Protocol
+
+import ffmpeg
+from appium.webdriver import Remote
+
+from kronik.device.commands import start_screenrecord, stop_screenrecord
+from kronik.device.shell import AdbShell, AdbShellError
+from kronik.logger import commands_logger as logger
+from kronik.metrics import span, timed
+from kronik.session import Session, get_session_dir
+from kronik.utils.av import concat_clips, cut_clip
+
+# screenrecord stops by itself after at most three minutes
+MAX_SEGMENT_SECONDS = 180
+
+
+class ScreenRecorder(Protocol):
+    def start_screenrecord(self, session: Session) -> Path | None: ...
+
+    def stop_screenrecord(self, session: Session, filepath: Path | None = None) -> Path | None: ...
+
+    def scrolled(self) -> None:
+        """The feed moved on to the next video."""
+
+    def close(self) -> None:
+        """Stop anything still recording at the end of the session."""
+
+
+class AppiumRecorder:
+    """Records through Appium with `kronik.device.commands`."""
+
+    def __init__(self, driver: Remote):
+        self.driver = driver
+
+    def start_screenrecord(self, session: Session) -> Path | None:
+        return start_screenrecord(self.driver, session)
+
+    def stop_screenrecord(self, session: Session, filepath: Path | None = None) -> Path | None:
+        return stop_screenrecord(self.driver, session, filepath)
+
+    def scrolled(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class Segment:
+    """A finished segment pulled from the device."""
+
+    index: int
+    path: Path
+    bytes: int
+
+
+@dataclass
+class Recording:
+    """State of the recording in progress."""
+
+    run_id: str
+    started_at: float
+    loop_pid: str
+    segments: list[Segment] = field(default_factory=list)
+
+
+def _recording_fp(session: Session) -> Path:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return get_session_dir(session.id).joinpath(f"recording_{timestamp}.mp4")
+
+
+class AdbRecorder:
+    """
+    Records with `screenrecord` on the device and pulls the video over `adb exec-out`.
+    The clips have no audio.
+
+    Args:
+        shell: Persistent shell on the device to record
+        segment_seconds: Length of each segment, at most three minutes
+        bit_rate: Video bit rate in bits per second
+        size: Video size such as "720x1280". The screen size if None.
+        remote_dir: Directory on the device for segments being recorded
+        poll_seconds: How often finished segments are looked for while recording
+    """
+
+    def __init__(
+        self,
+        shell: AdbShell,
+        segment_seconds: int = MAX_SEGMENT_SECONDS,
+        bit_rate: int = 8_000_000,
+        size: str | None = None,
+        remote_dir: str = "/sdcard/kronik",
+        poll_seconds: float = 1.0,
+    ):
+        self.shell = shell
+        self.segment_seconds = min(segment_seconds, MAX_SEGMENT_SECONDS)
+        self.bit_rate = bit_rate
+        self.size = size
+        self.remote_dir = remote_dir.rstrip("/")
+        self.poll_seconds = poll_seconds
+        self.recording: Recording | None = None
+        self._segments_dir: Path | None = None
+        self._stop_polling = threading.Event()
+        self._poller: threading.Thread | None = None
+        self._pull_lock = threading.Lock()
+
+    @property
+    def is_recording(self) -> bool:
+        return self.recording is not None
+
+    def _remote(self, run_id: str, index: int | str) -> str:
+        return f"{self.remote_dir}/{run_id}_{index}.mp4"
+
+    @timed("commands.start_screenrecord")
+    def start_screenrecord(self, session: Session) -> Path | None:
+        """
+        Start recording in segments on the device.
+
+        Returns:
+            Path: Recording filepath or None if recording is already in progress
+        """
+        if self.is_recording:
+            logger.warning("Screen recording is already in progress")
+            return None
+
+        filepath = _recording_fp(session)
+        run_id = uuid.uuid4().hex[:12]
+        options = f"--bit-rate {self.bit_rate} --time-limit {self.segment_seconds}"
+        if self.size:
+            options += f" --size {self.size}"
+
+        logger.info("Starting native screen recording: %s", filepath.name)
+        # Segments are recorded back to back until the loop is killed
+        result = self.shell.run(
+            f"mkdir -p {self.remote_dir}; "
+            f"(i=0; while screenrecord {options} {self._remote(run_id, '$i')}; "
+            f"do i=$((i + 1)); done) >/dev/null 2>&1 & echo $!"
+        )
+        if not result.ok:
+            raise RuntimeError(f"Failed to start screenrecord: {result.output}")
+
+        self.recording = Recording(run_id, time.time(), result.output.strip().splitlines()[-1])
+        self._segments_dir = get_session_dir(session.id).joinpath(".segments")
+        self._segments_dir.mkdir(parents=True, exist_ok=True)
+        self._stop_polling.clear()
+        self._poller = threading.Thread(target=self._poll, name="screenrecord-pull", daemon=True)
+        self._poller.start()
+        return filepath
+
+    def _list_segments(self) -> list[int]:
+        """Indexes of the segments of this recording still on the device, in order."""
+        prefix = f"{self.remote_dir}/{self.recording.run_id}_"
+        output = self.shell.run(f"ls {prefix}*.mp4 2>/dev/null").output
+        return sorted(
+            int(line[len(prefix) : -len(".mp4")])
+            for line in output.splitlines()
+            if line.startswith(prefix)
+        )
+
+    def _pull(self, index: int) -> Segment:
+        """Stream a finished segment to the session directory and delete it on the device."""
+        remote = self._remote(self.recording.run_id, index)
+        local = self._segments_dir.joinpath(f"{self.recording.run_id}_{index:05d}.mp4")
+        target = ["-s", self.shell.serial] if self.shell.serial else []
+        with span("commands.pull_segment"), open(local, "wb") as f:
+            subprocess.run(
+                [self.shell.adb_path, *target, "exec-out", "cat", remote], stdout=f, check=True
+            )
+        self.shell.run(f"rm -f {remote}")
+        segment = Segment(index, local, local.stat().st_size)
+        self.recording.segments.append(segment)
+        logger.debug("Pulled segment %d (%d bytes)", index, segment.bytes)
+        return segment
+
+    def pull_finished(self) -> list[Segment]:
+        """Pull every segment except the one being recorded."""
+        with self._pull_lock:
+            if self.recording is None:
+                return []
+            return [self._pull(index) for index in self._list_segments()[:-1]]
+
+    def _poll(self) -> None:
+        while not self._stop_polling.wait(self.poll_seconds):
+            try:
+                self.pull_finished()
+            except Exception as e:
+                logger.warning(f"Failed to pull screen recording segment: {str(e)}")
+
+    @timed("commands.stop_screenrecord")
+    def stop_screenrecord(self, session: Session, filepath: Path | None = None) -> Path | None:
+        """
+        Stop recording, pull the remaining segments and join them into `filepath`.
+
+        Returns:
+            Path | None: Saved recording filepath or None
+        """
+        if not self.is_recording:
+            logger.warning("No screen recording in progress")
+            return None
+
+        filepath = Path(filepath) if filepath else _recording_fp(session)
+        logger.info("Stopping native screen recording: %s", filepath)
+        self._stop_polling.set()
+        self._poller.join()
+
+        try:
+            with span("commands.stop_recording_screen"):
+                # Stop starting segments, then let screenrecord finish the current file
+                pid = self.recording.loop_pid
+                self.shell.run(
+                    f"kill {pid}; pkill -INT -f {self.recording.run_id}; "
+                    f"while pgrep -f {self.recording.run_id} >/dev/null; do sleep 0.05; done",
+                    timeout=15,
+                )
+            with self._pull_lock:
+                for index in self._list_segments():
+                    self._pull(index)
+                segments = [segment.path for segment in self.recording.segments]
+            if not segments:
+                raise RuntimeError("screenrecord produced no video")
+            with span("commands.write_recording"):
+                concat_clips(segments, filepath)
+            logger.debug("Screen recording saved: %s", filepath)
+            return filepath
+        finally:
+            for segment in self.recording.segments:
+                segment.path.unlink(missing_ok=True)
+            self.recording = None
+
+    def scrolled(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """Kill a recording that was never stopped and drop its segments."""
+        if not self.is_recording:
+            return
+        self._stop_polling.set()
+        self._poller.join()
+        self.shell.run(f"kill {self.recording.loop_pid}; pkill -f {self.recording.run_id}")
+        for segment in self.recording.segments:
+            segment.path.unlink(missing_ok=True)
+        self.recording = None
+
+
+class SessionRecorder:
+    """
+    Records the whole session as one stream and cuts a clip per video out of it.
+    The clips have no audio.
+
+    `screenrecord` writes raw H.264 to stdout, back to back in runs of three minutes, and
+    `adb exec-out` streams it to ffmpeg on the host. ffmpeg stamps each frame with the host
+    clock as it arrives and copies it into a Matroska file without re-encoding. Recording never
+    pauses between videos, and clips are cut from the file with stream copies between the
+    times the feed was scrolled.
+
+    Args:
+        shell: Persistent shell on the device to record
+        bit_rate: Video bit rate in bits per second
+        size: Video size such as "720x1280". The screen size if None.
+        latency: Seconds for frames to reach the file. Clips end this long before they are
+            stopped.
+        keep: Keep the session recording after `close`
+        ffmpeg_path: ffmpeg executable
+    """
+
+    def __init__(
+        self,
+        shell: AdbShell,
+        bit_rate: int = 4_000_000,
+        size: str | None = None,
+        latency: float = 0.3,
+        keep: bool = False,
+        ffmpeg_path: str = "ffmpeg",
+    ):
+        self.shell = shell
+        self.bit_rate = bit_rate
+        self.size = size
+        self.latency = latency
+        self.keep = keep
+        self.ffmpeg_path = ffmpeg_path
+        self.filepath: Path | None = None
+        self.clips = 0
+        self._tag = f"kronik_{uuid.uuid4().hex[:12]}"
+        self._adb: subprocess.Popen | None = None
+        self._ffmpeg: subprocess.Popen | None = None
+        self._started_at: float | None = None
+        self._stream_start: float | None = None
+        self._video_start: float | None = None
+        self._clip_start: float | None = None
+
+    @property
+    def is_recording(self) -> bool:
+        return self._ffmpeg is not None and self._ffmpeg.poll() is None
+
+    def _start_stream(self, session: Session) -> None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.filepath = get_session_dir(session.id).joinpath(f"session_{timestamp}.mkv")
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        options = f"--output-format=h264 --bit-rate {self.bit_rate} --time-limit 180"
+        if self.size:
+            options += f" --size {self.size}"
+        # The tag names the loop's shell, so it can be found and killed on the device
+        loop = f"while screenrecord {options} -; do :; done"
+        target = ["-s", self.shell.serial] if self.shell.serial else []
+        self._adb = subprocess.Popen(
+            [self.shell.adb_path, *target, "exec-out", f"sh -c {shlex.quote(loop)} {self._tag}"],
+            stdout=subprocess.PIPE,
+        )
+        args = (
+            ffmpeg.input(
+                "pipe:",
+                format="h264",
+                fflags="nobuffer",
+                probesize=32,
+                analyzeduration=0,
+                use_wallclock_as_timestamps=1,
+            )
+            .output(
+                str(self.filepath),
+                format="matroska",
+                c="copy",
+                copyts=None,
+                flush_packets=1,
+                cluster_time_limit=100,
+            )
+            .global_args("-loglevel", "error")
+            .overwrite_output()
+            .compile(cmd=self.ffmpeg_path)
+        )
+        self._ffmpeg = subprocess.Popen(args, stdin=self._adb.stdout)
+        # ffmpeg holds the read end of the pipe now
+        self._adb.stdout.close()
+        self._started_at = time.time()
+        logger.info("Started session recording: %s", self.filepath.name)
+
+    def _offset(self, at: float) -> float:
+        """Position in the session recording of the host time `at`."""
+        # Frames keep their host timestamps, so the file starts at its first frame's time
+        deadline = time.monotonic() + 10
+        while self._stream_start is None:
+            try:
+                self._stream_start = float(ffmpeg.probe(str(self.filepath))["format"]["start_time"])
+            except (ffmpeg.Error, KeyError):
+                if time.monotonic() > deadline:
+                    raise RuntimeError("The session recording has no frames")
+                time.sleep(0.1)
+        return at - self._stream_start
+
+    @timed("commands.start_screenrecord")
+    def start_screenrecord(self, session: Session) -> Path | None:
+        """
+        Start a clip of the current video, starting the session recording if needed.
+
+        The clip starts where the feed was last scrolled, or where the recording started.
+
+        Returns:
+            Path: Clip filepath or None if a clip is already in progress
+        """
+        if self._clip_start is not None:
+            logger.warning("Screen recording is already in progress")
+            return None
+        if not self.is_recording:
+            self._start_stream(session)
+            self._video_start = self._started_at
+        self._clip_start = self._video_start
+        return _recording_fp(session)
+
+    def scrolled(self) -> None:
+        """Mark the start of the next video."""
+        self._video_start = time.time()
+
+    @timed("commands.stop_screenrecord")
+    def stop_screenrecord(self, session: Session, filepath: Path | None = None) -> Path | None:
+        """
+        Cut the current video from the session recording, which keeps going.
+
+        Returns:
+            Path | None: Saved clip filepath or None
+        """
+        stopped_at = time.time()
+        if self._clip_start is None:
+            logger.warning("No screen recording in progress")
+            return None
+        start, self._clip_start = self._clip_start, None
+        if not self.is_recording:
+            raise RuntimeError("The session recording stopped")
+
+        filepath = Path(filepath) if filepath else _recording_fp(session)
+        # Frames reach the file a moment after they are shown, so the clip ends that much
+        # earlier instead of waiting for them
+        end = max(stopped_at - self.latency, start + 0.1)
+        time.sleep(max(0.0, end + self.latency - time.time()))
+        with span("commands.cut_clip"):
+            cut_clip(self.filepath, filepath, self._offset(start), self._offset(end))
+        self.clips += 1
+        logger.debug("Clip saved: %s (%.1f s)", filepath, end - start)
+        return filepath
+
+    def close(self) -> None:
+        """Stop the session recording and delete it unless `keep` is set."""
+        if self._ffmpeg is None:
+            return
+        try:
+            self.shell.run(f"pkill -f {self._tag}")
+        except AdbShellError as e:
+            logger.warning(f"Failed to stop screenrecord: {str(e)}")
+        # ffmpeg finishes the file when the stream ends
+        self._adb.terminate()
+        self._adb.wait()
+        try:
+            self._ffmpeg.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._ffmpeg.kill()
+            self._ffmpeg.wait()
+        self._adb = self._ffmpeg = None
+        self._clip_start = self._stream_start = None
+        logger.info("Stopped session recording after %d clips", self.clips)
+        if not self.keep:
+            self.filepath.unlink(missing_ok=True)
@@ -0,0 +1,163 @@
+"""
+kronik/device/screenshots.py
+
+Screenshots taken into memory and saved small, off the control loop.
+
+`get_screenshot_as_file` writes a full-resolution PNG on every call, which is large and slow
+to encode. `ScreenshotStore` keeps the PNG bytes Appium returns in memory for the caller, and
+a worker thread downscales, encodes and writes the ones worth keeping: every Nth screenshot,
+and only if it differs enough from the last one saved.
+"""
+
+import io
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from appium.webdriver import Remote
+
+from kronik.logger import commands_logger as logger
+from kronik.metrics import timed
+from kronik.session import Session, get_session_dir
+
+# Pillow format names and file suffixes
+FORMATS = {"webp": ("WEBP", ".webp"), "jpeg": ("JPEG", ".jpg"), "png": ("PNG", ".png")}
+
+
+@dataclass
+class Screenshot:
+    """A screenshot in memory. `saved` resolves to its file, or None if it was not kept."""
+
+    png: bytes
+    taken_at: datetime
+    saved: Future = field(repr=False)
+
+
+@dataclass
+class ScreenshotStats:
+    taken: int = 0
+    saved: int = 0
+    skipped: int = 0
+    bytes_saved: int = 0
+    encode_seconds: float = 0.0
+
+
+def _thumbnail(image) -> np.ndarray:
+    """16x16 grayscale thumbnail with values from 0 to 1, for change detection."""
+    return np.asarray(image.convert("L").resize((16, 16)), dtype=np.float32) / 255.0
+
+
+class ScreenshotStore:
+    """
+    Takes screenshots into memory and saves them in a worker thread.
+
+    Args:
+        session: Session whose directory the screenshots are saved to
+        format: "webp", "jpeg" or "png"
+        quality: Encoder quality from 1 to 100. Ignored for PNG.
+        max_side: Downscale so the longer side is at most this many pixels. Full size if None.
+        every: Keep only every Nth screenshot
+        min_change: Keep a screenshot only if its mean difference from the last one kept,
+            from 0 to 1, is larger than this
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        format: str = "webp",
+        quality: int = 80,
+        max_side: int | None = 720,
+        every: int = 1,
+        min_change: float = 0.0,
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {format}")
+        self.session = session
+        self.format = format
+        self.quality = quality
+        self.max_side = max_side
+        self.every = max(every, 1)
+        self.min_change = min_change
+        self.stats = ScreenshotStats()
+        self._last_kept: np.ndarray | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshots")
+
+    @timed("commands.screenshot")
+    def capture(self, driver: Remote) -> Screenshot:
+        """
+        Take a screenshot and queue it to be saved.
+
+        Returns:
+            Screenshot: The PNG bytes, available right away
+        """
+        png = driver.get_screenshot_as_png()
+        taken_at = datetime.now()
+        self.stats.taken += 1
+        if (self.stats.taken - 1) % self.every:
+            self.stats.skipped += 1
+            saved = Future()
+            saved.set_result(None)
+        else:
+            saved = self._executor.submit(self._save, png, taken_at)
+        return Screenshot(png, taken_at, saved)
+
+    def _save(self, png: bytes, taken_at: datetime) -> Path | None:
+        try:
+            return self._encode(png, taken_at)
+        except Exception as e:
+            logger.error(f"Failed to save screenshot: {str(e)}")
+            return None
+
+    def _encode(self, png: bytes, taken_at: datetime) -> Path | None:
+        from PIL import Image
+
+        start = time.perf_counter()
+        with Image.open(io.BytesIO(png)) as image:
+            image.load()
+            if self.min_change > 0:
+                thumbnail = _thumbnail(image)
+                if (
+                    self._last_kept is not None
+                    and np.abs(thumbnail - self._last_kept).mean() <= self.min_change
+                ):
+                    self.stats.skipped += 1
+                    return None
+                self._last_kept = thumbnail
+
+            if self.max_side and max(image.size) > self.max_side:
+                # An integer box reduction first is much cheaper than resampling the full image
+                factor = max(image.size) // self.max_side
+                if factor > 1:
+                    image = image.reduce(factor)
+                image.thumbnail((self.max_side, self.max_side), Image.Resampling.BILINEAR)
+            pil_format, suffix = FORMATS[self.format]
+            if pil_format == "JPEG" and image.mode != "RGB":
+                image = image.convert("RGB")
+
+            timestamp = taken_at.strftime("%Y%m%d_%H%M%S_%f")
+            filepath = get_session_dir(self.session.id).joinpath(f"screenshot_{timestamp}{suffix}")
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            options = {} if pil_format == "PNG" else {"quality": self.quality}
+            if pil_format == "WEBP":
+                # The fastest WebP method, a quarter of the default's time for slightly larger files
+                options["method"] = 0
+            image.save(filepath, pil_format, **options)
+
+        self.stats.saved += 1
+        self.stats.bytes_saved += filepath.stat().st_size
+        self.stats.encode_seconds += time.perf_counter() - start
+        logger.debug("Saved screenshot: %s", filepath.name)
+        return filepath
+
+    def close(self) -> None:
+        """Wait for queued screenshots to be saved."""
+        self._executor.shutdown(wait=True)
+        logger.info(
+            "Saved %d of %d screenshots (%d KiB)",
+            self.stats.saved,
+            self.stats.taken,
+            self.stats.bytes_saved // 1024,
+        )
@@ -0,0 +1,203 @@
+"""
+kronik/device/shell.py
+
+A persistent `adb shell` per device for frequent, low-latency device commands.
+
+Spawning `adb shell <command>` costs a process start and an adb handshake on every call, and
+Appium gestures go through HTTP and the W3C actions stack. `AdbShell` keeps one shell open and
+writes commands to its stdin. Each command is followed by a line with a random marker and its
+exit code, so the output of a command ends at the marker line. Appium stays in charge of the
+UI tree (finding elements, the share sheet, the clipboard).
+"""
+
+import os
+import selectors
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from kronik.logger import setup_logger
+from kronik.metrics import timed
+
+logger = setup_logger("kronik.shell")
+
+
+class AdbShellError(Exception):
+    """The shell exited or a command timed out"""
+
+
+@dataclass
+class ShellResult:
+    output: str
+    code: int
+
+    @property
+    def ok(self) -> bool:
+        return self.code == 0
+
+
+class AdbShell:
+    """
+    One long-lived `adb shell` session.
+
+    Commands are serialized, so one shell can be shared by threads. Use it as a context
+    manager or call `open` and `close`.
+
+    Args:
+        serial: Device to open the shell on. The only attached device if None.
+        adb_path: adb executable
+        timeout: Default seconds to wait for a command to finish
+    """
+
+    def __init__(self, serial: str | None = None, adb_path: str = "adb", timeout: float = 10):
+        self.serial = serial
+        self.adb_path = adb_path
+        self.timeout = timeout
+        self._process: subprocess.Popen | None = None
+        self._selector: selectors.BaseSelector | None = None
+        self._buffer = b""
+        self._marker = f"__kronik_{uuid.uuid4().hex}__".encode()
+        self._lock = threading.Lock()
+        self._window_size: tuple[int, int] | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def open(self) -> "AdbShell":
+        if self.is_open:
+            return self
+        target = ["-s", self.serial] if self.serial else []
+        self._process = subprocess.Popen(
+            [self.adb_path, *target, "shell"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+        )
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._process.stdout, selectors.EVENT_READ)
+        self._buffer = b""
+        logger.debug("Opened adb shell on %s", self.serial or "the default device")
+        return self
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.write(b"exit\n")
+            self._process.stdin.close()
+            self._process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+            self._process.wait()
+        self._selector.close()
+        # Closing stdin again is a no-op, and a killed shell may still have it open
+        self._process.stdin.close()
+        self._process.stdout.close()
+        self._process = None
+
+    def __enter__(self) -> "AdbShell":
+        return self.open()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _read_until_marker(self, deadline: float) -> tuple[bytes, int]:
+        fd = self._process.stdout.fileno()
+        while True:
+            # The marker line `\n<marker> <code>\n` follows the output
+            index = self._buffer.find(b"\n" + self._marker)
+            if index != -1:
+                end = self._buffer.find(b"\n", index + 1)
+                if end != -1:
+                    output = self._buffer[:index]
+                    code = int(self._buffer[index + 1 + len(self._marker) : end])
+                    self._buffer = self._buffer[end + 1 :]
+                    return output, code
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._selector.select(remaining):
+                raise AdbShellError("Timed out waiting for the adb shell")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise AdbShellError("The adb shell exited")
+            self._buffer += chunk
+
+    def run(self, command: str, timeout: float | None = None) -> ShellResult:
+        """
+        Run a shell command on the device.
+
+        Args:
+            command: Shell command line. stderr is merged into the output.
+            timeout: Seconds to wait. Defaults to the shell's timeout.
+
+        Returns:
+            ShellResult: Output without the trailing newline and the exit code
+
+        Raises:
+            AdbShellError: If the shell exited or the command timed out. The shell is closed
+                then, and reopened by the next command.
+        """
+        with self._lock:
+            if not self.is_open:
+                self.open()
+            deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+            try:
+                self._process.stdin.write(
+                    b"{ %s\n} </dev/null 2>&1; printf '\\n%%s %%d\\n' %s $?\n"
+                    % (command.encode(), self._marker)
+                )
+                output, code = self._read_until_marker(deadline)
+            except (AdbShellError, OSError) as exc:
+                self.close()
+                raise AdbShellError(f"{command!r} failed: {exc}") from exc
+        return ShellResult(output.decode(errors="replace").rstrip("\n"), code)
+
+    # Device commands
+
+    def getprop(self, name: str) -> str:
+        return self.run(f"getprop {shlex.quote(name)}").output.strip()
+
+    def is_booted(self) -> bool:
+        try:
+            return self.getprop("sys.boot_completed") == "1"
+        except AdbShellError:
+            return False
+
+    def window_size(self) -> tuple[int, int]:
+        """
+        Screen width and height in pixels, read once per shell.
+
+        Raises:
+            AdbShellError: If `wm size` failed or its output has no size
+        """
+        if self._window_size is None:
+            output = self.run("wm size").output
+            try:
+                # An override size, if set, is listed after the physical size and takes effect
+                size = output.strip().splitlines()[-1].rsplit(":", 1)[-1].strip()
+                width, height = size.split("x")
+                self._window_size = int(width), int(height)
+            except (IndexError, ValueError) as exc:
+                raise AdbShellError(f"Unexpected 'wm size' output: {output!r}") from exc
+        return self._window_size
+
+    @timed("shell.tap")
+    def tap(self, x: int, y: int) -> None:
+        self._input(f"input tap {x} {y}")
+
+    @timed("shell.swipe")
+    def swipe(self, start: tuple[int, int], end: tuple[int, int], duration_ms: int = 150) -> None:
+        self._input(f"input swipe {start[0]} {start[1]} {end[0]} {end[1]} {duration_ms}")
+
+    def keyevent(self, keycode: int) -> None:
+        self._input(f"input keyevent {keycode}")
+
+    def _input(self, command: str) -> None:
+        result = self.run(command)
+        if not result.ok:
+            raise AdbShellError(f"{command!r} exited with {result.code}: {result.output}")
@@ -0,0 +1,175 @@
+"""
+kronik/device/startup.py
+
+Async startup of the Android emulator and the Appium server, used by `kronik.device.pool`.
+
+Both are launched without waiting and awaited with event-driven readiness checks instead of
+fixed sleeps:
+
+- The emulator is ready once `adb wait-for-device` returns and a loop running on the device
+  sees `sys.boot_completed` flip to 1.
+- Appium is ready as soon as its log announces the HTTP listener, or a short-interval
+  `/status` probe succeeds, whichever happens first.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+
+import requests
+
+from kronik.logger import setup_logger
+
+logger = setup_logger("kronik.startup")
+
+# Runs on the device so boot completion is watched without spawning adb once per poll
+_BOOT_WATCH = 'while [ "$(getprop sys.boot_completed)" != "1" ]; do sleep 0.2; done'
+
+# Logged by Appium 2 once the server accepts sessions
+_APPIUM_READY = b"listener started"
+
+
+@dataclass
+class DeviceProcesses:
+    emulator: asyncio.subprocess.Process | None = None
+    appium: asyncio.subprocess.Process | None = None
+    _tasks: list[asyncio.Task] = field(default_factory=list)
+
+    def terminate(self) -> None:
+        """Stop the processes started here."""
+        for task in self._tasks:
+            task.cancel()
+        for process in (self.appium, self.emulator):
+            if process is not None and process.returncode is None:
+                process.terminate()
+
+
+async def adb(
+    *args: str, adb_path: str = "adb", serial: str | None = None, timeout: float | None = None
+) -> tuple[int, bytes]:
+    """Run an adb command, against `serial` if given. Returns its exit code and stdout."""
+    target = ("-s", serial) if serial else ()
+    process = await asyncio.create_subprocess_exec(
+        adb_path,
+        *target,
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        out, _ = await asyncio.wait_for(process.communicate(), timeout)
+    except TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    return process.returncode, out
+
+
+async def is_emulator_booted(adb_path: str = "adb", serial: str | None = None) -> bool:
+    """Check once whether a device is attached and fully booted."""
+    try:
+        code, out = await adb(
+            "shell", "getprop", "sys.boot_completed", adb_path=adb_path, serial=serial, timeout=5
+        )
+    except (TimeoutError, FileNotFoundError):
+        return False
+    return code == 0 and out.strip() == b"1"
+
+
+async def wait_for_emulator(adb_path: str = "adb", serial: str | None = None) -> None:
+    """Wait until a device is attached and has finished booting."""
+    await adb("wait-for-device", adb_path=adb_path, serial=serial)
+    logger.debug("Device attached, waiting for boot to complete")
+    # The shell can drop while the system restarts during boot, so re-enter until it succeeds
+    while (await adb("shell", _BOOT_WATCH, adb_path=adb_path, serial=serial))[0] != 0:
+        await asyncio.sleep(0.2)
+
+
+def _appium_status_ok(url: str) -> bool:
+    try:
+        return requests.get(f"{url}/status", timeout=1).status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+
+async def is_appium_responsive(url: str) -> bool:
+    """Check once whether the Appium server answers `/status`."""
+    return await asyncio.to_thread(_appium_status_ok, url)
+
+
+async def _watch_log(stream: asyncio.StreamReader, ready: asyncio.Event) -> None:
+    # Keep draining after the ready line so a full pipe never stalls the server
+    while line := await stream.readline():
+        if not ready.is_set() and _APPIUM_READY in line:
+            ready.set()
+
+
+async def _probe_status(url: str, ready: asyncio.Event, interval: float) -> None:
+    while not ready.is_set():
+        if await is_appium_responsive(url):
+            ready.set()
+            return
+        await asyncio.sleep(interval)
+
+
+async def wait_for_appium(
+    url: str,
+    stream: asyncio.StreamReader | None = None,
+    interval: float = 0.25,
+    tasks: list[asyncio.Task] | None = None,
+) -> None:
+    """
+    Wait until the Appium server is ready, from its log `stream` or by probing `url`.
+
+    The log watcher keeps running to drain the stream; it is appended to `tasks` if given.
+    """
+    ready = asyncio.Event()
+    probe = asyncio.create_task(_probe_status(url, ready, interval))
+    if stream is not None:
+        watcher = asyncio.create_task(_watch_log(stream, ready))
+        if tasks is not None:
+            tasks.append(watcher)
+    try:
+        await ready.wait()
+    finally:
+        probe.cancel()
+
+
+async def start_emulator(
+    avd: str,
+    emulator_path: str = "emulator",
+    port: int | None = None,
+    snapshot: str | None = None,
+) -> asyncio.subprocess.Process:
+    """
+    Launch an emulator without waiting for it to boot.
+
+    Args:
+        avd: Name of the virtual device
+        emulator_path: Emulator executable
+        port: Console port. The device is then `emulator-<port>` in adb.
+        snapshot: Boot from this snapshot, falling back to a cold boot if it does not exist.
+            The snapshot is left as it is on exit.
+    """
+    args = ["-avd", avd]
+    if port is not None:
+        args += ["-port", str(port)]
+    if snapshot:
+        args += ["-snapshot", snapshot, "-no-snapshot-save"]
+    logger.info("Starting Android emulator %s", avd)
+    return await asyncio.create_subprocess_exec(
+        emulator_path,
+        *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+
+
+async def start_appium(port: str, appium_path: str = "appium") -> asyncio.subprocess.Process:
+    logger.info("Starting Appium server on port %s", port)
+    return await asyncio.create_subprocess_exec(
+        appium_path,
+        "--port",
+        port,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
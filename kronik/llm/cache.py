@@ -0,0 +1,137 @@
+"""
+kronik/llm/cache.py
+
+Provider-side caching of large, shared system prompts.
+
+Gemini context caching stores a system instruction once and lets later calls refer to it by
+name, so the prompt's tokens are not sent and billed in full on every call. `PromptCache` keeps
+one cache per model and prompt text, recreates it before it expires, and falls back to sending
+the system instruction when caching is not available.
+
+Caches have a minimum size per model, 32,768 tokens for the Gemini 1.5 models. Prompts
+estimated to be smaller are never sent to `caches.create`, which would only fail. The analysis
+prompt is about 1.6k tokens, so with `gemini-1.5-flash-8b` nothing is cached and nothing is
+saved: the prompt is sent with every call, as before caching.
+"""
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from hashlib import sha256
+
+from kronik.llm.client import get_client
+from kronik.logger import setup_logger
+from kronik.metrics import span
+
+logger = setup_logger("llm")
+
+# Fewest tokens a context cache may hold, by model. Other models are tried as they are.
+MIN_CACHE_TOKENS = {
+    "gemini-1.5-flash-8b": 32_768,
+    "gemini-1.5-flash": 32_768,
+    "gemini-1.5-pro": 32_768,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of `text`, at about four characters per token."""
+    return len(text) // 4
+
+
+@dataclass
+class _Entry:
+    name: str | None
+    expires_at: float
+
+
+class PromptCache:
+    """
+    Gemini context caches of system prompts, shared by every call that uses the same prompt.
+
+    Args:
+        ttl: Seconds a cache lives on the provider
+        refresh: Recreate a cache this many seconds before it expires
+        retry_after: Seconds to send the full prompt after creating a cache failed
+        min_tokens: Fewest tokens a cache may hold, by model. Defaults to `MIN_CACHE_TOKENS`.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        refresh: float = 60.0,
+        retry_after: float = 600.0,
+        min_tokens: dict[str, int] | None = None,
+    ):
+        self.ttl = ttl
+        self.refresh = refresh
+        self.retry_after = retry_after
+        self.min_tokens = MIN_CACHE_TOKENS if min_tokens is None else min_tokens
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[tuple[int, str, str], _Entry] = {}
+        self._locks: dict[tuple[int, str, str], asyncio.Lock] = {}
+
+    @staticmethod
+    def _key(model: str, system_instruction: str) -> tuple[int, str, str]:
+        # Caches belong to the client's project, so a replaced client starts without any
+        return id(get_client()), model, sha256(system_instruction.encode()).hexdigest()
+
+    async def get(self, model: str, system_instruction: str) -> str | None:
+        """
+        Name of a cache holding `system_instruction` for `model`, creating it if needed.
+
+        Returns:
+            str | None: Cache name, or None to send the system instruction instead
+        """
+        key = self._key(model, system_instruction)
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at - self.refresh <= time.time():
+            # Concurrent calls wait for one cache to be created instead of each creating one
+            async with self._locks.setdefault(key, asyncio.Lock()):
+                entry = self._entries.get(key)
+                if entry is None or entry.expires_at - self.refresh <= time.time():
+                    entry = await self._create(model, system_instruction, key[2][:12])
+                    self._entries[key] = entry
+
+        if entry.name is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry.name
+
+    async def _create(self, model: str, system_instruction: str, digest: str) -> _Entry:
+        from google.genai.types import CreateCachedContentConfig
+
+        tokens, minimum = estimate_tokens(system_instruction), self.min_tokens.get(model, 0)
+        if tokens < minimum:
+            # Too small to ever be cached, so do not try again
+            logger.info(
+                "Prompt of about %d tokens is below the %d-token cache minimum of %s, "
+                "sending it with each call",
+                tokens,
+                minimum,
+                model,
+            )
+            return _Entry(None, math.inf)
+
+        try:
+            with span("llm.cache_create"):
+                cached = await get_client().aio.caches.create(
+                    model=model,
+                    config=CreateCachedContentConfig(
+                        system_instruction=system_instruction,
+                        display_name=f"kronik-{digest}",
+                        ttl=f"{int(self.ttl)}s",
+                    ),
+                )
+        except Exception as e:
+            logger.warning(f"Context caching unavailable for {model}, sending the prompt: {e}")
+            return _Entry(None, time.time() + self.retry_after)
+
+        logger.info("Created context cache %s for %s", cached.name, model)
+        return _Entry(cached.name, time.time() + self.ttl)
+
+    def invalidate(self, model: str, system_instruction: str) -> None:
+        """Forget a cache the provider no longer has, so the next call recreates it."""
+        self._entries.pop(self._key(model, system_instruction), None)
@@ -1,10 +1,37 @@
 import os
-
-from google import genai
+from typing import TYPE_CHECKING
 
 from kronik.logger import setup_logger
 
+if TYPE_CHECKING:
+    from google import genai
+
 logger = setup_logger("llm")
 
-logger.debug("Initializing Google Gen AI Client")
-client = genai.Client(api_key=os.environ["GOOGLE_AI_API_KEY"])
+_client = None
+
+
+def get_client() -> "genai.Client":
+    """Get the shared Google Gen AI client, creating it on first use."""
+    global _client
+
+    if _client is None:
+        from google import genai
+
+        logger.debug("Initializing Google Gen AI Client")
+        _client = genai.Client(api_key=os.environ["GOOGLE_AI_API_KEY"])
+    return _client
+
+
+def set_client(client: "genai.Client | None") -> None:
+    """Replace the shared client, e.g. with a fake for offline runs. None resets it."""
+    global _client
+
+    _client = client
+
+
+def __getattr__(name: str):
+    # Keep `from kronik.llm.client import client` working without creating it at import time
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,147 @@
+"""
+kronik/llm/fake.py
+
+An offline stand-in for the Google Gen AI client.
+
+It returns canned `Analysis` JSON and deterministic embeddings with configurable
+latency and error rates, and keeps context caches like the provider does. Install it with
+`kronik.llm.client.set_client`.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import random
+from types import SimpleNamespace
+
+from kronik.models import Analysis, Category
+
+DEFAULT_ANALYSES = [
+    Analysis(
+        transcript="",
+        analysis="A person dancing to a popular song in a sunny park.",
+        tags=["dance", "outdoors", "sunny"],
+        category=Category.ENTERTAINMENT,
+        rating=4,
+        like=True,
+    ),
+    Analysis(
+        transcript="Check out this portable solar charger with a built-in flashlight.",
+        analysis="A fast-paced product showcase of a multifunctional gadget.",
+        tags=["gadget", "productreview", "tech"],
+        category=Category.TECH,
+        rating=3,
+        like=False,
+    ),
+]
+
+
+class FakeLLMError(Exception):
+    """Simulated provider error"""
+
+
+def _cache_not_found(name: str) -> Exception:
+    from google.genai.errors import ClientError
+
+    message = f"CachedContent not found: {name}"
+    return ClientError(404, {"error": {"code": 404, "message": message, "status": "NOT_FOUND"}})
+
+
+class _FakeModels:
+    def __init__(self, client: "FakeGenAIClient"):
+        self._client = client
+
+    async def generate_content(self, model: str, contents, config=None) -> SimpleNamespace:
+        cached = getattr(config, "cached_content", None)
+        if cached is not None and cached not in self._client.caches:
+            raise _cache_not_found(cached)
+        system_instruction = getattr(config, "system_instruction", None)
+        self._client.prompt_chars += len(system_instruction or "")
+        self._client.cached_calls += cached is not None
+        await self._client._respond()
+        text = next(self._client._analyses).model_dump_json()
+        part = SimpleNamespace(text=text)
+        candidate = SimpleNamespace(content=SimpleNamespace(parts=[part]))
+        return SimpleNamespace(text=text, candidates=[candidate])
+
+    async def embed_content(self, model: str, contents=None, content=None, config=None):
+        await self._client._respond()
+        texts = contents if contents is not None else content
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=self._client.embedding(text)) for text in texts]
+        )
+
+
+class _FakeCaches:
+    def __init__(self, client: "FakeGenAIClient"):
+        self._client = client
+
+    async def create(self, model: str, config=None) -> SimpleNamespace:
+        if not self._client.caching:
+            raise FakeLLMError("Simulated caching error")
+        name = f"cachedContents/{len(self._client.caches) + 1}"
+        self._client.caches[name] = config
+        return SimpleNamespace(name=name, model=model, display_name=config.display_name)
+
+    async def delete(self, name: str) -> None:
+        if self._client.caches.pop(name, None) is None:
+            raise _cache_not_found(name)
+
+
+class FakeGenAIClient:
+    """
+    Mimics `genai.Client.aio.models` for offline load tests.
+
+    Args:
+        analyses: Analyses returned in a loop. Defaults to `DEFAULT_ANALYSES`.
+        latency: Mean response latency in seconds
+        jitter: Extra uniformly distributed latency in seconds
+        error_rate: Probability that a call raises `FakeLLMError`
+        embedding_dim: Size of the returned embeddings
+        seed: Seed for latency jitter and errors
+        caching: Whether context caches can be created
+    """
+
+    def __init__(
+        self,
+        analyses: list[Analysis] | None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        embedding_dim: int = 768,
+        seed: int | None = None,
+        caching: bool = True,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.embedding_dim = embedding_dim
+        self.caching = caching
+        self.calls = 0
+        self.errors = 0
+        # Context caches by name, calls that used one and system instruction characters sent
+        self.caches: dict = {}
+        self.cached_calls = 0
+        self.prompt_chars = 0
+
+        self._analyses = itertools.cycle(analyses or DEFAULT_ANALYSES)
+        self._random = random.Random(seed)
+        self.aio = SimpleNamespace(models=_FakeModels(self), caches=_FakeCaches(self))
+
+    async def _respond(self) -> None:
+        self.calls += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._random.random() < self.error_rate:
+            self.errors += 1
+            raise FakeLLMError("Simulated LLM error")
+
+    def embedding(self, text: str) -> list[float]:
+        """A deterministic unit-length pseudo-embedding of `text`."""
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big")
+        rng = random.Random(seed)
+        values = [rng.gauss(0, 1) for _ in range(self.embedding_dim)]
+        norm = sum(value * value for value in values) ** 0.5
+        return [value / norm for value in values]
@@ -1,36 +1,157 @@
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
 from typing import Optional
 
 
-def setup_logger(name: str, level: Optional[int] = logging.DEBUG) -> logging.Logger:
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Hand records to the background listener without formatting them.
+
+    The stock QueueHandler formats in the calling thread so records can cross processes.
+    The queue here is in-process, so formatting is left to the listener thread.
+    """
+
+    direct = False
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not self.direct:
+            return super().emit(record)
+        # No listener thread (e.g. after a fork), so write synchronously
+        for handler in _listener.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(
+    logging.Formatter(
+        "[%(levelname)s] %(asctime)s - %(name)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+    )
+)
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_queue_handler = _QueueHandler(_queue)
+_listener = QueueListener(_queue, _console_handler, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+
+
+def _after_fork_in_child() -> None:
+    _queue_handler.direct = True
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+# Logger name prefix -> level, applied by longest matching prefix
+_default_level = logging.DEBUG
+_levels: dict[str, int] = {}
+_loggers: set[str] = set()
+
+
+def _level_for(name: str) -> int:
+    matches = [prefix for prefix in _levels if name == prefix or name.startswith(f"{prefix}.")]
+    return _levels[max(matches, key=len)] if matches else _default_level
+
+
+def setup_logger(name: str, level: Optional[int] = None) -> logging.Logger:
     """
     Set up a logger with a specific format and configuration.
 
+    Records are queued and written by a background thread, so logging does not block
+    on formatting or I/O. The level defaults to the configured level for `name`.
+
     Format: [LEVEL] timestamp - logger_name - message
     """
     logger = logging.getLogger(name)
     logger.propagate = False  # Prevent propagation to parent loggers
 
     if not logger.handlers:  # Avoid adding handlers multiple times
-        logger.setLevel(level)
+        logger.setLevel(level or _level_for(name))
+        logger.addHandler(_queue_handler)
+        if level is None:
+            _loggers.add(name)
 
-        # Create console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(level)
+    return logger
 
-        # Create formatter
-        formatter = logging.Formatter(
-            "[%(levelname)s] %(asctime)s - %(name)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-        )
 
-        # Add formatter to handler
-        console_handler.setFormatter(formatter)
+def _parse_level(value: str) -> int:
+    level = logging.getLevelName(value.strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {value}")
+    return level
 
-        # Add handler to logger
-        logger.addHandler(console_handler)
 
-    return logger
+def configure_logging(log_dir: Path | None = None) -> None:
+    """
+    Apply logging configuration from the environment.
+
+    KRONIK_LOG_LEVEL: default level, e.g. INFO
+    KRONIK_LOG_LEVELS: per-module levels, e.g. "kronik.brain=INFO,kronik.downloader=WARNING"
+    KRONIK_LOG_JSON: if set to 1, also write JSON lines to `log_dir`/kronik.jsonl with rotation
+    """
+    global _default_level
+
+    if os.environ.get("KRONIK_LOG_LEVEL"):
+        _default_level = _parse_level(os.environ["KRONIK_LOG_LEVEL"])
+    for entry in filter(None, os.environ.get("KRONIK_LOG_LEVELS", "").split(",")):
+        prefix, _, value = entry.partition("=")
+        _levels[prefix.strip()] = _parse_level(value)
+
+    for name in _loggers:
+        logging.getLogger(name).setLevel(_level_for(name))
+
+    if log_dir is not None and os.environ.get("KRONIK_LOG_JSON", "").lower() in ("1", "true"):
+        add_json_log(log_dir.joinpath("kronik.jsonl"))
+
+
+def add_json_log(
+    fp: Path, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5
+) -> RotatingFileHandler:
+    """Write every record as a JSON line to `fp`, rotating at `max_bytes`."""
+    fp.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(fp, maxBytes=max_bytes, backupCount=backup_count)
+    handler.setFormatter(JsonFormatter())
+    _listener.handlers = (*_listener.handlers, handler)
+    return handler
+
+
+def remove_handler(handler: logging.Handler) -> None:
+    """Detach a handler added to the background listener and close it."""
+    flush_logs()
+    _listener.handlers = tuple(h for h in _listener.handlers if h is not handler)
+    handler.close()
+
+
+def flush_logs() -> None:
+    """Block until every queued record has been written."""
+    if _queue_handler.direct:
+        return
+    _listener.stop()
+    _listener.start()
 
 
 # Create main application logger
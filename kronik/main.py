@@ -1,163 +1,168 @@
 """
 main.py
 
-Usage: poetry run python kronik/main.py [--skip-device]
+Usage: poetry run python kronik/main.py [--skip-device] [--cold-boot] [--native-recording]
+                                       [--continuous-recording] [--adaptive-dwell]
+                                       [--metrics-port PORT] [--preference] [--reuse]
+                                       [--prescreen] [--manage-storage] [--resume]
 """
 
 import argparse
 import asyncio
-import subprocess
-import time
-from dataclasses import dataclass
-from typing import Optional
-
-import requests
-from appium.webdriver import Remote
+from typing import Callable, TypeVar
 
+from kronik.brain.preference import load_or_train
+from kronik.brain.prescreen import PreScreener
+from kronik.brain.reuse import AnalysisReuse
 from kronik.control import control
-from kronik.device.config import appium_driver, appium_server_url
+from kronik.control.dwell import DwellController
+from kronik.device.pool import SNAPSHOT_NAME, DevicePool
+from kronik.device.screenrecord import AdbRecorder, SessionRecorder
 from kronik.logger import app_logger as logger
-from kronik.session import Session, save_session_metadata
-
-
-@dataclass
-class DeviceSetup:
-    """Class to manage device and server processes."""
-
-    emulator_process: Optional[subprocess.Popen] = None
-    appium_process: Optional[subprocess.Popen] = None
-    driver: Optional[Remote] = None
-
-    def cleanup(self) -> None:
-        """Clean up all running processes."""
-        if self.driver:
-            self.driver.quit()
-        if self.appium_process:
-            self.appium_process.terminate()
-            logger.info("Appium server stopped.")
-        if self.emulator_process:
-            self.emulator_process.terminate()
-            logger.info("Emulator stopped.")
-
-
-class DeviceManager:
-    """Manages device setup and initialization."""
-
-    EMULATOR_NAME = "KronikPixel"
-    BOOT_TIMEOUT = 60
-    APPIUM_PORT = "4723"
-
-    @classmethod
-    def _is_emulator_booted(cls) -> bool:
-        """Check if emulator is booted and responsive."""
-        try:
-            result = subprocess.check_output(
-                ["adb", "shell", "getprop", "sys.boot_completed"], stderr=subprocess.DEVNULL
-            )
-            return result.strip() == b"1"
-        except subprocess.CalledProcessError:
-            return False
-
-    @classmethod
-    def _is_appium_responsive(cls) -> bool:
-        """Check if Appium server is running and responsive."""
-        try:
-            response = requests.get(f"{appium_server_url()}/status", timeout=10)
-            return response.status_code == 200
-        except requests.exceptions.RequestException:
-            return False
-
-    @classmethod
-    def check_emulator_running(cls) -> None:
-        """Check if emulator is running and fully booted."""
-        if not cls._is_emulator_booted():
-            raise RuntimeError(
-                "No running emulator found. Please start the emulator first when using --skip-device"
-            )
-        logger.info("Found running emulator")
-
-    @classmethod
-    def check_appium_running(cls) -> None:
-        """Check if Appium server is running and responding."""
-        if not cls._is_appium_responsive():
-            raise RuntimeError(
-                "No running Appium server found. Please start Appium first when using --skip-device"
-            )
-        logger.info("Found running Appium server")
-
-    @classmethod
-    def start_emulator(cls) -> subprocess.Popen:
-        """Start and wait for Android emulator to boot."""
-        logger.info("Starting Android emulator...")
-        emulator_process = subprocess.Popen(
-            ["emulator", "-avd", cls.EMULATOR_NAME], stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        time.sleep(5)  # Allow initial process startup
-
-        logger.info("Waiting for the emulator to boot...")
-        for _ in range(cls.BOOT_TIMEOUT):
-            if cls._is_emulator_booted():
-                logger.info("Emulator booted successfully.")
-                return emulator_process
-            time.sleep(1)
-
-        emulator_process.terminate()
-        raise TimeoutError("Emulator did not boot within the timeout period.")
-
-    @classmethod
-    def start_appium_server(cls) -> subprocess.Popen:
-        """Start and wait for Appium server to be ready."""
-        logger.info("Starting Appium server...")
-        appium_process = subprocess.Popen(
-            ["appium", "--port", cls.APPIUM_PORT], stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        time.sleep(5)  # Allow initial process startup
+from kronik.metrics import metrics
+from kronik.session import (
+    Session,
+    get_session_dir,
+    last_active_session,
+    save_session_metadata,
+)
+from kronik.store.storage import StorageManager
 
-        logger.info("Waiting for the Appium server to be ready...")
-        for _ in range(cls.BOOT_TIMEOUT):
-            if cls._is_appium_responsive():
-                logger.info("Appium server is ready.")
-                return appium_process
-            time.sleep(1)
-
-        appium_process.terminate()
-        raise TimeoutError("Appium server did not start within the timeout period.")
+T = TypeVar("T")
 
 
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Kronik automation tool")
     parser.add_argument("--skip-device", action="store_true", help="Skip emulator and appium setup")
+    parser.add_argument(
+        "--cold-boot", action="store_true", help="Boot the emulator without its saved snapshot"
+    )
+    parser.add_argument(
+        "--native-recording",
+        action="store_true",
+        help="Record with screenrecord on the device and pull the video over adb. "
+        "Clips have no audio, so analyses miss the sound and --reuse has no transcripts.",
+    )
+    parser.add_argument(
+        "--continuous-recording",
+        action="store_true",
+        help="Stream one recording for the whole session and cut a clip per video from it. "
+        "Uses screenrecord, so clips have no audio like with --native-recording.",
+    )
+    parser.add_argument(
+        "--adaptive-dwell",
+        action="store_true",
+        help="Watch the screen to decide how long to record each video",
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, help="Enable stage metrics and serve them on this port"
+    )
+    parser.add_argument(
+        "--preference",
+        action="store_true",
+        help="Let a local model trained on past analyses like or skip confident clips without "
+        "the LLM",
+    )
+    parser.add_argument(
+        "--reuse",
+        action="store_true",
+        help="Transcribe clips locally and reuse analyses of near-identical ones",
+    )
+    parser.add_argument(
+        "--prescreen",
+        action="store_true",
+        help="Skip ads, live previews and loading screens with a local image model",
+    )
+    parser.add_argument(
+        "--manage-storage",
+        action="store_true",
+        help="Enforce storage budgets and compact old sessions in the background",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the last session that did not close and finish its pending analyses",
+    )
     return parser.parse_args()
 
 
+async def _load(enabled: bool, load: Callable[[], T]) -> T | None:
+    """Run a blocking load in a thread if `enabled`, so the event loop keeps running."""
+    return await asyncio.to_thread(load) if enabled else None
+
+
+def _load_prescreen() -> PreScreener:
+    prescreen = PreScreener()
+    prescreen.load()
+    return prescreen
+
+
 async def main() -> None:
     """Main application logic."""
     logger.info("Starting kronik")
     args = parse_args()
-    device_setup = DeviceSetup()
+    pool = None
+    pool_ready = None
     session = None
+    preference = None
+    storage = None
 
     try:
-        # Initialize session
-        session = Session()
+        # Initialize session, or reopen one a crash left active
+        resume_id = last_active_session() if args.resume else None
+        session = Session.load(resume_id) if resume_id else Session()
         save_session_metadata(session)
-        logger.info(f"Starting new session: {session.id}")
-
-        # Start the emulator and Appium server if not skipped
-        if not args.skip_device:
-            device_setup.emulator_process = DeviceManager.start_emulator()
-            device_setup.appium_process = DeviceManager.start_appium_server()
-        # Else, check if the emulator and Appium server are already running
-        else:
-            DeviceManager.check_emulator_running()
-            DeviceManager.check_appium_running()
-
-        # Start Appium driver
-        device_setup.driver = appium_driver()
+        logger.info(f"Starting session: {session.id}")
+
+        # Export per-stage timings if enabled by flag or KRONIK_METRICS
+        if args.metrics_port:
+            metrics.enable()
+            metrics.serve(args.metrics_port)
+        if metrics.enabled:
+            metrics.open_jsonl(get_session_dir(session.id).joinpath("metrics.jsonl"))
+
+        # Delete, pack and re-encode old media one step at a time, next to capture
+        if args.manage_storage:
+            storage = asyncio.create_task(StorageManager().run())
+
+        # Boot the emulator from its snapshot and start Appium, or use running ones if skipped
+        pool = DevicePool(
+            snapshot=None if args.cold_boot else SNAPSHOT_NAME, external=args.skip_device
+        )
+        pool_ready = asyncio.create_task(pool.start())
+
+        # Models load in threads while the device boots:
+        # - the local like/skip model, trained from stored analyses on first use
+        # - analyses of look-alike clips to reuse, matched by their transcripts
+        # - the local classifier that screens clips before they are uploaded
+        _, preference, reuse, prescreen = await asyncio.gather(
+            pool_ready,
+            _load(args.preference, load_or_train),
+            _load(args.reuse, AnalysisReuse.from_chroma),
+            _load(args.prescreen, _load_prescreen),
+        )
 
-        # Run the control async function
-        await control(device_setup.driver, session)
+        # Run the control async function on a leased device, whose apps the pool has verified
+        async with pool.lease() as lease:
+            recorder = None
+            if args.continuous_recording:
+                recorder = SessionRecorder(lease.shell)
+            elif args.native_recording:
+                recorder = AdbRecorder(lease.shell)
+            if recorder is not None:
+                logger.warning("screenrecord captures no audio; clips are analyzed without sound")
+            await control(
+                lease.driver,
+                session,
+                preference=preference,
+                reuse=reuse,
+                prescreen=prescreen,
+                verify_apps=False,
+                shell=lease.shell,
+                recorder=recorder,
+                dwell=DwellController.for_driver(lease.driver) if args.adaptive_dwell else None,
+            )
 
     except KeyboardInterrupt:
         logger.info("Shutting down")
@@ -169,7 +174,15 @@ async def main() -> None:
         if session:
             session.close()
             save_session_metadata(session)
-        device_setup.cleanup()
+        if preference:
+            preference.save()
+        if pool_ready and not pool_ready.done():
+            pool_ready.cancel()
+        if storage:
+            storage.cancel()
+        if pool:
+            await pool.close()
+        metrics.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+"""
+kronik/metrics.py
+
+Lightweight per-stage timing for the control loop.
+
+Stages are timed with `span("stage")` or `@timed("stage")` and collected into histograms.
+They can be exported as Prometheus text over HTTP and appended to a JSONL file per session.
+When metrics are disabled, spans return a shared no-op context and cost a single attribute check.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from kronik.logger import setup_logger
+
+logger = setup_logger("kronik.metrics")
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_NOOP = nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds."""
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Metrics:
+    """Registry of stage histograms with Prometheus and JSONL export."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.histograms: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._jsonl = None
+        self._server: ThreadingHTTPServer | None = None
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record a duration for a stage."""
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+            if self._jsonl is not None:
+                self._jsonl.write(
+                    json.dumps({"ts": time.time(), "stage": stage, "seconds": seconds}) + "\n"
+                )
+
+    def span(self, stage: str):
+        """Context manager timing the enclosed block as `stage`."""
+        if not self.enabled:
+            return _NOOP
+        return self._span(stage)
+
+    @contextmanager
+    def _span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage: str):
+        """Decorator timing each call of a sync or async function as `stage`."""
+
+        def decorator(fn):
+            if asyncio.iscoroutinefunction(fn):
+
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await fn(*args, **kwargs)
+                    with self._span(stage):
+                        return await fn(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self._span(stage):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def open_jsonl(self, fp: Path) -> None:
+        """Append every observation to `fp` as a JSON line."""
+        self.close_jsonl()
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._jsonl = open(fp, "a", buffering=1 << 16)
+        logger.info(f"Writing metrics to {fp}")
+
+    def close_jsonl(self) -> None:
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+    def render_prometheus(self) -> str:
+        """Histograms in the Prometheus text exposition format."""
+        name = "kronik_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each kronik stage",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve `/metrics` in Prometheus text format from a background thread."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{self._server.server_port}/metrics")
+        return self._server
+
+    def shutdown(self) -> None:
+        """Stop the HTTP endpoint and close the JSONL file."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.close_jsonl()
+
+
+metrics = Metrics(enabled=os.environ.get("KRONIK_METRICS", "").lower() in ("1", "true"))
+span = metrics.span
+timed = metrics.timed
@@ -6,6 +6,7 @@ Each session represents a single run of the application.
 """
 
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 
@@ -29,6 +30,20 @@ class Session:
 
         logger.info(f"Created new session: {self.id}")
 
+    @classmethod
+    def load(cls, session_id: str) -> "Session":
+        """Reopen an existing session from its metadata, to resume it."""
+        metadata_file = get_session_dir(session_id) / "metadata.json"
+        with open(metadata_file) as f:
+            metadata = json.load(f)
+
+        session = cls.__new__(cls)
+        session.id = metadata["id"]
+        session.created_at = metadata["created_at"]
+        session.status = "active"
+        logger.info(f"Resumed session: {session.id}")
+        return session
+
     def close(self):
         """Mark the session as completed."""
         self.status = "completed"
@@ -45,14 +60,22 @@ def get_session_dir(session_id: str) -> Path:
     return DATA_DIR.joinpath("sessions", session_id)
 
 
+def write_atomic(filepath: Path, text: str) -> None:
+    """Write a file so that readers see either the old or the new content, even after a crash."""
+    tmp = filepath.with_name(f".{filepath.name}.tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filepath)
+
+
 def save_session_metadata(session: Session) -> None:
     """Save session metadata to a file."""
     session_dir = get_session_dir(session.id)
     session_dir.mkdir(parents=True, exist_ok=True)
 
-    metadata_file = session_dir / "metadata.json"
-    with open(metadata_file, "w") as f:
-        json.dump(session.metadata, f, indent=2)
+    write_atomic(session_dir / "metadata.json", json.dumps(session.metadata, indent=2))
 
 
 def list_sessions() -> list[dict]:
@@ -72,3 +95,11 @@ def list_sessions() -> list[dict]:
 
     # Sort sessions by creation time
     return sorted(sessions, key=lambda x: x["created_at"], reverse=True)
+
+
+def last_active_session() -> str | None:
+    """ID of the newest session that was not closed, which a crash would leave behind."""
+    for metadata in list_sessions():
+        if metadata["status"] == "active":
+            return metadata["id"]
+    return None
@@ -0,0 +1,289 @@
+"""
+kronik/store/analytics.py
+
+Append-only columnar store of per-video analyses for offline analytics.
+
+Each `Analysis` (and its `TikTokStats`, when known) becomes one row. Rows are buffered and
+written as Parquet part files, in a hive-style layout partitioned by day and session:
+
+    analytics/date=2025-01-31/session=session_20250131_120000/part-<uuid>.parquet
+
+`compact()` merges the part files of each partition into a single file. The readers scan
+the whole dataset with Arrow, so aggregations never parse a JSON file.
+
+Usage:
+    python -m kronik.store.analytics compact
+    python -m kronik.store.analytics like-rate
+"""
+
+import argparse
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from kronik import DATA_DIR
+from kronik.logger import setup_logger
+from kronik.models import Analysis, TikTokStats
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = setup_logger("kronik.analytics")
+
+ANALYTICS_DIR = DATA_DIR.joinpath("analytics")
+
+# TikTokStats fields and their Arrow types, stored as `stats_<field>` columns
+_STATS_FIELDS = {
+    "title": "string",
+    "channel": "string",
+    "channel_id": "string",
+    "channel_url": "string",
+    "tiktok_url": "string",
+    "thumbnail_url": "string",
+    "timestamp": "int64",
+    "view_count": "int64",
+    "like_count": "int64",
+    "repost_count": "int64",
+    "comment_count": "int64",
+    "duration": "int64",
+    "track": "string",
+}
+
+
+def schema() -> "pa.Schema":
+    """Arrow schema of a stored analysis row, without the partition columns."""
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("video_id", pa.string()),
+            ("link", pa.string()),
+            ("phash", pa.uint64()),
+            ("caption", pa.string()),
+            ("author", pa.string()),
+            ("track", pa.string()),
+            ("recorded_at", pa.timestamp("ms", tz="UTC")),
+            ("transcript", pa.string()),
+            ("analysis", pa.string()),
+            ("tags", pa.list_(pa.string())),
+            ("category", pa.string()),
+            ("rating", pa.int16()),
+            ("like", pa.bool_()),
+            *((f"stats_{name}", pa.type_for_alias(kind)) for name, kind in _STATS_FIELDS.items()),
+        ]
+    )
+
+
+def partitioning() -> "pa.dataset.Partitioning":
+    """Hive partitioning on `date` (YYYY-MM-DD) and `session`."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(
+        pa.schema([("date", pa.string()), ("session", pa.string())]), flavor="hive"
+    )
+
+
+class AnalysisSink:
+    """
+    Buffers analysis rows and appends them to the columnar store as Parquet part files.
+
+    Args:
+        session_id: Session the rows belong to
+        root: Root directory of the store. Defaults to `ANALYTICS_DIR`.
+        flush_every: Write a part file once this many rows are buffered
+    """
+
+    def __init__(self, session_id: str, root: Path | None = None, flush_every: int = 50):
+        self.session_id = session_id
+        self.root = Path(root or ANALYTICS_DIR)
+        self.flush_every = flush_every
+        self._rows: list[dict] = []
+
+    def append(
+        self,
+        analysis: Analysis,
+        stats: TikTokStats | None = None,
+        video_id: str | None = None,
+        recorded_at: datetime | None = None,
+        link: str | None = None,
+        phash: int | None = None,
+        caption: str | None = None,
+        author: str | None = None,
+        track: str | None = None,
+    ) -> None:
+        """
+        Buffer one analysis, flushing if the buffer is full.
+
+        `caption`, `author` and `track` are what the app showed when the clip was recorded,
+        the features the preference model is trained on.
+        """
+        row = {
+            "video_id": video_id,
+            "link": link,
+            "phash": phash,
+            "caption": caption,
+            "author": author,
+            "track": track,
+            "recorded_at": recorded_at or datetime.now(timezone.utc),
+            "transcript": analysis.transcript,
+            "analysis": analysis.analysis,
+            "tags": analysis.tags,
+            "category": analysis.category.value,
+            "rating": analysis.rating,
+            "like": analysis.like,
+        }
+        for name in _STATS_FIELDS:
+            value = getattr(stats, name) if stats is not None else None
+            row[f"stats_{name}"] = (
+                str(value) if value is not None and name.endswith("url") else value
+            )
+        self._rows.append(row)
+
+        if len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> list[Path]:
+        """Write buffered rows, one part file per day. Returns the files written."""
+        if not self._rows:
+            return []
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        by_date: dict[str, list[dict]] = {}
+        for row in self._rows:
+            recorded_at = row["recorded_at"].astimezone(timezone.utc)
+            by_date.setdefault(recorded_at.strftime("%Y-%m-%d"), []).append(row)
+
+        written = []
+        for date, rows in by_date.items():
+            partition_dir = partition_path(self.root, date, self.session_id)
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            part_fp = partition_dir.joinpath(f"part-{uuid.uuid4().hex}.parquet")
+            _write_atomic(pa.Table.from_pylist(rows, schema=schema()), part_fp, pq)
+            written.append(part_fp)
+
+        logger.debug("Wrote %d analysis rows to %d part files", len(self._rows), len(written))
+        self._rows.clear()
+        return written
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "AnalysisSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def partition_path(root: Path, date: str, session_id: str) -> Path:
+    """Directory holding the part files of one day of one session."""
+    return Path(root).joinpath(f"date={date}", f"session={session_id}")
+
+
+def _write_atomic(table: "pa.Table", fp: Path, pq) -> None:
+    # Readers skip files starting with "." so a half-written file is never scanned
+    tmp_fp = fp.with_name(f".{fp.name}.tmp")
+    pq.write_table(table, tmp_fp, compression="zstd")
+    tmp_fp.replace(fp)
+
+
+def compact(root: Path | None = None, min_files: int = 2) -> int:
+    """
+    Merge the part files of each partition into one file.
+
+    Args:
+        root: Root directory of the store. Defaults to `ANALYTICS_DIR`.
+        min_files: Only compact partitions with at least this many files
+
+    Returns:
+        Number of partitions compacted
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    compacted = 0
+    for partition_dir in sorted(Path(root or ANALYTICS_DIR).glob("date=*/session=*")):
+        parts = sorted(partition_dir.glob("*.parquet"))
+        if len(parts) < min_files:
+            continue
+
+        table = pa.concat_tables(pq.read_table(fp, schema=schema()) for fp in parts)
+        table = table.sort_by("recorded_at")
+        _write_atomic(table, partition_dir.joinpath(f"compacted-{uuid.uuid4().hex}.parquet"), pq)
+        for fp in parts:
+            fp.unlink()
+
+        logger.info("Compacted %d files in %s", len(parts), partition_dir)
+        compacted += 1
+    return compacted
+
+
+def read_analyses(root: Path | None = None, columns: list[str] | None = None) -> "pa.Table":
+    """
+    Read every stored analysis into one Arrow table.
+
+    Args:
+        root: Root directory of the store. Defaults to `ANALYTICS_DIR`.
+        columns: Columns to read, including the `date` and `session` partition columns.
+            Reads all columns if None.
+    """
+    import pyarrow.dataset as ds
+
+    full_schema = schema()
+    for field in partitioning().schema:
+        full_schema = full_schema.append(field)
+
+    root = Path(root or ANALYTICS_DIR)
+    if not root.exists():
+        table = full_schema.empty_table()
+        return table.select(columns) if columns else table
+
+    dataset = ds.dataset(root, format="parquet", schema=full_schema, partitioning=partitioning())
+    return dataset.to_table(columns=columns)
+
+
+def like_rate_by_category_per_day(root: Path | None = None) -> "pa.Table":
+    """
+    Share of liked videos per category and day.
+
+    Returns:
+        Table with `date`, `category`, `videos`, `likes` and `like_rate` columns,
+        sorted by date and category
+    """
+    import pyarrow.compute as pc
+
+    table = read_analyses(root, columns=["date", "category", "like"])
+    grouped = table.group_by(["date", "category"]).aggregate([("like", "count"), ("like", "sum")])
+    videos = grouped["like_count"]
+    likes = pc.cast(grouped["like_sum"], "int64")
+    return (
+        grouped.select(["date", "category"])
+        .append_column("videos", videos)
+        .append_column("likes", likes)
+        .append_column("like_rate", pc.divide(pc.cast(likes, "float64"), videos))
+        .sort_by([("date", "ascending"), ("category", "ascending")])
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain and query the analysis store")
+    parser.add_argument("command", choices=["compact", "like-rate"])
+    parser.add_argument("--root", type=Path, default=None)
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        count = compact(args.root)
+        print(f"Compacted {count} partitions")
+    else:
+        for row in like_rate_by_category_per_day(args.root).to_pylist():
+            print(
+                f"{row['date']}  {row['category']:<18} {row['likes']:>5}/{row['videos']:<5} "
+                f"{row['like_rate']:.2%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,35 @@
 import sqlite3
-
-import chromadb
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
 from kronik import DATA_DIR
 
+if TYPE_CHECKING:
+    import chromadb
+
 DB_DIR = DATA_DIR.joinpath("db")
 CHROMA_DIR = DB_DIR.joinpath("chroma")
 SQL_FP = DB_DIR.joinpath("kronik.db")
 
-chroma = chromadb.PersistentClient(path=str(CHROMA_DIR))
-db = sqlite3.connect(SQL_FP)
+
+@lru_cache(maxsize=1)
+def get_chroma() -> "chromadb.ClientAPI":
+    """Get the persistent Chroma client, opening it on first use."""
+    import chromadb
+
+    return chromadb.PersistentClient(path=str(CHROMA_DIR))
+
+
+@lru_cache(maxsize=1)
+def get_db() -> sqlite3.Connection:
+    """Get the SQLite connection, opening it on first use."""
+    return sqlite3.connect(SQL_FP)
+
+
+def __getattr__(name: str):
+    # Keep `from kronik.store.client import chroma, db` working without opening them at import time
+    if name == "chroma":
+        return get_chroma()
+    if name == "db":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
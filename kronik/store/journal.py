@@ -0,0 +1,209 @@
+"""
+kronik/store/journal.py
+
+Append-only journal of what happened to each clip of a session, to resume after a crash.
+
+Every event is one JSON line in `journal.jsonl` in the session directory:
+
+    {"t": 1738324800.1, "event": "recorded", "clip": "recording_20250131_120000", ...}
+
+Events are written to the file right away, so they survive the process dying, and synced to
+disk in batches, every few events or seconds, so they also survive a power loss without an
+fsync per event. A line torn by a crash is ignored on replay.
+
+Replaying the journal gives the state of each clip. Clips that were recorded but neither
+analyzed, decided by the preference model nor skipped are the pending analysis queue, which
+`control` works off when a session is resumed. The answer of an analysis or decision is
+journaled with it, before the like is sent, so clips that should have been liked but were not
+are found on resume too.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from kronik.logger import setup_logger
+from kronik.session import get_session_dir
+
+logger = setup_logger("kronik.journal")
+
+JOURNAL_NAME = "journal.jsonl"
+
+# Event names
+RECORDED = "recorded"
+LINK = "link"
+ANALYZED = "analyzed"
+DECIDED = "decided"
+SKIPPED = "skipped"
+LIKED = "liked"
+SCROLLED = "scrolled"
+
+
+@dataclass
+class ClipState:
+    """What the journal knows about one clip."""
+
+    clip: str
+    path: Path | None = None
+    link: str | None = None
+    phash: int | None = None
+    caption: str | None = None
+    track: str | None = None
+    analyzed: bool = False
+    decided: bool = False
+    skipped: bool = False
+    # Whether the analysis or decision said to like the clip
+    like: bool | None = None
+    liked: bool = False
+
+    @property
+    def pending(self) -> bool:
+        """Recorded, but its analysis was never finished."""
+        return self.path is not None and not (self.analyzed or self.decided or self.skipped)
+
+    @property
+    def unliked(self) -> bool:
+        """To be liked, but the like was never sent."""
+        return bool(self.like) and not self.liked
+
+
+def _apply(clips: dict[str, ClipState], entry: dict) -> None:
+    """Update the clip states with one event."""
+    name = entry.get("clip")
+    if name is None:
+        return
+    state = clips.setdefault(name, ClipState(name))
+    event = entry["event"]
+    if event == RECORDED:
+        state.path = Path(entry["path"])
+    elif event == LINK:
+        state.link = entry.get("link")
+        state.phash = entry.get("phash")
+        state.caption = entry.get("caption")
+        state.track = entry.get("track")
+    elif event == ANALYZED:
+        state.analyzed = True
+        state.like = entry.get("like")
+    elif event == DECIDED:
+        state.decided = True
+        state.like = entry.get("like")
+    elif event == SKIPPED:
+        state.skipped = True
+    elif event == LIKED:
+        state.liked = True
+
+
+def replay(journal_fp: Path) -> dict[str, ClipState]:
+    """
+    Read a journal into the state of each clip.
+
+    Returns:
+        dict[str, ClipState]: Clips by name, in the order they were recorded
+    """
+    clips: dict[str, ClipState] = {}
+    if not journal_fp.exists():
+        return clips
+
+    with open(journal_fp) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping a torn journal line in %s", journal_fp)
+                continue
+            _apply(clips, entry)
+    return clips
+
+
+class SessionJournal:
+    """
+    Appends events to the journal of a session.
+
+    Args:
+        session_id: Session to journal
+        root: Directory to keep the journal in. Defaults to the session directory.
+        sync_every: Sync to disk after this many events
+        sync_seconds: Sync to disk once the oldest unsynced event is this old
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        root: Path | None = None,
+        sync_every: int = 16,
+        sync_seconds: float = 1.0,
+    ):
+        directory = Path(root) if root else get_session_dir(session_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.filepath = directory.joinpath(JOURNAL_NAME)
+        self.sync_every = max(sync_every, 1)
+        self.sync_seconds = sync_seconds
+        self.clips = replay(self.filepath)
+        self._unsynced = 0
+        self._unsynced_since = 0.0
+        self._fd = os.open(self.filepath, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._repair()
+
+    def _repair(self) -> None:
+        """End a line torn by a crash, so the next event starts on its own line."""
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            return
+        with open(self.filepath, "rb") as f:
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                os.write(self._fd, b"\n")
+
+    def pending(self) -> list[ClipState]:
+        """Recorded clips whose analysis was never finished, oldest first."""
+        return [state for state in self.clips.values() if state.pending]
+
+    def unliked(self) -> list[ClipState]:
+        """Clips to be liked whose like was never sent, oldest first."""
+        return [state for state in self.clips.values() if state.unliked]
+
+    def append(self, event: str, clip: str | None = None, **fields) -> None:
+        """
+        Write one event and update the clip states.
+
+        Args:
+            event: Event name
+            clip: Clip the event is about. Session-wide events have none.
+            fields: JSON-serializable details of the event
+        """
+        entry = {"t": round(time.time(), 3), "event": event}
+        if clip is not None:
+            entry["clip"] = clip
+        entry.update(fields)
+        # A single write of a whole line to a file opened for appending is never interleaved
+        os.write(self._fd, (json.dumps(entry, default=str) + "\n").encode())
+
+        _apply(self.clips, entry)
+
+        now = time.monotonic()
+        if self._unsynced == 0:
+            self._unsynced_since = now
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every or now - self._unsynced_since >= self.sync_seconds:
+            self.sync()
+
+    def sync(self) -> None:
+        """Flush written events to disk."""
+        if self._unsynced:
+            os.fsync(self._fd)
+            self._unsynced = 0
+
+    def close(self) -> None:
+        if self._fd < 0:
+            return
+        self.sync()
+        os.close(self._fd)
+        self._fd = -1
+
+    def __enter__(self) -> "SessionJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
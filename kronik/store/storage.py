@@ -0,0 +1,386 @@
+"""
+kronik/store/storage.py
+
+Retention and compaction of session media, so long-running hosts do not fill their disks.
+
+Each step does one small unit of work, so the manager can run in the background next to
+capture:
+
+1. Over a byte budget: delete the oldest media, first across all sessions, then per session.
+2. Delete derived artifacts: extracted audio once its clip is analyzed, and screenshots.
+3. Pack the small JSON files of a session into one `analyses.zip`.
+4. Re-encode old recordings as low-bitrate proxies, tagged so they are not re-encoded again.
+
+Files younger than the grace period are never touched, so anything being captured or analyzed
+is left alone. Clips the session journal still lists as pending are kept however old they are,
+since resuming a crashed session needs them. Session metadata, metrics, the journal and the
+analytics store are kept.
+
+Usage:
+    python -m kronik.store.storage usage
+    python -m kronik.store.storage run [--once]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import time
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import ffmpeg
+
+from kronik import DATA_DIR
+from kronik.logger import setup_logger
+from kronik.store.journal import JOURNAL_NAME, replay
+from kronik.utils.av import probe
+
+logger = setup_logger("kronik.storage")
+
+GiB = 1024**3
+
+ARCHIVE_NAME = "analyses.zip"
+PROXY_TAG = "kronik-proxy"
+
+VIDEO_SUFFIXES = {".mp4", ".mkv"}
+AUDIO_SUFFIXES = {".mp3", ".m4a", ".wav"}
+IMAGE_SUFFIXES = {".png", ".webp", ".jpg"}
+# Never deleted or packed
+KEEP_NAMES = {"metadata.json", "metrics.jsonl", ARCHIVE_NAME}
+
+
+@dataclass
+class StoragePolicy:
+    """
+    Args:
+        total_budget: Bytes all sessions may use. Unlimited if None.
+        session_budget: Bytes one session may use. Unlimited if None.
+        grace_seconds: Files modified more recently than this are left alone
+        proxy_after: Seconds after which recordings are re-encoded as proxies. Never if None.
+        proxy_height: Height of proxy videos
+        proxy_crf: x264 quality of proxy videos. Higher is smaller.
+        pack_max_bytes: JSON files up to this size are packed into the session archive
+    """
+
+    total_budget: int | None = 20 * GiB
+    session_budget: int | None = 2 * GiB
+    grace_seconds: float = 600.0
+    proxy_after: float | None = 3600.0
+    proxy_height: int = 480
+    proxy_crf: int = 32
+    pack_max_bytes: int = 64 * 1024
+
+
+@dataclass
+class StorageStats:
+    deleted: int = 0
+    packed: int = 0
+    proxies: int = 0
+    bytes_freed: int = 0
+    steps: dict[str, int] = field(default_factory=dict)
+
+
+def _size(fp: Path) -> int:
+    try:
+        return fp.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def session_usage(session_dir: Path) -> int:
+    """Bytes used by a session directory."""
+    return sum(_size(fp) for fp in session_dir.rglob("*") if fp.is_file())
+
+
+def read_packed(session_dir: Path, name: str) -> str | None:
+    """Read a JSON file of a session, whether it is packed or not."""
+    fp = session_dir.joinpath(name)
+    if fp.exists():
+        return fp.read_text()
+    archive = session_dir.joinpath(ARCHIVE_NAME)
+    if archive.exists():
+        with zipfile.ZipFile(archive) as zf:
+            if name in zf.namelist():
+                return zf.read(name).decode()
+    return None
+
+
+def is_proxy(video_fp: Path) -> bool:
+    """Whether a video is already a proxy made by the storage manager."""
+    try:
+        tags = probe(video_fp)["format"].get("tags", {})
+    except ffmpeg.Error:
+        return False
+    return any(key.lower() == "comment" and value == PROXY_TAG for key, value in tags.items())
+
+
+def _lower_priority() -> None:
+    os.nice(10)
+
+
+class StorageManager:
+    """
+    Keeps session directories within budget, one small step at a time.
+
+    Args:
+        root: Directory holding the session directories. Defaults to `DATA_DIR/sessions`.
+        policy: Budgets and ages
+    """
+
+    def __init__(self, root: Path | None = None, policy: StoragePolicy | None = None):
+        self.root = Path(root) if root else DATA_DIR.joinpath("sessions")
+        self.policy = policy or StoragePolicy()
+        self.stats = StorageStats()
+        # Videos whose proxy came out larger, so they are not re-encoded on every pass
+        self._no_proxy: set[Path] = set()
+
+    def _sessions(self) -> list[Path]:
+        """Session directories, oldest first."""
+        if not self.root.exists():
+            return []
+        return sorted(fp for fp in self.root.iterdir() if fp.is_dir())
+
+    def _settled(self, fp: Path, now: float, age: float | None = None) -> bool:
+        """Whether `fp` was last modified long enough ago to be touched."""
+        try:
+            mtime = fp.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return now - mtime >= max(age or 0.0, self.policy.grace_seconds)
+
+    def _media(self, session_dir: Path, now: float) -> list[Path]:
+        """Settled videos, audio and images of a session, oldest first, except pending clips."""
+        suffixes = VIDEO_SUFFIXES | AUDIO_SUFFIXES | IMAGE_SUFFIXES
+        # Recordings whose analysis a crashed run left for `--resume` to finish
+        pending = {
+            state.clip
+            for state in replay(session_dir.joinpath(JOURNAL_NAME)).values()
+            if state.pending
+        }
+        files = [
+            fp
+            for fp in session_dir.iterdir()
+            if fp.is_file()
+            and fp.suffix in suffixes
+            and fp.stem not in pending
+            and self._settled(fp, now)
+        ]
+        return sorted(files, key=lambda fp: fp.stat().st_mtime)
+
+    def _delete(self, files: list[Path], action: str) -> int:
+        freed = 0
+        for fp in files:
+            size = _size(fp)
+            fp.unlink(missing_ok=True)
+            freed += size
+            self.stats.deleted += 1
+        self.stats.bytes_freed += freed
+        if files:
+            logger.info("%s: deleted %d files (%d MiB)", action, len(files), freed // 2**20)
+        return freed
+
+    # Steps
+
+    def _enforce_total(self, now: float) -> bool:
+        budget = self.policy.total_budget
+        if budget is None:
+            return False
+        usage = {session_dir: session_usage(session_dir) for session_dir in self._sessions()}
+        excess = sum(usage.values()) - budget
+        if excess <= 0:
+            return False
+
+        victims = []
+        for session_dir in usage:
+            for fp in self._media(session_dir, now):
+                if excess <= 0:
+                    break
+                victims.append(fp)
+                excess -= _size(fp)
+        return self._delete(victims, "Total budget") > 0
+
+    def _enforce_session(self, session_dir: Path, now: float) -> bool:
+        budget = self.policy.session_budget
+        if budget is None:
+            return False
+        excess = session_usage(session_dir) - budget
+        if excess <= 0:
+            return False
+
+        victims = []
+        for fp in self._media(session_dir, now):
+            if excess <= 0:
+                break
+            victims.append(fp)
+            excess -= _size(fp)
+        return self._delete(victims, f"Budget of {session_dir.name}") > 0
+
+    def _delete_derived(self, session_dir: Path, now: float) -> bool:
+        archive = session_dir.joinpath(ARCHIVE_NAME)
+        packed = set()
+        if archive.exists():
+            with zipfile.ZipFile(archive) as zf:
+                packed = set(zf.namelist())
+
+        derived = []
+        for fp in self._media(session_dir, now):
+            analyzed = session_dir.joinpath(f"{fp.stem}.json").exists() or (
+                f"{fp.stem}.json" in packed
+            )
+            if fp.suffix in IMAGE_SUFFIXES or (fp.suffix in AUDIO_SUFFIXES and analyzed):
+                derived.append(fp)
+        return self._delete(derived, f"Derived files of {session_dir.name}") > 0
+
+    def _pack(self, session_dir: Path, now: float) -> bool:
+        small = [
+            fp
+            for fp in sorted(session_dir.glob("*.json"))
+            if fp.name not in KEEP_NAMES
+            and _size(fp) <= self.policy.pack_max_bytes
+            and self._settled(fp, now)
+        ]
+        if not small:
+            return False
+
+        # Rewrite the archive next to the old one and swap it in, so a crash loses nothing
+        archive = session_dir.joinpath(ARCHIVE_NAME)
+        tmp = archive.with_suffix(".zip.tmp")
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as out:
+            if archive.exists():
+                with zipfile.ZipFile(archive) as old:
+                    for name in old.namelist():
+                        out.writestr(name, old.read(name))
+            for fp in small:
+                out.write(fp, fp.name)
+        os.replace(tmp, archive)
+
+        freed = sum(_size(fp) for fp in small)
+        for fp in small:
+            fp.unlink()
+        self.stats.packed += len(small)
+        logger.info("Packed %d JSON files of %s", len(small), session_dir.name)
+        self.stats.bytes_freed += max(0, freed - _size(archive))
+        return True
+
+    def _proxy(self, session_dir: Path, now: float) -> bool:
+        if self.policy.proxy_after is None:
+            return False
+        for video_fp in sorted(session_dir.iterdir()):
+            if (
+                video_fp.suffix not in VIDEO_SUFFIXES
+                or video_fp in self._no_proxy
+                or not self._settled(video_fp, now, self.policy.proxy_after)
+                or is_proxy(video_fp)
+            ):
+                continue
+            self.make_proxy(video_fp)
+            return True
+        return False
+
+    def make_proxy(self, video_fp: Path) -> Path:
+        """
+        Re-encode a video in place at low resolution and bitrate, at a lower CPU priority.
+
+        The original is kept if the proxy is not smaller.
+        """
+        tmp = video_fp.with_name(f".{video_fp.stem}.proxy{video_fp.suffix}")
+        args = (
+            ffmpeg.input(str(video_fp))
+            .output(
+                str(tmp),
+                vf=f"scale=-2:'min({self.policy.proxy_height},ih)'",
+                vcodec="libx264",
+                preset="veryfast",
+                crf=self.policy.proxy_crf,
+                acodec="aac",
+                audio_bitrate="48k",
+                threads=2,
+                metadata=f"comment={PROXY_TAG}",
+            )
+            .global_args("-loglevel", "error")
+            .overwrite_output()
+            .compile()
+        )
+        subprocess.run(args, check=True, preexec_fn=_lower_priority)
+
+        before, after = _size(video_fp), _size(tmp)
+        if after >= before:
+            tmp.unlink()
+            self._no_proxy.add(video_fp)
+            return video_fp
+        # Keep the modification time, so age-based rules still see the original's age
+        stat = video_fp.stat()
+        os.replace(tmp, video_fp)
+        os.utime(video_fp, (stat.st_atime, stat.st_mtime))
+        self.stats.proxies += 1
+        self.stats.bytes_freed += before - after
+        logger.info("Proxy of %s: %d KiB -> %d KiB", video_fp.name, before // 1024, after // 1024)
+        return video_fp
+
+    def step(self) -> str | None:
+        """
+        Do the most urgent unit of work.
+
+        Returns:
+            str | None: What was done, or None if there is nothing to do
+        """
+        now = time.time()
+        sessions = self._sessions()
+        steps = [("total_budget", lambda: self._enforce_total(now))]
+        steps += [("session_budget", lambda d=d: self._enforce_session(d, now)) for d in sessions]
+        steps += [("derived", lambda d=d: self._delete_derived(d, now)) for d in sessions]
+        steps += [("pack", lambda d=d: self._pack(d, now)) for d in sessions]
+        steps += [("proxy", lambda d=d: self._proxy(d, now)) for d in sessions]
+
+        for name, run in steps:
+            try:
+                done = run()
+            except Exception as e:
+                logger.error(f"Storage step {name} failed: {str(e)}")
+                continue
+            if done:
+                self.stats.steps[name] = self.stats.steps.get(name, 0) + 1
+                return name
+        return None
+
+    def run_once(self) -> int:
+        """Work until there is nothing left to do. Returns the number of steps."""
+        count = 0
+        while self.step() is not None:
+            count += 1
+        return count
+
+    async def run(self, interval: float = 60.0) -> None:
+        """Work in a background thread, one step at a time, and look again every `interval`."""
+        while True:
+            if await asyncio.to_thread(self.step) is None:
+                await asyncio.sleep(interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage session storage")
+    parser.add_argument("command", choices=["usage", "run"])
+    parser.add_argument("--root", type=Path, default=None)
+    parser.add_argument("--once", action="store_true", help="Do all pending work and exit")
+    parser.add_argument("--interval", type=float, default=60.0)
+    args = parser.parse_args()
+
+    manager = StorageManager(args.root)
+    if args.command == "usage":
+        total = 0
+        for session_dir in manager._sessions():
+            usage = session_usage(session_dir)
+            total += usage
+            print(f"{session_dir.name:<32} {usage / 2**20:>10.1f} MiB")
+        print(f"{'total':<32} {total / 2**20:>10.1f} MiB")
+    elif args.once:
+        steps = manager.run_once()
+        print(f"{steps} steps, {manager.stats.bytes_freed / 2**20:.1f} MiB freed")
+    else:
+        asyncio.run(manager.run(args.interval))
+
+
+if __name__ == "__main__":
+    main()
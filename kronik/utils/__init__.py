@@ -1,6 +1,40 @@
 """kronik.utils package"""
 
-from .av import extract_audio, has_audio_stream
-from .transcribe import transcribe
+import sys
+from importlib import import_module
+from types import ModuleType
 
-__all__ = ["extract_audio", "has_audio_stream", "transcribe"]
+# Attributes are resolved on first access so importing one utility
+# does not pull in ffmpeg, numpy or a transcription model for the others
+_LAZY_ATTRS = {
+    "concat_clips": ".av",
+    "cut_clip": ".av",
+    "decode_audio": ".av",
+    "extract_audio": ".av",
+    "extract_audio_batch": ".av",
+    "has_audio_stream": ".av",
+    "sample_frames": ".av",
+    "transcribe": ".transcribe",
+    "transcribe_video": ".transcribe",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+class _UtilsModule(ModuleType):
+    def __setattr__(self, name: str, value) -> None:
+        # Importing a submodule binds it on the package, but `transcribe` names the function
+        if name == "transcribe" and isinstance(value, ModuleType):
+            value = value.transcribe
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _UtilsModule
@@ -1,11 +1,64 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import ffmpeg
 
 from kronik.logger import setup_logger
+from kronik.metrics import timed
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = setup_logger(__name__)
 
+# Whisper models expect 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class AudioExtraction:
+    """Result of extracting the audio track from a single video file."""
+
+    video_fp: Path
+    audio_fp: Path | None = None
+    probe_time: float = 0.0
+    extract_time: float = 0.0
+    error: str | None = None
+
+
+@lru_cache(maxsize=1024)
+def _probe(video_fp: str, mtime_ns: int, size: int) -> dict:
+    """Cached ffprobe keyed on the file's path, modification time and size."""
+    return ffmpeg.probe(video_fp)
+
+
+def probe(video_fp: Path) -> dict:
+    """
+    Probe a video file with ffprobe, reusing the cached result while the file is unchanged.
+
+    Args:
+        video_fp (Path): Path to the video file
+
+    Returns:
+        dict: The ffprobe output with "streams" and "format" entries
+    """
+    video_fp = Path(video_fp).absolute()
+    stat = video_fp.stat()
+    return _probe(str(video_fp), stat.st_mtime_ns, stat.st_size)
+
+
+def _audio_stream(probe_result: dict) -> dict | None:
+    """Return the first audio stream of a probe result, if any."""
+    return next(
+        (stream for stream in probe_result["streams"] if stream["codec_type"] == "audio"),
+        None,
+    )
+
 
 def has_audio_stream(video_fp: Path) -> bool:
     """
@@ -18,13 +71,19 @@ def has_audio_stream(video_fp: Path) -> bool:
         bool: True if the video has an audio stream, False otherwise
     """
     try:
-        probe = ffmpeg.probe(str(video_fp))
-        return any(stream["codec_type"] == "audio" for stream in probe["streams"])
+        return _audio_stream(probe(video_fp)) is not None
     except ffmpeg.Error:
         return False
 
 
-def extract_audio(video_fp: Path, bitrate: str = "192k", codec: str = "libmp3lame") -> Path | None:
+@timed("utils.extract_audio")
+def extract_audio(
+    video_fp: Path,
+    bitrate: str = "192k",
+    codec: str = "libmp3lame",
+    copy: bool = False,
+    probe_result: dict | None = None,
+) -> Path | None:
     """
     Extract audio from a video file using ffmpeg-python and save it as MP3.
     Returns None if no audio stream is found.
@@ -33,6 +92,9 @@ def extract_audio(video_fp: Path, bitrate: str = "192k", codec: str = "libmp3lam
         video_fp (Path): Path to the input video file.
         bitrate (str, optional): Audio bitrate. Defaults to '192k'.
         codec (str, optional): Audio codec to use. Defaults to 'libmp3lame'.
+        copy (bool, optional): Stream-copy an AAC track to .m4a instead of re-encoding.
+            Defaults to False.
+        probe_result (dict, optional): A previous probe of the file to skip re-probing.
 
     Returns:
         Path | None: Path to the extracted audio file, or None if no audio stream exists
@@ -48,12 +110,21 @@ def extract_audio(video_fp: Path, bitrate: str = "192k", codec: str = "libmp3lam
         raise FileNotFoundError(f"Video file not found: {video_fp}")
 
     # Check for audio stream first
-    if not has_audio_stream(video_fp):
+    try:
+        audio_stream = _audio_stream(probe_result or probe(video_fp))
+    except ffmpeg.Error:
+        audio_stream = None
+    if audio_stream is None:
         logger.warning(f"No audio stream found in {video_fp}")
         return None
 
-    # Define output file path with .mp3 extension
-    audio_fp = video_fp.with_suffix(".mp3")
+    # Copy the AAC track as-is when the consumer accepts it, otherwise encode to MP3
+    if copy and audio_stream.get("codec_name") == "aac":
+        audio_fp = video_fp.with_suffix(".m4a")
+        output_kwargs = {"acodec": "copy"}
+    else:
+        audio_fp = video_fp.with_suffix(".mp3")
+        output_kwargs = {"acodec": codec, "audio_bitrate": bitrate}
 
     try:
         # Convert paths to strings and ensure they're absolute paths
@@ -64,7 +135,7 @@ def extract_audio(video_fp: Path, bitrate: str = "192k", codec: str = "libmp3lam
         # Extract audio using ffmpeg
         stream = (
             ffmpeg.input(input_path)
-            .output(filename=output_path, acodec=codec, audio_bitrate=bitrate, vn=None)
+            .output(filename=output_path, vn=None, **output_kwargs)
             .overwrite_output()
             .run(capture_stdout=True, capture_stderr=True)
         )
@@ -83,3 +154,226 @@ def extract_audio(video_fp: Path, bitrate: str = "192k", codec: str = "libmp3lam
     except Exception as exc:
         logger.error("Unexpected error", exc_info=True)
         raise exc
+
+
+@timed("utils.decode_audio")
+def decode_audio(video_fp: Path, sample_rate: int = SAMPLE_RATE) -> "np.ndarray | None":
+    """
+    Decode the audio of a video file straight into memory as mono float32 PCM.
+    ffmpeg writes raw samples to stdout, so no intermediate audio file is created.
+    Returns None if no audio stream is found.
+
+    Args:
+        video_fp (Path): Path to the input video file.
+        sample_rate (int, optional): Output sample rate. Defaults to 16 kHz.
+
+    Returns:
+        np.ndarray | None: Samples in [-1, 1), or None if no audio stream exists
+
+    Raises:
+        FileNotFoundError: If input video file doesn't exist.
+    """
+    video_fp = Path(video_fp)
+
+    if not video_fp.exists():
+        raise FileNotFoundError(f"Video file not found: {video_fp}")
+
+    if not has_audio_stream(video_fp):
+        logger.warning(f"No audio stream found in {video_fp}")
+        return None
+
+    try:
+        logger.debug(f"Decoding audio from {video_fp} at {sample_rate} Hz")
+        out, _ = (
+            ffmpeg.input(str(video_fp.absolute()), threads=0)
+            .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=sample_rate)
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as exc:
+        logger.error("FFmpeg error", exc_info=True)
+        raise exc
+
+    import numpy as np
+
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+@timed("utils.sample_frames")
+def sample_frames(video_fp: Path, count: int = 4, size: int = 224) -> "np.ndarray":
+    """
+    Decode a few evenly spaced frames of a video, downscaled to `size` x `size` RGB.
+
+    Only keyframes are decoded, which skips almost all of the decoding work,
+    so short clips may yield fewer than `count` frames.
+
+    Args:
+        video_fp (Path): Path to the input video file.
+        count (int, optional): Maximum number of frames. Defaults to 4.
+        size (int, optional): Output width and height. Defaults to 224.
+
+    Returns:
+        np.ndarray: uint8 array of shape (frames, size, size, 3)
+
+    Raises:
+        FileNotFoundError: If input video file doesn't exist.
+    """
+    video_fp = Path(video_fp)
+
+    if not video_fp.exists():
+        raise FileNotFoundError(f"Video file not found: {video_fp}")
+
+    try:
+        out, _ = (
+            ffmpeg.input(str(video_fp.absolute()), skip_frame="nokey", threads=0)
+            .output(
+                "pipe:",
+                format="rawvideo",
+                pix_fmt="rgb24",
+                vf=f"scale={size}:{size}",
+                fps_mode="vfr",
+            )
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as exc:
+        logger.error("FFmpeg error", exc_info=True)
+        raise exc
+
+    import numpy as np
+
+    frames = np.frombuffer(out, np.uint8).reshape(-1, size, size, 3)
+    if len(frames) > count:
+        frames = frames[np.linspace(0, len(frames) - 1, count).round().astype(int)]
+    return frames
+
+
+@timed("utils.concat_clips")
+def concat_clips(clips: list[Path], output_fp: Path) -> Path:
+    """
+    Join clips with the same codecs into one file without re-encoding.
+
+    Args:
+        clips (list[Path]): Clips in playback order.
+        output_fp (Path): Path of the joined file.
+
+    Returns:
+        Path: The joined file
+
+    Raises:
+        ValueError: If no clips are given.
+    """
+    if not clips:
+        raise ValueError("No clips to join")
+    output_fp = Path(output_fp)
+    if len(clips) == 1:
+        return Path(clips[0]).replace(output_fp)
+
+    # The concat demuxer reads the clips from a list file
+    list_fp = output_fp.with_suffix(".txt")
+    list_fp.write_text("".join(f"file '{Path(clip).absolute()}'\n" for clip in clips))
+    try:
+        (
+            ffmpeg.input(str(list_fp), format="concat", safe=0)
+            .output(str(output_fp.absolute()), c="copy", movflags="+faststart")
+            .overwrite_output()
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as exc:
+        logger.error("FFmpeg error", exc_info=True)
+        raise exc
+    finally:
+        list_fp.unlink(missing_ok=True)
+    return output_fp
+
+
+@timed("utils.cut_clip")
+def cut_clip(video_fp: Path, output_fp: Path, start: float, end: float | None = None) -> Path:
+    """
+    Copy the part of a video between two positions into a new file without re-encoding.
+
+    Without re-encoding the clip has to begin on a keyframe, so it holds the frames from the
+    keyframe at or before `start`. An edit list hides them and playback begins at `start`.
+
+    Args:
+        video_fp (Path): Path to the source video. It may still be growing.
+        output_fp (Path): Path of the clip.
+        start (float): Seconds from the start of the source.
+        end (float | None, optional): Seconds from the start of the source. Defaults to the end.
+
+    Returns:
+        Path: The clip
+
+    Raises:
+        ValueError: If `end` is not after `start`.
+    """
+    if end is not None and end <= start:
+        raise ValueError(f"Clip end {end:.3f} is not after its start {start:.3f}")
+    output_fp = Path(output_fp)
+    duration = {} if end is None else {"t": end - max(start, 0)}
+    try:
+        (
+            ffmpeg.input(str(Path(video_fp).absolute()), ss=max(start, 0))
+            .output(str(output_fp.absolute()), c="copy", movflags="+faststart", **duration)
+            .overwrite_output()
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as exc:
+        logger.error("FFmpeg error", exc_info=True)
+        raise exc
+    return output_fp
+
+
+def _extract_audio_timed(video_fp: Path, bitrate: str, codec: str, copy: bool) -> AudioExtraction:
+    """Probe once and extract the audio of a single file, recording the time of each step."""
+    result = AudioExtraction(video_fp=Path(video_fp))
+    try:
+        start = time.perf_counter()
+        probe_result = probe(video_fp)
+        result.probe_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result.audio_fp = extract_audio(
+            video_fp, bitrate=bitrate, codec=codec, copy=copy, probe_result=probe_result
+        )
+        result.extract_time = time.perf_counter() - start
+    except ffmpeg.Error as exc:
+        result.error = exc.stderr.decode(errors="replace") if exc.stderr else str(exc)
+    except Exception as exc:
+        result.error = str(exc)
+    return result
+
+
+@timed("utils.extract_audio_batch")
+def extract_audio_batch(
+    video_fps: list[Path],
+    bitrate: str = "192k",
+    codec: str = "libmp3lame",
+    copy: bool = False,
+    max_workers: int | None = None,
+) -> list[AudioExtraction]:
+    """
+    Extract audio from many video files in parallel across a process pool.
+
+    Each file is probed exactly once and the probe is reused for extraction.
+    Failures are reported per file in `AudioExtraction.error` instead of raising.
+
+    Args:
+        video_fps (list[Path]): Paths to the input video files.
+        bitrate (str, optional): Audio bitrate. Defaults to '192k'.
+        codec (str, optional): Audio codec to use. Defaults to 'libmp3lame'.
+        copy (bool, optional): Stream-copy AAC tracks instead of re-encoding. Defaults to False.
+        max_workers (int, optional): Pool size. Defaults to the CPU count.
+
+    Returns:
+        list[AudioExtraction]: One result per input file, in input order.
+    """
+    if not video_fps:
+        return []
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(video_fps))
+    logger.info(f"Extracting audio from {len(video_fps)} files with {max_workers} workers")
+
+    n = len(video_fps)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(_extract_audio_timed, video_fps, [bitrate] * n, [codec] * n, [copy] * n)
+        )
@@ -1,13 +1,15 @@
+import asyncio
+import hashlib
 import logging
 import re
 from pathlib import Path
 from typing import Optional
 from urllib.parse import urlparse
 
-import yt_dlp
 from pydantic import BaseModel
 
 from kronik.logger import downloader_logger as logger
+from kronik.metrics import timed
 from kronik.models import TikTokStats
 
 
@@ -20,6 +22,16 @@ class DownloadConfig(BaseModel):
     resolution: str = "720"
     logs: bool = True
 
+    # Resume and retry policy
+    retries: int = 3
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+    verify: bool = True
+
+
+class DownloadIntegrityError(Exception):
+    """Raised when a downloaded file fails size or checksum verification"""
+
 
 class TikTokDownloader:
     """Downloads TikTok videos with error handling and logging"""
@@ -33,9 +45,15 @@ class TikTokDownloader:
         if not config.logs:
             self.logger.disabled = True
 
+    @timed("utils.download")
     async def download(self, url: str) -> Optional[tuple[Path, TikTokStats]]:
         """Downloads a TikTok video and returns its saved path and info asynchronously
 
+        Partial downloads are kept as .part files, and yt-dlp retries and resumes them with
+        exponential backoff. Other download errors, such as a failed webpage fetch, are retried
+        once after a backoff. Completed files are verified before being returned, and a file
+        that fails verification is downloaded once more from scratch.
+
         Args:
             url: TikTok video URL
 
@@ -51,22 +69,98 @@ class TikTokDownloader:
         output_path = self._get_output_path(url=url)
         self.logger.debug(f"Downloading: {url}")
 
-        try:
-            info = self._download_video(url, output_path)
-
-            self.logger.info(f"Downloaded {url} to {output_path}")
-            return output_path, TikTokStats.from_info(info=info)
-
-        except Exception as e:
-            self.logger.error(f"Failed to Download: {str(e)}")
-            return None
+        # Drop a completed file that no longer matches its recorded checksum
+        if self.config.verify and not self._verify_checksum(output_path):
+            self.logger.warning(f"Checksum mismatch, discarding corrupt file: {output_path}")
+            output_path.unlink(missing_ok=True)
+
+        # Media transfers are retried inside yt-dlp, but webpage and API fetches mostly are not,
+        # so this loop restarts bad files and retries other download errors once after a backoff
+        error: Exception | None = None
+        for attempt in range(2):
+            try:
+                info = await asyncio.to_thread(self._download_video, url, output_path)
+                if self.config.verify:
+                    self._verify_download(output_path, info)
+
+                self.logger.info(f"Downloaded {url} to {output_path}")
+                return output_path, TikTokStats.from_info(info=info)
+
+            except DownloadIntegrityError as e:
+                # A complete but bad file cannot be resumed, so start over
+                self.logger.warning(f"Integrity check failed: {str(e)}")
+                output_path.unlink(missing_ok=True)
+                self._checksum_path(output_path).unlink(missing_ok=True)
+                error = e
+
+            except Exception as e:
+                from yt_dlp.utils import DownloadError
+
+                # The .part file is kept, so the retry or a later call resumes it
+                error = e
+                if attempt or not isinstance(e, DownloadError):
+                    break
+                delay = self._backoff(attempt)
+                self.logger.warning(f"Download failed, retrying in {delay:.0f}s: {str(e)}")
+                await asyncio.sleep(delay)
+
+        self.logger.error(f"Failed to Download: {str(error)}")
+        return None
 
     def _download_video(self, url: str, output_path: Path) -> dict:
         """Helper method to perform the actual download"""
+        # yt-dlp is slow to import, so only load it when something is downloaded
+        import yt_dlp
+
         with yt_dlp.YoutubeDL(self._get_ydl_options(output_path)) as ydl:
             info = ydl.extract_info(url, download=True)
             return info
 
+    def _backoff(self, n: int) -> float:
+        """Exponential backoff delay in seconds before retry `n`, counted from 0
+
+        yt-dlp calls this as `sleep_func(n=...)`, so the parameter must be named `n`.
+        """
+        return min(self.config.backoff_max, self.config.backoff_base * 2**n)
+
+    def _verify_download(self, output_path: Path, info: dict) -> None:
+        """Checks the completed file against the expected size and records its checksum"""
+        if not output_path.exists():
+            raise DownloadIntegrityError(f"Missing output file: {output_path}")
+
+        size = output_path.stat().st_size
+        if size == 0:
+            raise DownloadIntegrityError(f"Empty output file: {output_path}")
+
+        expected_size = info.get("filesize")
+        if isinstance(expected_size, int) and expected_size != size:
+            raise DownloadIntegrityError(
+                f"Size mismatch for {output_path}: expected {expected_size}, got {size}"
+            )
+
+        self._checksum_path(output_path).write_text(self._sha256(output_path))
+
+    def _verify_checksum(self, output_path: Path) -> bool:
+        """Returns False if a completed file exists but does not match its recorded checksum"""
+        checksum_path = self._checksum_path(output_path)
+        if not output_path.exists() or not checksum_path.exists():
+            return True
+        return checksum_path.read_text().strip() == self._sha256(output_path)
+
+    @staticmethod
+    def _checksum_path(output_path: Path) -> Path:
+        """Sidecar file holding the SHA-256 of a completed download"""
+        return output_path.with_name(f"{output_path.name}.sha256")
+
+    @staticmethod
+    def _sha256(fp: Path, chunk_size: int = 1 << 20) -> str:
+        """Computes the SHA-256 hex digest of a file in chunks"""
+        digest = hashlib.sha256()
+        with open(fp, "rb") as f:
+            while chunk := f.read(chunk_size):
+                digest.update(chunk)
+        return digest.hexdigest()
+
     @staticmethod
     def _is_tiktok_url(url: str) -> bool:
         """Checks if URL matches TikTok pattern"""
@@ -106,6 +200,17 @@ class TikTokDownloader:
                 "Chrome/91.0.4472.124 Safari/537.36"
             },
             "logger": None,
+            # Write to .part files, resume them with range requests and rename on completion
+            "continuedl": True,
+            "nopart": False,
+            "retries": self.config.retries,
+            "fragment_retries": self.config.retries,
+            "extractor_retries": self.config.retries,
+            "retry_sleep_functions": {
+                "http": self._backoff,
+                "fragment": self._backoff,
+                "extractor": self._backoff,
+            },
         }
 
         if self.config.use_chrome_cookies:
@@ -1,19 +1,188 @@
 import logging
+import os
+import platform
+import sys
+from abc import ABC, abstractmethod
+from functools import lru_cache
 from pathlib import Path
 
-import mlx_whisper
+import numpy as np
+
+from kronik.metrics import timed
+
+from .av import SAMPLE_RATE, decode_audio
 
 logger = logging.getLogger(__name__)
 
 
-def transcribe(speech_fp: Path) -> str:
-    """Transcribe a speech file using MLX Whisper."""
-    logger.info(f"Starting transcription of file: {speech_fp}")
+class TranscriptionBackend(ABC):
+    """
+    A speech-to-text model that is loaded once and kept warm across calls.
+
+    Audio is either a path to an audio file or 16 kHz mono float32 samples.
+    """
+
+    name: str
+    default_model: str
+
+    def __init__(self, model: str | None = None):
+        self.model = model or self.default_model
+        self._loaded = False
+
+    def load(self) -> None:
+        """Load the model weights if they are not loaded yet."""
+        if not self._loaded:
+            logger.info(f"Loading {self.name} transcription model: {self.model}")
+            self._load()
+            self._loaded = True
+
+    def transcribe(self, audio: Path | np.ndarray) -> str:
+        """Transcribe a single clip."""
+        self.load()
+        return self._transcribe(audio)
+
+    def transcribe_batch(self, audios: list[Path | np.ndarray]) -> list[str]:
+        """Transcribe several clips, in one forward pass where the backend supports it."""
+        self.load()
+        return self._transcribe_batch(audios)
+
+    def _transcribe_batch(self, audios: list[Path | np.ndarray]) -> list[str]:
+        """Transcribe several clips with the loaded model. Defaults to one clip at a time."""
+        return [self._transcribe(audio) for audio in audios]
+
+    @abstractmethod
+    def _load(self) -> None:
+        """Load the model weights."""
+
+    @abstractmethod
+    def _transcribe(self, audio: Path | np.ndarray) -> str:
+        """Transcribe a single clip with the loaded model."""
+
+
+class MLXWhisperBackend(TranscriptionBackend):
+    """Whisper on Apple Silicon via MLX."""
+
+    name = "mlx"
+    # mlx_whisper's own default, used before backends were pluggable
+    default_model = "mlx-community/whisper-tiny"
+
+    def _load(self) -> None:
+        import mlx_whisper
+
+        self._mlx_whisper = mlx_whisper
+
+        # mlx_whisper caches the last model it loaded, so a silent clip warms it up
+        self._mlx_whisper.transcribe(np.zeros(SAMPLE_RATE, np.float32), path_or_hf_repo=self.model)
+
+    def _transcribe(self, audio: Path | np.ndarray) -> str:
+        audio = audio if isinstance(audio, np.ndarray) else str(audio)
+        result = self._mlx_whisper.transcribe(audio, path_or_hf_repo=self.model)
+        return result["text"]
+
+
+class TransformersWhisperBackend(TranscriptionBackend):
+    """Whisper on CPU (or any torch device) via the transformers pipeline."""
+
+    name = "transformers"
+    default_model = "openai/whisper-base"
+
+    def __init__(self, model: str | None = None, device: str = "cpu"):
+        super().__init__(model)
+        self.device = device
+
+    def _load(self) -> None:
+        from transformers import pipeline
+
+        self._pipeline = pipeline(
+            "automatic-speech-recognition",
+            model=self.model,
+            device=self.device,
+            chunk_length_s=30,
+        )
+
+    def _transcribe(self, audio: Path | np.ndarray) -> str:
+        return self._pipeline(self._pipeline_input(audio))["text"]
+
+    def _transcribe_batch(self, audios: list[Path | np.ndarray]) -> list[str]:
+        # The feature extractor pads every clip to the same length for a batched forward pass
+        inputs = [self._pipeline_input(audio) for audio in audios]
+        return [result["text"] for result in self._pipeline(inputs, batch_size=len(inputs))]
+
+    @staticmethod
+    def _pipeline_input(audio: Path | np.ndarray) -> str | dict:
+        if isinstance(audio, np.ndarray):
+            return {"raw": audio, "sampling_rate": SAMPLE_RATE}
+        return str(audio)
+
+
+BACKENDS: dict[str, type[TranscriptionBackend]] = {
+    MLXWhisperBackend.name: MLXWhisperBackend,
+    TransformersWhisperBackend.name: TransformersWhisperBackend,
+}
+
+
+def register_backend(backend: type[TranscriptionBackend]) -> None:
+    """Make a backend selectable by its name."""
+    BACKENDS[backend.name] = backend
+
+
+def default_backend_name() -> str:
+    """The configured backend, falling back to MLX on Apple Silicon and transformers elsewhere."""
+    configured = os.environ.get("KRONIK_TRANSCRIBE_BACKEND")
+    if configured:
+        return configured
+    if sys.platform == "darwin" and platform.machine() == "arm64":
+        return MLXWhisperBackend.name
+    return TransformersWhisperBackend.name
+
+
+@lru_cache(maxsize=None)
+def _get_backend(name: str, model: str | None) -> TranscriptionBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend: {name}. Available: {', '.join(BACKENDS)}")
+    return BACKENDS[name](model)
+
+
+def get_backend(name: str | None = None, model: str | None = None) -> TranscriptionBackend:
+    """
+    Get a shared backend instance so the model is only loaded once per process.
+
+    Args:
+        name: Backend name. Defaults to `KRONIK_TRANSCRIBE_BACKEND` or the platform default.
+        model: Model name or path. Defaults to `KRONIK_TRANSCRIBE_MODEL` or the backend default.
+    """
+    return _get_backend(
+        name or default_backend_name(), model or os.environ.get("KRONIK_TRANSCRIBE_MODEL")
+    )
+
+
+@timed("utils.transcribe")
+def transcribe(speech: Path | np.ndarray, backend: TranscriptionBackend | None = None) -> str:
+    """
+    Transcribe speech with the configured Whisper backend.
+
+    Args:
+        speech: Path to an audio file, or 16 kHz mono float32 samples held in memory
+        backend: Backend to use. Defaults to `get_backend()`.
+    """
+    backend = backend or get_backend()
+    source = "audio buffer" if isinstance(speech, np.ndarray) else speech
+    logger.info(f"Starting transcription of {source} with {backend.name}")
     try:
-        result = mlx_whisper.transcribe(str(speech_fp))
-        text = result["text"]
-        logger.info(f"Successfully transcribed file: {speech_fp}")
+        text = backend.transcribe(speech)
+        logger.info(f"Successfully transcribed {source}")
         return text
     except Exception as e:
-        logger.error(f"Error transcribing file {speech_fp}: {str(e)}")
+        logger.error(f"Error transcribing {source}: {str(e)}")
         raise
+
+
+def transcribe_video(video_fp: Path, backend: TranscriptionBackend | None = None) -> str:
+    """
+    Transcribe the audio of a video without writing an intermediate audio file.
+    Returns an empty string if the video has no audio stream.
+    """
+    audio = decode_audio(video_fp)
+    if audio is None:
+        return ""
+    return transcribe(audio, backend=backend)
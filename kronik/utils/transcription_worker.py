@@ -0,0 +1,269 @@
+"""
+kronik/utils/transcription_worker.py
+
+A long-lived transcription process that loads the model once at startup.
+
+Clips are submitted from the main process through a queue and returned as futures.
+The worker groups queued clips into batches so backends that support it
+transcribe them in a single forward pass.
+"""
+
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from itertools import count
+
+import numpy as np
+
+from .av import SAMPLE_RATE
+from .transcribe import TranscriptionBackend, get_backend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TranscriptionMetrics:
+    """Running latency and throughput figures for a transcription worker."""
+
+    clips: int = 0
+    batches: int = 0
+    errors: int = 0
+    audio_seconds: float = 0.0
+    busy_seconds: float = 0.0
+    started_at: float = field(default_factory=time.perf_counter)
+    latencies: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    def record(self, latencies: list[float], audio_seconds: float, busy_seconds: float) -> None:
+        self.clips += len(latencies)
+        self.batches += 1
+        self.audio_seconds += audio_seconds
+        self.busy_seconds += busy_seconds
+        self.latencies.extend(latencies)
+
+    def snapshot(self) -> dict:
+        """Current metrics as a plain dict."""
+        elapsed = time.perf_counter() - self.started_at
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "clips": self.clips,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": self.clips / self.batches if self.batches else 0.0,
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p95": float(np.percentile(latencies, 95)),
+            "clips_per_second": self.clips / elapsed if elapsed else 0.0,
+            "realtime_factor": self.audio_seconds / self.busy_seconds if self.busy_seconds else 0.0,
+        }
+
+
+def _serve(
+    backend: str | type[TranscriptionBackend] | None,
+    model: str | None,
+    max_batch_size: int,
+    requests: mp.Queue,
+    responses: mp.Queue,
+) -> None:
+    """Worker process entry point: load the model once, then transcribe batches until stopped."""
+    try:
+        if isinstance(backend, type):
+            instance = backend(model)
+        else:
+            instance = get_backend(backend, model)
+        instance.load()
+    except Exception as e:
+        responses.put(("error", repr(e)))
+        return
+    responses.put(("ready", instance.name))
+
+    stopping = False
+    while not stopping:
+        # Block for the first request, then drain whatever else is queued into the same batch
+        pending = [requests.get()]
+        while pending[-1] is not None and sum(len(p[1]) for p in pending) < max_batch_size:
+            try:
+                pending.append(requests.get_nowait())
+            except queue.Empty:
+                break
+        if pending[-1] is None:
+            stopping = True
+            pending.pop()
+        if not pending:
+            continue
+
+        audios = [audio for _, batch in pending for audio in batch]
+        start = time.perf_counter()
+        try:
+            texts = instance.transcribe_batch(audios)
+            error = None
+        except Exception as e:
+            texts, error = None, repr(e)
+        busy = time.perf_counter() - start
+
+        offset = 0
+        for batch_id, batch in pending:
+            result = texts[offset : offset + len(batch)] if texts is not None else None
+            share = busy * len(batch) / len(audios)
+            responses.put(("result", (batch_id, result, error, share)))
+            offset += len(batch)
+
+
+class TranscriptionWorker:
+    """
+    Transcribes audio buffers in a separate, persistent process.
+
+    Usage:
+        with TranscriptionWorker() as worker:
+            future = worker.submit(decode_audio(video_fp))
+            text = future.result()
+    """
+
+    def __init__(
+        self,
+        backend: str | type[TranscriptionBackend] | None = None,
+        model: str | None = None,
+        max_batch_size: int = 8,
+    ):
+        self.backend = backend
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.metrics = TranscriptionMetrics()
+
+        self._ctx = mp.get_context("spawn")
+        self._requests: mp.Queue | None = None
+        self._responses: mp.Queue | None = None
+        self._process: mp.Process | None = None
+        self._collector: threading.Thread | None = None
+        self._pending: dict[int, tuple[list[Future], list[float], float]] = {}
+        self._ids = count()
+        self._lock = threading.Lock()
+
+    def start(self, timeout: float = 300.0) -> None:
+        """
+        Start the worker process and wait until its model is loaded.
+
+        Args:
+            timeout: Seconds to wait for the model to load
+
+        Raises:
+            RuntimeError: If the worker fails to load the model or exits while loading it
+            TimeoutError: If the model is not loaded in time
+        """
+        self._requests = self._ctx.Queue()
+        self._responses = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_serve,
+            args=(self.backend, self.model, self.max_batch_size, self._requests, self._responses),
+            daemon=True,
+        )
+        self._process.start()
+
+        # Poll, so a worker that dies without reporting, e.g. on an import crash, is noticed
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                kind, payload = self._responses.get(timeout=0.5)
+                break
+            except queue.Empty:
+                if not self._process.is_alive():
+                    exitcode = self._process.exitcode
+                    self._process = None
+                    raise RuntimeError(f"Transcription worker exited while starting ({exitcode})")
+                if time.monotonic() >= deadline:
+                    self._process.terminate()
+                    self._process.join()
+                    self._process = None
+                    raise TimeoutError(f"Transcription worker did not start in {timeout}s")
+
+        if kind == "error":
+            self._process.join()
+            self._process = None
+            raise RuntimeError(f"Transcription worker failed to start: {payload}")
+        logger.info(f"Transcription worker ready with {payload} backend")
+
+        self.metrics = TranscriptionMetrics()
+        self._collector = threading.Thread(target=self._collect, args=(self._process,), daemon=True)
+        self._collector.start()
+
+    def stop(self) -> None:
+        """Finish queued work and shut the worker down."""
+        if self._process is None:
+            return
+        self._requests.put(None)
+        self._process.join()
+        self._responses.put(None)
+        self._collector.join()
+        self._process = None
+
+    def submit(self, audio: np.ndarray) -> Future:
+        """Queue a single 16 kHz mono clip. The future resolves to its transcript."""
+        return self.submit_batch([audio])[0]
+
+    def submit_batch(self, audios: list[np.ndarray]) -> list[Future]:
+        """Queue several clips. Returns one future per clip, in order."""
+        if self._process is None or not self._process.is_alive():
+            raise RuntimeError("Transcription worker is not running")
+
+        futures = []
+        for i in range(0, len(audios), self.max_batch_size):
+            batch = audios[i : i + self.max_batch_size]
+            batch_futures = [Future() for _ in batch]
+            audio_seconds = [len(audio) / SAMPLE_RATE for audio in batch]
+            with self._lock:
+                batch_id = next(self._ids)
+                self._pending[batch_id] = (batch_futures, audio_seconds, time.perf_counter())
+            self._requests.put((batch_id, batch))
+            futures.extend(batch_futures)
+        return futures
+
+    def _collect(self, process: mp.Process) -> None:
+        """Resolve futures as results come back from the worker process."""
+        while True:
+            try:
+                message = self._responses.get(timeout=0.5)
+            except queue.Empty:
+                # Results already sent are drained first, so only lost work is failed here
+                if not process.is_alive():
+                    self._fail_pending(f"Transcription worker exited ({process.exitcode})")
+                    return
+                continue
+            if message is None:
+                break
+
+            batch_id, texts, error, busy = message[1]
+            with self._lock:
+                futures, audio_seconds, submitted_at = self._pending.pop(batch_id)
+
+            latency = time.perf_counter() - submitted_at
+            if error is not None:
+                self.metrics.errors += len(futures)
+                for future in futures:
+                    future.set_exception(RuntimeError(error))
+                continue
+
+            self.metrics.record([latency] * len(futures), sum(audio_seconds), busy)
+            for future, text in zip(futures, texts):
+                future.set_result(text)
+        self._fail_pending("Transcription worker stopped")
+
+    def _fail_pending(self, reason: str) -> None:
+        """Fail the futures of every batch the worker will not answer."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if pending:
+            logger.error(f"{reason} with {len(pending)} batches pending")
+        for futures, _, _ in pending.values():
+            self.metrics.errors += len(futures)
+            for future in futures:
+                future.set_exception(RuntimeError(reason))
+
+    def __enter__(self) -> "TranscriptionWorker":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -13,7 +13,7 @@ import sys
 
 from kronik import DATA_DIR, PROJECT_ROOT
 from kronik.logger import setup_logger
-from kronik.store.client import db
+from kronik.store.client import get_db
 
 logger = setup_logger(__name__)
 
@@ -46,6 +46,7 @@ def initialize_db():
     schema_path = PROJECT_ROOT.joinpath("scripts", "init.sql")
 
     logger.info("Initializing database")
+    db = get_db()
     with open(schema_path) as f:
         db.executescript(f.read())
     db.commit()
@@ -0,0 +1,124 @@
+import io
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from kronik.brain.preference import (
+    ClipFeatures,
+    PreferenceModel,
+    author_from_link,
+    dhash,
+    evaluate,
+    stored_examples,
+)
+from kronik.llm.fake import DEFAULT_ANALYSES
+from kronik.store.analytics import AnalysisSink
+
+
+def png(pixels: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(pixels.astype(np.uint8)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def examples(n: int) -> list[tuple[ClipFeatures, bool]]:
+    """Authors whose videos are always liked or always skipped"""
+    return [(ClipFeatures(author=f"author{i % 10}"), i % 10 < 4) for i in range(n)]
+
+
+def test_author_from_link():
+    assert author_from_link("https://www.tiktok.com/@Someone/video/123") == "someone"
+    assert author_from_link("https://vm.tiktok.com/ZMabc/") is None
+    assert author_from_link(None) is None
+
+
+def test_dhash_neighbours():
+    """Tests slightly different frames hash closer than unrelated ones"""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (240, 135))
+    noisy = np.clip(frame + rng.integers(-5, 5, frame.shape), 0, 255)
+    other = rng.integers(0, 255, (240, 135))
+
+    base = dhash(png(frame))
+    assert bin(base ^ dhash(png(noisy))).count("1") < bin(base ^ dhash(png(other))).count("1")
+
+
+def test_undecided_until_trained():
+    """Tests the model defers to the LLM until it has seen enough examples"""
+    model = PreferenceModel(min_examples=50, explore_rate=0.0)
+    assert model.decide(ClipFeatures(author="author0")) is None
+
+    for features, like in examples(300):
+        model.observe(features, like)
+
+    assert model.decide(ClipFeatures(author="author0")) is True
+    assert model.decide(ClipFeatures(author="author9")) is False
+    assert model.decide(ClipFeatures(author="unknown")) is None
+
+
+def test_evaluate_reports_savings():
+    """Tests LLM calls are saved once the model is confident"""
+    report = evaluate(examples(1000), min_examples=100, seed=0)
+
+    assert report["clips"] == 1000
+    assert report["llm_calls"] + report["llm_calls_saved"] == 1000
+    assert report["llm_calls_saved"] > 500
+    assert report["precision"] == 1.0
+    assert report["recall"] == 1.0
+
+
+def test_no_signal_no_decisions():
+    """Tests random hashes and a skewed like rate do not let the bias decide every clip"""
+    rng = np.random.default_rng(0)
+    clips = [
+        (ClipFeatures(phash=int(rng.integers(0, 2**63))), bool(rng.random() < 0.1))
+        for _ in range(1500)
+    ]
+    report = evaluate(clips, min_examples=100, seed=0)
+
+    assert report["llm_calls_saved"] < 5
+
+
+def test_track_decides():
+    """Tests a liked audio track backs a decision when the author is unknown"""
+    model = PreferenceModel(min_examples=50, threshold=0.8, explore_rate=0.0)
+    for i in range(300):
+        track = "chill beats" if i % 10 == 0 else f"track{i}"
+        model.observe(ClipFeatures(caption=f"clip {i}", track=track), i % 10 == 0)
+
+    assert model.decide(ClipFeatures(caption="new clip", track="Chill Beats")) is True
+    assert model.decide(ClipFeatures(caption="new clip", track="another")) is None
+
+
+def test_save_load(tmp_path):
+    model = PreferenceModel(dim=1024)
+    for features, like in examples(20):
+        model.observe(features, like)
+    model.save(tmp_path.joinpath("model.npz"))
+
+    loaded = PreferenceModel.load(tmp_path.joinpath("model.npz"), threshold=0.8)
+    assert loaded.examples == 20
+    assert loaded.threshold == 0.8
+    features = ClipFeatures(author="author0")
+    assert loaded.predict_proba(features) == pytest.approx(model.predict_proba(features))
+    assert loaded.supported(features, True) == model.supported(features, True)
+
+
+def test_stored_examples(tmp_path):
+    """Tests labelled clips are read back from the analysis store in order"""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with AnalysisSink("session", tmp_path) as sink:
+        for i, analysis in enumerate(DEFAULT_ANALYSES):
+            sink.append(
+                analysis,
+                recorded_at=start + timedelta(minutes=i),
+                link=f"https://www.tiktok.com/@author{i}/video/{i}",
+                phash=2**64 - 1,
+            )
+
+    stored = stored_examples(tmp_path)
+    assert [like for _, like in stored] == [analysis.like for analysis in DEFAULT_ANALYSES]
+    assert stored[0][0].author == "author0"
+    assert stored[0][0].phash == 2**64 - 1
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from kronik import PROJECT_ROOT
+from kronik.brain.prescreen import PreScreener, ScreenClass, is_loading
+from kronik.utils.av import sample_frames
+
+TIKTOK_FP = PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")
+
+
+def test_sample_frames():
+    """Tests keyframes are decoded at the requested size"""
+    frames = sample_frames(TIKTOK_FP, count=4, size=64)
+    assert frames.dtype == np.uint8
+    assert 1 <= len(frames) <= 4
+    assert frames.shape[1:] == (64, 64, 3)
+
+
+def test_is_loading():
+    """Tests blank frames are detected without a model"""
+    rng = np.random.default_rng(0)
+    black = np.zeros((2, 32, 32, 3), np.uint8)
+    spinner = black.copy()
+    spinner[:, 15:17, 15:17] = 255
+    content = rng.integers(0, 255, (2, 32, 32, 3), dtype=np.uint8)
+
+    assert is_loading(black)
+    assert is_loading(spinner)
+    assert not is_loading(content)
+    assert not is_loading(sample_frames(TIKTOK_FP))
+
+
+def test_blank_clip_skips_model():
+    """Tests loading screens are classified before the model is loaded"""
+    screener = PreScreener()
+    result = screener.classify_frames(np.zeros((3, 32, 32, 3), np.uint8))
+    assert result.label == ScreenClass.LOADING
+    assert result.skip
+    assert not screener._loaded
+
+
+def test_classify_content():
+    """Tests a regular clip passes the zero-shot pre-screen"""
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+
+    result = PreScreener().classify(TIKTOK_FP)
+    assert set(result.scores) == set(ScreenClass)
+    assert result.label == ScreenClass.NORMAL
@@ -0,0 +1,126 @@
+import pytest
+
+from kronik import PROJECT_ROOT
+from kronik.brain.prompts import (
+    ANALYZE_TIKTOK,
+    DEFAULT_PERSONA,
+    Persona,
+    Prompt,
+    category_list,
+    get_prompt,
+    register_prompt,
+)
+from kronik.brain.tiktok import (
+    MODEL,
+    _is_cache_missing,
+    analyze_tiktok,
+    analyze_tiktok_personas,
+)
+from kronik.llm.cache import PromptCache
+from kronik.llm.client import set_client
+from kronik.llm.fake import FakeGenAIClient
+from kronik.models import Category
+
+TIKTOK_FP = PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")
+
+
+@pytest.fixture(autouse=True)
+def prompt_cache(monkeypatch):
+    # The real prompt is below the model's cache minimum
+    cache = PromptCache(min_tokens={})
+    monkeypatch.setattr("kronik.brain.tiktok.prompt_cache", cache)
+    yield cache
+    set_client(None)
+
+
+def test_prompt_registry():
+    """Tests the prompt lists every category and versions cannot be overwritten"""
+    assert all(f'"{category.value}"' in category_list() for category in Category)
+    assert category_list() in ANALYZE_TIKTOK.text
+    assert "$" not in ANALYZE_TIKTOK.text
+    # The persona is sent with each video, so the cached prompt is shared by all of them
+    assert DEFAULT_PERSONA.description not in ANALYZE_TIKTOK.text
+
+    assert get_prompt("analyze_tiktok") is ANALYZE_TIKTOK
+    with pytest.raises(ValueError):
+        register_prompt(Prompt("analyze_tiktok", 1, "Another prompt"))
+
+
+@pytest.mark.asyncio
+async def test_cached_prompt(prompt_cache):
+    """Tests the system prompt is cached once and not sent with each call"""
+    llm = FakeGenAIClient()
+    set_client(llm)
+
+    for _ in range(3):
+        assert await analyze_tiktok(TIKTOK_FP) is not None
+
+    assert len(llm.caches) == 1
+    assert llm.cached_calls == 3
+    assert llm.prompt_chars == 0
+    assert (prompt_cache.hits, prompt_cache.misses) == (3, 0)
+
+    # A cache that expired on the provider is recreated
+    llm.caches.clear()
+    assert await analyze_tiktok(TIKTOK_FP) is not None
+    assert llm.calls == 4
+    assert list(llm.caches) == ["cachedContents/1"]
+
+
+@pytest.mark.asyncio
+async def test_personas_share_cache():
+    """Tests several personas analyze one clip with a single cached prompt"""
+    llm = FakeGenAIClient()
+    set_client(llm)
+    chef = Persona("chef", "Assume the persona of a chef who only likes cooking videos.")
+
+    analyses = await analyze_tiktok_personas(TIKTOK_FP, [DEFAULT_PERSONA, chef])
+
+    assert list(analyses) == ["premed", "chef"]
+    assert all(analysis is not None for analysis in analyses.values())
+    assert len(llm.caches) == 1
+    assert llm.cached_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_caching_unavailable(prompt_cache):
+    """Tests the prompt is sent as the system instruction when it cannot be cached"""
+    llm = FakeGenAIClient(caching=False)
+    set_client(llm)
+
+    for _ in range(2):
+        assert await analyze_tiktok(TIKTOK_FP) is not None
+
+    assert llm.cached_calls == 0
+    assert llm.prompt_chars == 2 * len(ANALYZE_TIKTOK.text)
+    assert prompt_cache.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_prompt_below_cache_minimum(monkeypatch):
+    """Tests a prompt too small for the model's cache is never sent to `caches.create`"""
+    cache = PromptCache()
+    monkeypatch.setattr("kronik.brain.tiktok.prompt_cache", cache)
+    llm = FakeGenAIClient()
+    set_client(llm)
+
+    for _ in range(2):
+        assert await analyze_tiktok(TIKTOK_FP) is not None
+
+    assert cache.min_tokens[MODEL] > len(ANALYZE_TIKTOK.text) // 4
+    assert llm.caches == {}
+    assert llm.prompt_chars == 2 * len(ANALYZE_TIKTOK.text)
+    assert cache.misses == 2
+
+
+def test_cache_missing_errors():
+    """Tests only errors about the cache count as a missing cache"""
+    from google.genai.errors import ClientError
+
+    def error(code: int, message: str) -> ClientError:
+        return ClientError(code, {"error": {"code": code, "message": message}})
+
+    assert _is_cache_missing(error(404, "CachedContent not found"))
+    assert _is_cache_missing(error(403, "Permission denied on CachedContent cachedContents/1"))
+    assert not _is_cache_missing(error(403, "Quota exceeded for the project"))
+    assert not _is_cache_missing(error(400, "Invalid argument"))
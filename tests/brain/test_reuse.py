@@ -0,0 +1,116 @@
+import time
+
+import numpy as np
+import pytest
+
+from kronik.brain.reuse import AnalysisIndex, AnalysisReuse, Neighbour, blend
+from kronik.llm.client import set_client
+from kronik.llm.fake import DEFAULT_ANALYSES, FakeGenAIClient
+
+LIKED, SKIPPED = DEFAULT_ANALYSES
+TRANSCRIPT = "Check out this portable solar charger with a built-in flashlight."
+
+
+@pytest.fixture
+def llm():
+    client = FakeGenAIClient(embedding_dim=64)
+    set_client(client)
+    yield client
+    set_client(None)
+
+
+def test_index_search():
+    """Tests neighbours are returned most similar first"""
+    index = AnalysisIndex(dim=3, capacity=1)
+    index.add([1, 0, 0], LIKED)
+    index.add([0, 1, 0], SKIPPED)
+    index.add([1, 1, 0], SKIPPED)
+
+    neighbours = index.search([1, 0.1, 0], k=2)
+    assert [n.analysis for n in neighbours] == [LIKED, SKIPPED]
+    assert neighbours[0].similarity == pytest.approx(0.995, abs=1e-3)
+    assert len(index.search([1, 0, 0], k=10)) == 3
+
+
+def test_index_search_latency():
+    """Tests hot queries over 10k analyses stay under a millisecond"""
+    rng = np.random.default_rng(0)
+    index = AnalysisIndex(dim=768)
+    for vector in rng.normal(size=(10_000, 768)):
+        index.add(vector, LIKED)
+    query = rng.normal(size=768)
+
+    index.search(query)
+    start = time.perf_counter()
+    for _ in range(100):
+        index.search(query)
+    # Generous bound for shared CI machines
+    assert (time.perf_counter() - start) / 100 < 0.005
+
+
+def test_clustered_index_finds_near_duplicates():
+    """Tests the clustered index still finds slightly perturbed copies"""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(3000, 64))
+    index = AnalysisIndex(dim=64, exact_limit=1000)
+    for i, vector in enumerate(vectors):
+        index.add(vector, DEFAULT_ANALYSES[i % 2].model_copy(update={"rating": i}))
+    assert index._centroids is not None
+
+    for i in rng.choice(len(vectors), 50, replace=False):
+        query = vectors[i] + rng.normal(scale=0.1, size=64)
+        neighbour = index.search(query, k=1)[0]
+        assert neighbour.analysis.rating == i
+        assert neighbour.similarity > 0.95
+
+
+def test_blend():
+    """Tests blending weights the like vote and rating by similarity"""
+    blended = blend([Neighbour(0.99, SKIPPED), Neighbour(0.97, LIKED), Neighbour(0.96, LIKED)])
+    assert blended.like is True
+    assert blended.category == SKIPPED.category
+    assert blended.rating == 4
+    assert blend([Neighbour(0.99, SKIPPED)]) == SKIPPED
+
+
+@pytest.mark.asyncio
+async def test_lookup_reuses_identical_text(llm):
+    """Tests a repeated transcript reuses the stored analysis"""
+    reuse = AnalysisReuse(threshold=0.95)
+
+    analysis, embedding = await reuse.lookup(TRANSCRIPT)
+    assert analysis is None
+    reuse.remember(TRANSCRIPT, embedding, SKIPPED)
+
+    analysis, _ = await reuse.lookup(TRANSCRIPT)
+    assert analysis == SKIPPED
+    assert (reuse.hits, reuse.misses) == (1, 1)
+
+    # Unrelated transcripts are not matched
+    analysis, _ = await reuse.lookup("A person dancing to a popular song in a park.")
+    assert analysis is None
+
+
+@pytest.mark.asyncio
+async def test_lookup_skips_short_text(llm):
+    """Tests short transcripts are neither embedded nor matched"""
+    reuse = AnalysisReuse()
+    assert await reuse.lookup("la la") == (None, None)
+    assert llm.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_from_chroma(llm, tmp_path, monkeypatch):
+    """Tests remembered analyses persist in Chroma and reload into the index"""
+    chromadb = pytest.importorskip("chromadb")
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    monkeypatch.setattr("kronik.store.client.get_chroma", lambda: client)
+
+    reuse = AnalysisReuse.from_chroma(threshold=0.95)
+    _, embedding = await reuse.lookup(TRANSCRIPT)
+    reuse.remember(TRANSCRIPT, embedding, SKIPPED)
+
+    reloaded = AnalysisReuse.from_chroma(threshold=0.95)
+    assert len(reloaded.index) == 1
+    analysis, _ = await reloaded.lookup(TRANSCRIPT)
+    assert analysis == SKIPPED
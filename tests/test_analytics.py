@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from kronik.models import Analysis, Category, TikTokStats
+from kronik.store.analytics import (
+    AnalysisSink,
+    compact,
+    like_rate_by_category_per_day,
+    read_analyses,
+)
+
+
+def make_analysis(category: Category, like: bool) -> Analysis:
+    return Analysis(
+        transcript="transcript",
+        analysis="analysis",
+        tags=["tag"],
+        category=category,
+        rating=7,
+        like=like,
+    )
+
+
+def day(n: int) -> datetime:
+    return datetime(2025, 1, n, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Two sessions over two days, flushed in small part files"""
+    with AnalysisSink("session_a", tmp_path, flush_every=2) as sink:
+        sink.append(make_analysis(Category.TECH, True), recorded_at=day(1))
+        sink.append(make_analysis(Category.TECH, False), recorded_at=day(1))
+        sink.append(make_analysis(Category.FOOD, True), recorded_at=day(2))
+    with AnalysisSink("session_b", tmp_path, flush_every=2) as sink:
+        sink.append(make_analysis(Category.TECH, True), recorded_at=day(1))
+        sink.append(make_analysis(Category.TECH, True), recorded_at=day(1))
+        sink.append(make_analysis(Category.TECH, True), recorded_at=day(1))
+    return tmp_path
+
+
+def test_partitioned_layout(store):
+    """Tests part files are written per day and session"""
+    partitions = sorted(p.relative_to(store).parent.as_posix() for p in store.rglob("*.parquet"))
+    assert partitions == [
+        "date=2025-01-01/session=session_a",
+        "date=2025-01-01/session=session_b",
+        "date=2025-01-01/session=session_b",
+        "date=2025-01-02/session=session_a",
+    ]
+
+
+def test_like_rate_by_category_per_day(store):
+    """Tests the like rate is aggregated across sessions"""
+    rates = like_rate_by_category_per_day(store).to_pylist()
+    assert rates == [
+        {"date": "2025-01-01", "category": "TECH", "videos": 5, "likes": 4, "like_rate": 0.8},
+        {"date": "2025-01-02", "category": "FOOD", "videos": 1, "likes": 1, "like_rate": 1.0},
+    ]
+
+
+def test_compact(store):
+    """Tests compaction merges part files without losing rows"""
+    before = read_analyses(store).sort_by("recorded_at")
+
+    assert compact(store) == 1
+    assert len(list(store.rglob("*.parquet"))) == 3
+    assert compact(store) == 0
+
+    after = read_analyses(store).sort_by("recorded_at")
+    assert after.num_rows == before.num_rows == 6
+    assert like_rate_by_category_per_day(store).to_pylist()[0]["likes"] == 4
+
+
+def test_stats_columns(tmp_path):
+    """Tests TikTok stats are stored alongside the analysis"""
+    stats = TikTokStats(tiktok_url="https://www.tiktok.com/@tiktok/video/1", view_count=10)
+    with AnalysisSink("session", tmp_path) as sink:
+        sink.append(make_analysis(Category.MISC, False), stats=stats, video_id="recording_1")
+
+    row = read_analyses(tmp_path).to_pylist()[0]
+    assert row["video_id"] == "recording_1"
+    assert row["stats_tiktok_url"] == "https://www.tiktok.com/@tiktok/video/1"
+    assert row["stats_view_count"] == 10
+    assert row["stats_title"] is None
+
+
+def test_empty_store(tmp_path):
+    """Tests reading a store that has not been written yet"""
+    assert like_rate_by_category_per_day(tmp_path.joinpath("missing")).num_rows == 0
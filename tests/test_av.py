@@ -1,7 +1,13 @@
+import shutil
+import tempfile
 import unittest
+from pathlib import Path
+
+import numpy as np
 
 from kronik import PROJECT_ROOT
-from kronik.utils import extract_audio
+from kronik.utils import decode_audio, extract_audio, extract_audio_batch
+from kronik.utils.av import concat_clips, cut_clip, probe
 
 
 class TestExtractAudio(unittest.TestCase):
@@ -22,3 +28,96 @@ class TestExtractAudio(unittest.TestCase):
         # Clean up generated audio file
         if self.test_audio_fp.exists():
             self.test_audio_fp.unlink()
+
+
+class TestExtractAudioBatch(unittest.TestCase):
+    def setUp(self):
+        # Copy the bundled TikTok clip so outputs land in a temporary directory
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        source_fp = PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")
+        self.video_fps = []
+        for i in range(2):
+            video_fp = self.tmp_dir.joinpath(f"tiktok-{i}.mp4")
+            shutil.copy(source_fp, video_fp)
+            self.video_fps.append(video_fp)
+
+    def test_extract_audio_batch(self):
+        results = extract_audio_batch(self.video_fps, max_workers=2)
+
+        self.assertEqual([result.video_fp for result in results], self.video_fps)
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(result.audio_fp.suffix, ".mp3")
+            self.assertGreater(result.audio_fp.stat().st_size, 0)
+            self.assertGreater(result.extract_time, 0)
+
+    def test_extract_audio_batch_copy(self):
+        results = extract_audio_batch(self.video_fps, copy=True)
+
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(result.audio_fp.suffix, ".m4a")
+
+    def test_extract_audio_batch_missing_file(self):
+        results = extract_audio_batch([self.tmp_dir.joinpath("missing.mp4")])
+
+        self.assertIsNone(results[0].audio_fp)
+        self.assertIsNotNone(results[0].error)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+class TestDecodeAudio(unittest.TestCase):
+    def setUp(self):
+        self.test_video_fp = PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")
+
+    def test_decode_audio(self):
+        audio = decode_audio(self.test_video_fp)
+        duration = float(probe(self.test_video_fp)["format"]["duration"])
+
+        self.assertEqual(audio.dtype, np.float32)
+        self.assertEqual(audio.ndim, 1)
+        self.assertAlmostEqual(len(audio) / 16000, duration, delta=0.5)
+        self.assertLessEqual(np.abs(audio).max(), 1.0)
+
+    def test_decode_audio_no_temp_files(self):
+        before = set(self.test_video_fp.parent.iterdir())
+        decode_audio(self.test_video_fp)
+        self.assertEqual(set(self.test_video_fp.parent.iterdir()), before)
+
+
+class TestConcatClips(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        source_fp = PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")
+        self.duration = float(probe(source_fp)["format"]["duration"])
+        self.clips = []
+        for i in range(2):
+            clip_fp = self.tmp_dir.joinpath(f"clip-{i}.mp4")
+            shutil.copy(source_fp, clip_fp)
+            self.clips.append(clip_fp)
+
+    def test_concat_clips(self):
+        output_fp = concat_clips(self.clips, self.tmp_dir.joinpath("joined.mp4"))
+
+        duration = float(probe(output_fp)["format"]["duration"])
+        self.assertAlmostEqual(duration, 2 * self.duration, delta=0.5)
+        self.assertEqual(sorted(p.name for p in self.tmp_dir.glob("*.txt")), [])
+
+    def test_cut_clip(self):
+        output_fp = cut_clip(self.clips[0], self.tmp_dir.joinpath("cut.mp4"), 1.5, 3.5)
+
+        duration = float(probe(output_fp)["format"]["duration"])
+        self.assertAlmostEqual(duration, 2.0, delta=0.1)
+        with self.assertRaises(ValueError):
+            cut_clip(self.clips[0], self.tmp_dir.joinpath("empty.mp4"), 2.0, 1.0)
+
+    def test_concat_single_clip(self):
+        output_fp = concat_clips(self.clips[:1], self.tmp_dir.joinpath("single.mp4"))
+
+        self.assertTrue(output_fp.exists())
+        self.assertFalse(self.clips[0].exists())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
@@ -0,0 +1,16 @@
+from benchmarks.suite import Result, compare
+
+
+def test_compare_regressions():
+    """Tests only medians beyond the threshold count as regressions"""
+    baselines = {
+        "fast": {"median_ms": 10.0},
+        "slow": {"median_ms": 10.0},
+    }
+    results = [
+        Result("fast", 5, 9.0, 12.0, 15.0),
+        Result("slow", 5, 9.0, 13.0, 15.0),
+        Result("new", 5, 9.0, 100.0, 150.0),
+    ]
+
+    assert compare(results, baselines, threshold=0.25) == ["slow"]
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from kronik.control.dwell import DwellController, DwellPolicy, page_progress
+
+POLICY = DwellPolicy(
+    min_seconds=0.1, max_seconds=1.0, interval=0.02, settle_seconds=0.2, progress_every=0
+)
+
+
+class Screen:
+    """Serves one frame per sample, repeating the last one"""
+
+    def __init__(self, frames: list[np.ndarray]):
+        self.frames = frames
+        self.samples = 0
+
+    def __call__(self) -> np.ndarray:
+        frame = self.frames[min(self.samples, len(self.frames) - 1)]
+        self.samples += 1
+        return frame
+
+
+def frame(value: float) -> np.ndarray:
+    return np.full((32, 32), value, dtype=np.float32)
+
+
+def playing(count: int) -> list[np.ndarray]:
+    """Frames that keep changing, like a video playing"""
+    rng = np.random.default_rng(0)
+    return list(rng.random((count, 32, 32), dtype=np.float32))
+
+
+@pytest.mark.asyncio
+async def test_looped_video():
+    """Tests watching stops once the video is back at its first frame"""
+    video = playing(20)
+    dwell = await DwellController(Screen(video + video), POLICY).watch()
+
+    assert dwell.reason == "looped"
+    assert 18 <= dwell.samples <= 22
+
+
+@pytest.mark.asyncio
+async def test_still_screen():
+    """Tests a screen where nothing moves is left after the minimum time"""
+    dwell = await DwellController(Screen([frame(0.5)]), POLICY).watch()
+
+    assert dwell.reason == "still"
+    assert dwell.seconds < 0.3
+
+
+@pytest.mark.asyncio
+async def test_limits():
+    """Tests watching stops at a known duration or at the maximum"""
+    screen = Screen(playing(1000))
+    assert (await DwellController(screen, POLICY).watch(duration=0.3)).reason == "duration"
+    assert (await DwellController(screen, POLICY).watch()).reason == "max"
+
+
+@pytest.mark.asyncio
+async def test_progress_restart():
+    """Tests watching stops when the progress bar jumps back to the start"""
+    sources = iter(f'<android.widget.SeekBar text="{p}.0" />' for p in (10, 40, 80, 5))
+    policy = DwellPolicy(
+        min_seconds=0.1, max_seconds=2.0, interval=0.02, settle_seconds=0.2, progress_every=5
+    )
+    dwell = await DwellController(Screen(playing(1000)), policy, lambda: next(sources)).watch()
+
+    assert dwell.reason == "progress"
+
+
+@pytest.mark.asyncio
+async def test_wait_for_next():
+    """Tests the next video counts as shown once the screen changed and stopped sliding"""
+    sliding = [frame(0.2), frame(0.5), frame(0.9), frame(0.92)]
+    controller = DwellController(Screen(sliding), POLICY)
+    assert await controller.wait_for_next(frame(0.2))
+    assert controller.grab.samples == 4
+
+    # A scroll that did nothing leaves the same video on screen
+    assert not await DwellController(Screen([frame(0.2)]), POLICY).wait_for_next(frame(0.2))
+
+
+def test_page_progress():
+    source = (
+        '<hierarchy><android.widget.TextView text="caption" />'
+        '<android.widget.SeekBar index="3" text="12.5" bounds="[0,2200][1080,2210]" />'
+        "</hierarchy>"
+    )
+    assert page_progress(source) == 12.5
+    assert page_progress("<hierarchy />") is None
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from kronik import PROJECT_ROOT
+
+
+def loaded_modules(module: str, env: dict | None = None) -> set[str]:
+    """Import `module` in a fresh interpreter and return the names in sys.modules"""
+    result = subprocess.run(
+        # Report on stderr since log records are written to stdout from a background thread
+        [sys.executable, "-c", f"import sys, {module}; sys.stderr.write(' '.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env={**os.environ, **(env or {})},
+        check=True,
+    )
+    return set(result.stderr.split())
+
+
+@pytest.mark.parametrize(
+    "module, heavy",
+    [
+        ("kronik.session", ["numpy", "yt_dlp", "google.genai", "chromadb", "ffmpeg"]),
+        ("kronik.utils", ["numpy", "ffmpeg", "mlx_whisper", "transformers"]),
+        ("kronik.utils.tiktok_downloader", ["yt_dlp", "numpy"]),
+        ("kronik.utils.av", ["numpy"]),
+        ("kronik.llm.client", ["google.genai"]),
+        ("kronik.store.client", ["chromadb"]),
+        ("kronik.brain.tiktok", ["google.genai"]),
+        ("kronik.brain.prescreen", ["torch", "transformers"]),
+    ],
+)
+def test_heavy_modules_deferred(module, heavy):
+    """Tests heavy dependencies are not imported until they are used"""
+    modules = loaded_modules(module)
+    assert module in modules
+    assert not modules.intersection(heavy)
+
+
+def test_llm_client_import_without_api_key():
+    """Tests the LLM client module imports without GOOGLE_AI_API_KEY"""
+    env = {key: value for key, value in os.environ.items() if key != "GOOGLE_AI_API_KEY"}
+    result = subprocess.run(
+        [sys.executable, "-c", "import kronik.llm, kronik.brain.tiktok"],
+        capture_output=True,
+        cwd=PROJECT_ROOT,
+        env=env,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_lazy_utils_attribute():
+    """Tests kronik.utils resolves its exports on access"""
+    import kronik.utils
+
+    assert callable(kronik.utils.extract_audio)
+    with pytest.raises(AttributeError):
+        kronik.utils.missing
+
+
+def test_transcribe_after_submodule_import():
+    """Tests `transcribe` stays the function once its submodule has been imported"""
+    code = (
+        "import types, kronik.utils.transcription_worker; "
+        "from kronik.utils import transcribe; "
+        "assert not isinstance(transcribe, types.ModuleType), transcribe"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, cwd=PROJECT_ROOT
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from kronik.store import journal as events
+from kronik.store.journal import SessionJournal, replay
+
+
+@pytest.fixture
+def journal(tmp_path):
+    with SessionJournal("session_a", root=tmp_path) as journal:
+        yield journal
+
+
+def test_pending(journal, tmp_path):
+    """Tests only clips recorded but neither analyzed, decided nor skipped are pending"""
+    for clip in ("a", "b", "c", "d"):
+        journal.append(events.RECORDED, clip, path=str(tmp_path.joinpath(f"{clip}.mp4")))
+        journal.append(events.LINK, clip, link=f"https://www.tiktok.com/@{clip}/video/1", phash=7)
+    journal.append(events.ANALYZED, "a", like=True)
+    journal.append(events.SKIPPED, "b", reason="loading")
+    journal.append(events.LIKED, "d", by="preference")
+    journal.append(events.DECIDED, "d", like=True)
+    journal.append(events.SCROLLED)
+    journal.close()
+
+    clips = replay(journal.filepath)
+    assert list(clips) == ["a", "b", "c", "d"]
+    assert [clip.clip for clip in clips.values() if clip.pending] == ["c"]
+    assert clips["d"].liked and not clips["d"].skipped
+    # The analysis said to like "a", but the like was never sent
+    assert [clip.clip for clip in clips.values() if clip.unliked] == ["a"]
+    assert clips["c"].link == "https://www.tiktok.com/@c/video/1"
+    assert clips["c"].phash == 7
+
+
+def test_torn_line(journal, tmp_path):
+    """Tests a line cut short by a crash is ignored and does not swallow the next event"""
+    journal.append(events.RECORDED, "a", path=str(tmp_path.joinpath("a.mp4")))
+    journal.close()
+    with open(journal.filepath, "a") as f:
+        f.write('{"t": 1, "event": "analyzed", "cl')
+
+    with SessionJournal("session_a", root=tmp_path) as reopened:
+        assert [clip.clip for clip in reopened.pending()] == ["a"]
+        reopened.append(events.ANALYZED, "a")
+
+    assert replay(journal.filepath)["a"].analyzed
+    lines = journal.filepath.read_text().splitlines()
+    assert json.loads(lines[-1])["event"] == "analyzed"
+
+
+def test_sync_batching(tmp_path, monkeypatch):
+    """Tests events are synced to disk in batches and on close"""
+    syncs = []
+    monkeypatch.setattr("kronik.store.journal.os.fsync", syncs.append)
+
+    journal = SessionJournal("session_a", root=tmp_path, sync_every=4, sync_seconds=60)
+    for i in range(10):
+        journal.append(events.SCROLLED)
+    assert len(syncs) == 2
+    journal.close()
+    assert len(syncs) == 3
@@ -0,0 +1,113 @@
+import json
+import logging
+import threading
+from importlib import import_module
+from unittest.mock import patch
+
+import pytest
+
+from kronik.logger import (
+    add_json_log,
+    configure_logging,
+    flush_logs,
+    remove_handler,
+    setup_logger,
+)
+
+# `kronik.logger` is shadowed by the app logger attribute on the package
+kronik_logger = import_module("kronik.logger")
+
+
+class RecordingHandler(logging.Handler):
+    """Captures formatted messages and the thread that formatted them"""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        self.threads.append(threading.current_thread().name)
+
+
+class CountingStr:
+    """Records which threads format it"""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread().name)
+        return "value"
+
+
+@pytest.fixture
+def handler():
+    handler = RecordingHandler()
+    kronik_logger._listener.handlers = (*kronik_logger._listener.handlers, handler)
+    yield handler
+    remove_handler(handler)
+
+
+def test_records_written_in_background(handler):
+    """Tests records are formatted and written by the listener thread"""
+    logger = setup_logger("kronik.test.background")
+    logger.info("hello %s", "world")
+    flush_logs()
+
+    assert handler.messages == ["hello world"]
+    assert handler.threads[0] != threading.current_thread().name
+
+
+def test_lazy_formatting(handler):
+    """Tests arguments below the logger level are never formatted"""
+    logger = setup_logger("kronik.test.lazy", level=logging.INFO)
+    value = CountingStr()
+
+    logger.debug("skipped %s", value)
+    flush_logs()
+    assert value.threads == []
+
+    logger.info("kept %s", value)
+    flush_logs()
+    assert value.threads
+    assert threading.current_thread().name not in value.threads
+
+
+def test_module_levels():
+    """Tests per-module levels apply by longest prefix"""
+    with patch.dict(kronik_logger._levels, {"kronik.test": logging.WARNING}, clear=True):
+        kronik_logger._levels["kronik.test.verbose"] = logging.DEBUG
+
+        assert kronik_logger._level_for("kronik.test.quiet") == logging.WARNING
+        assert kronik_logger._level_for("kronik.test.verbose.child") == logging.DEBUG
+        assert kronik_logger._level_for("kronik.other") == kronik_logger._default_level
+
+
+def test_configure_logging_from_env(monkeypatch):
+    """Tests levels are read from the environment and applied to existing loggers"""
+    logger = setup_logger("kronik.test.configured")
+    monkeypatch.setenv("KRONIK_LOG_LEVELS", "kronik.test.configured=ERROR")
+    monkeypatch.setattr(kronik_logger, "_levels", {})
+
+    configure_logging()
+    assert logger.level == logging.ERROR
+
+
+def test_json_log(tmp_path):
+    """Tests JSON lines output with rotation"""
+    fp = tmp_path.joinpath("kronik.jsonl")
+    handler = add_json_log(fp, max_bytes=200, backup_count=2)
+    logger = setup_logger("kronik.test.json")
+    try:
+        for i in range(10):
+            logger.info("message %d", i)
+        flush_logs()
+    finally:
+        remove_handler(handler)
+
+    entries = [json.loads(line) for line in fp.read_text().splitlines()]
+    assert entries[-1]["message"] == "message 9"
+    assert entries[-1]["logger"] == "kronik.test.json"
+    assert tmp_path.joinpath("kronik.jsonl.1").exists()
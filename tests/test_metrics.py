@@ -0,0 +1,87 @@
+import asyncio
+import json
+import time
+import urllib.request
+
+import pytest
+
+from kronik.metrics import Metrics
+
+
+@pytest.fixture
+def metrics():
+    registry = Metrics(enabled=True)
+    yield registry
+    registry.shutdown()
+
+
+def test_span_records(metrics):
+    """Tests spans record one observation per block"""
+    for _ in range(3):
+        with metrics.span("stage"):
+            time.sleep(0.001)
+
+    histogram = metrics.histograms["stage"]
+    assert histogram.count == 3
+    assert histogram.sum >= 0.003
+
+
+def test_disabled_is_noop():
+    """Tests nothing is recorded while disabled"""
+    registry = Metrics(enabled=False)
+
+    @registry.timed("decorated")
+    def work():
+        return 42
+
+    with registry.span("stage"):
+        pass
+
+    assert work() == 42
+    assert registry.histograms == {}
+
+
+def test_timed_async(metrics):
+    """Tests the decorator times coroutines"""
+
+    @metrics.timed("async_stage")
+    async def work():
+        await asyncio.sleep(0.001)
+        return "done"
+
+    assert asyncio.run(work()) == "done"
+    assert metrics.histograms["async_stage"].count == 1
+
+
+def test_render_prometheus(metrics):
+    """Tests the Prometheus exposition has cumulative buckets"""
+    metrics.observe("control.analyze", 0.2)
+    metrics.observe("control.analyze", 3.0)
+
+    text = metrics.render_prometheus()
+    assert "# TYPE kronik_stage_duration_seconds histogram" in text
+    assert 'kronik_stage_duration_seconds_bucket{stage="control.analyze",le="0.25"} 1' in text
+    assert 'kronik_stage_duration_seconds_bucket{stage="control.analyze",le="+Inf"} 2' in text
+    assert 'kronik_stage_duration_seconds_count{stage="control.analyze"} 2' in text
+
+
+def test_serve(metrics):
+    """Tests /metrics is served over HTTP"""
+    metrics.observe("stage", 0.01)
+    server = metrics.serve(0)
+
+    url = f"http://127.0.0.1:{server.server_port}/metrics"
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert b'stage="stage"' in response.read()
+
+
+def test_jsonl(metrics, tmp_path):
+    """Tests observations are appended to the session JSONL file"""
+    fp = tmp_path.joinpath("metrics.jsonl")
+    metrics.open_jsonl(fp)
+    metrics.observe("stage", 0.5)
+    metrics.close_jsonl()
+
+    records = [json.loads(line) for line in fp.read_text().splitlines()]
+    assert records[0]["stage"] == "stage"
+    assert records[0]["seconds"] == 0.5
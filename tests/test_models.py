@@ -0,0 +1,42 @@
+import warnings
+
+import pytest
+from pydantic import ValidationError
+
+from kronik.llm.fake import DEFAULT_ANALYSES
+from kronik.models import TikTokStats, dump_analyses, load_analyses
+
+INFO = {
+    "webpage_url": "https://www.tiktok.com/@tiktok/video/6635480525911887110",
+    "view_count": 10,
+    "thumbnails": [
+        {"id": "dynamicCover", "url": "https://example.com/dynamic.image"},
+        {"id": "originCover", "url": "https://example.com/origin.image"},
+        {"id": "cover", "url": ""},
+    ],
+}
+
+
+def test_thumbnail_priority():
+    """Tests the highest priority thumbnail with a URL is selected"""
+    stats = TikTokStats.from_info(INFO)
+    assert str(stats.thumbnail_url) == "https://example.com/origin.image"
+    assert TikTokStats.from_info({}).thumbnail_url is None
+
+
+def test_from_info_validated():
+    """Tests info dicts are validated, so stats dump without serialization warnings"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        data = TikTokStats.from_info(INFO).model_dump_json()
+    assert TikTokStats.model_validate_json(data).view_count == 10
+
+    with pytest.raises(ValidationError):
+        TikTokStats.from_info({"webpage_url": "not a url"})
+
+
+def test_analyses_roundtrip():
+    """Tests analyses survive a JSON round trip"""
+    data = dump_analyses(DEFAULT_ANALYSES)
+    assert data.startswith(b'[{"transcript"')
+    assert load_analyses(data) == DEFAULT_ANALYSES
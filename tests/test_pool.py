@@ -0,0 +1,153 @@
+import time
+
+import pytest
+
+from kronik import PROJECT_ROOT
+from kronik.device.fake import write_fake_tools
+from kronik.device.pool import DevicePool, DeviceSlot
+from kronik.device.replay import ReplayDriver, ReplaySession
+
+# Nothing listens on the discard port, so Appium's log signals readiness
+UNREACHABLE = "http://127.0.0.1:9"
+
+
+class Sessions:
+    """Opens replay drivers in place of Appium sessions and remembers them"""
+
+    def __init__(self, installed: set[str] | None = None):
+        self.installed = installed
+        self.opened: list[tuple[str, ReplayDriver]] = []
+
+    def __call__(self, slot: DeviceSlot) -> ReplayDriver:
+        driver = ReplayDriver(
+            ReplaySession(recordings=[PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")])
+        )
+        driver.installed_packages = self.installed
+        self.opened.append((slot.serial, driver))
+        return driver
+
+
+@pytest.fixture
+def tools(tmp_path):
+    return write_fake_tools(tmp_path, attach=0.1, boot=0.8, snapshot_boot=0.1, appium_ready=0.2)
+
+
+def make_pool(tools, sessions, boot_timeout=10, **kwargs) -> DevicePool:
+    return DevicePool(
+        appium_url=UNREACHABLE,
+        driver_factory=sessions,
+        boot_timeout=boot_timeout,
+        emulator_path=tools.emulator,
+        adb_path=tools.adb,
+        appium_path=tools.appium,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_snapshot_boot(tools):
+    """Tests the first cold boot saves a snapshot that later pools boot from"""
+    async with make_pool(tools, Sessions()) as pool:
+        cold = pool.stats.boot_seconds[0]
+    assert tools.state.joinpath("snapshot-kronik-warm").exists()
+
+    tools.reset()
+    async with make_pool(tools, Sessions()) as pool:
+        warm = pool.stats.boot_seconds[0]
+    assert cold >= 0.8
+    assert warm < cold / 2
+
+
+@pytest.mark.asyncio
+async def test_boot_overlaps_appium(tmp_path):
+    """Tests the emulator boots while Appium starts, instead of one after the other"""
+    tools = write_fake_tools(tmp_path, attach=0.2, boot=0.4, appium_ready=0.5)
+    start = time.perf_counter()
+    async with make_pool(tools, Sessions(), snapshot=None):
+        elapsed = time.perf_counter() - start
+    assert 0.6 <= elapsed < 0.6 + 0.5
+
+
+@pytest.mark.asyncio
+async def test_start_timeout(tmp_path):
+    """Tests starting fails when Appium never becomes ready, and closing stops the processes"""
+    tools = write_fake_tools(tmp_path, attach=0.1, boot=0.1, appium_ready=None)
+    pool = make_pool(tools, Sessions(), snapshot=None, boot_timeout=1)
+    try:
+        with pytest.raises(TimeoutError):
+            await pool.start()
+    finally:
+        await pool.close()
+    assert pool.slots[0].emulator.returncode is not None
+
+
+@pytest.mark.asyncio
+async def test_leases_reuse_session(tools):
+    """Tests consecutive leases get the same warm session"""
+    sessions = Sessions()
+    async with make_pool(tools, sessions, snapshot=None) as pool:
+        async with pool.lease() as first:
+            pass
+        async with pool.lease() as second:
+            pass
+
+    assert first.driver is second.driver
+    assert len(sessions.opened) == 1
+    assert pool.stats.leases == 2
+    assert pool.slots[0].verified
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_lease_is_recycled(tools):
+    """Tests a device marked unhealthy gets a new session before it is leased again"""
+    sessions = Sessions()
+    async with make_pool(tools, sessions, snapshot=None) as pool:
+        async with pool.lease() as first:
+            first.mark_unhealthy()
+        async with pool.lease(timeout=5) as second:
+            pass
+
+        assert first.driver is not second.driver
+        assert pool.stats.recycles == 1
+        # The emulator was still booted, so only the session was replaced
+        assert pool.stats.boots == 1
+
+
+@pytest.mark.asyncio
+async def test_dead_emulator_is_relaunched(tools):
+    """Tests a failing health check on a dead emulator boots it again"""
+    sessions = Sessions()
+    alive = {"ok": True}
+    pool = make_pool(tools, sessions, snapshot=None, health_check=lambda driver: alive["ok"])
+    async with pool:
+        pool.slots[0].emulator.terminate()
+        await pool.slots[0].emulator.wait()
+        alive["ok"] = False
+
+        async with pool.lease() as lease:
+            alive["ok"] = True
+        assert lease.driver is sessions.opened[-1][1]
+        assert pool.stats.boots == 2
+        assert pool.stats.recycles == 1
+
+
+@pytest.mark.asyncio
+async def test_leases_are_exclusive(tools):
+    """Tests each device is leased to one run at a time"""
+    async with make_pool(tools, Sessions(), size=2, snapshot=None) as pool:
+        async with pool.lease() as first, pool.lease() as second:
+            assert first.slot.serial != second.slot.serial
+            with pytest.raises(TimeoutError):
+                async with pool.lease(timeout=0.1):
+                    pass
+        assert {slot.serial for slot in pool.slots} == {"emulator-5554", "emulator-5556"}
+
+
+@pytest.mark.asyncio
+async def test_missing_app(tools):
+    pool = make_pool(tools, Sessions(installed=set()), snapshot=None)
+    try:
+        with pytest.raises(RuntimeError, match="TikTok"):
+            await pool.start()
+    finally:
+        await pool.close()
@@ -0,0 +1,344 @@
+import json
+import time
+import zipfile
+
+import ffmpeg
+import pytest
+
+from kronik import PROJECT_ROOT
+from kronik.brain.preference import ClipFeatures, PreferenceModel, stored_examples
+from kronik.brain.prescreen import PreScreener
+from kronik.brain.reuse import AnalysisReuse
+from kronik.control import control
+from kronik.control.dwell import DwellController, DwellPolicy
+from kronik.control.tiktok import page_details
+from kronik.device.fake import write_fake_tools
+from kronik.device.replay import DEFAULT_PAGE_SOURCE, ReplayDriver, ReplaySession
+from kronik.device.shell import AdbShell
+from kronik.llm.client import set_client
+from kronik.llm.fake import DEFAULT_ANALYSES, FakeGenAIClient
+from kronik.metrics import metrics
+from kronik.session import Session, save_session_metadata
+from kronik.store import journal as events
+from kronik.store.analytics import read_analyses
+from kronik.store.journal import SessionJournal, replay
+from kronik.store.storage import ARCHIVE_NAME
+
+
+@pytest.fixture
+def replay_session():
+    return ReplaySession(
+        recordings=[PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")],
+        links=["https://www.tiktok.com/@tiktok/video/6635480525911887110"],
+    )
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Write session outputs to a temporary directory"""
+    monkeypatch.setattr("kronik.session.DATA_DIR", tmp_path)
+    monkeypatch.setattr("kronik.store.analytics.ANALYTICS_DIR", tmp_path.joinpath("analytics"))
+    yield tmp_path
+    set_client(None)
+
+
+@pytest.mark.asyncio
+async def test_control_loop_replay(replay_session, data_dir):
+    """Tests the control loop runs end to end against the replay driver and fake LLM"""
+    driver = ReplayDriver(replay_session)
+    llm = FakeGenAIClient()
+    set_client(llm)
+
+    await control(driver, Session(), record_seconds=0, scroll_pause=0, max_iterations=4)
+
+    assert llm.calls == 4
+    assert driver.calls["recording"] == 4
+    assert driver.calls["gesture"] == 4
+    # The canned analyses alternate like/skip, and each like is a double tap
+    assert [analysis.like for analysis in DEFAULT_ANALYSES] == [True, False]
+    assert driver.calls["tap"] == 4
+
+    analyses = list(data_dir.glob("sessions/*/recording_*.json"))
+    assert analyses
+    assert set(json.loads(analyses[0].read_text())) >= {"transcript", "category", "like"}
+
+    rows = read_analyses(data_dir.joinpath("analytics"), columns=["like", "session"])
+    assert rows["like"].to_pylist() == [True, False, True, False]
+
+
+@pytest.mark.asyncio
+async def test_control_loop_llm_errors(replay_session):
+    """Tests LLM errors are survived and do not trigger likes"""
+    driver = ReplayDriver(replay_session)
+    llm = FakeGenAIClient(error_rate=1.0)
+    set_client(llm)
+
+    await control(driver, Session(), record_seconds=0, scroll_pause=0, max_iterations=3)
+
+    assert llm.errors == 3
+    assert driver.calls["tap"] == 0
+    assert driver.calls["gesture"] == 3
+
+
+PAGE_SOURCE = (
+    "<?xml version='1.0' encoding='UTF-8' standalone='yes' ?><hierarchy rotation=\"0\">"
+    '<android.widget.TextView text="@someone" />'
+    '<android.widget.TextView text="Three ways to study for the MCAT #premed" />'
+    '<android.widget.ImageView content-desc="Sound: study beats - someone" />'
+    "</hierarchy>"
+)
+
+
+def test_page_details():
+    """Tests the caption and track are read from the page source"""
+    assert page_details(PAGE_SOURCE) == (
+        "Three ways to study for the MCAT #premed",
+        "study beats - someone",
+    )
+    assert page_details(DEFAULT_PAGE_SOURCE) == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_control_loop_preference(data_dir):
+    """Tests confident preference decisions skip the LLM and are journaled as decided"""
+    # Short links carry no author, so the model has to go by the track
+    replay_session = ReplaySession(
+        recordings=[PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")],
+        page_sources=[PAGE_SOURCE],
+        links=["https://vm.tiktok.com/ZMabc/"],
+    )
+    driver = ReplayDriver(replay_session)
+    llm = FakeGenAIClient()
+    set_client(llm)
+
+    preference = PreferenceModel(min_examples=10, explore_rate=0.0)
+    for i in range(50):
+        preference.observe(ClipFeatures(track="study beats - someone"), True)
+        preference.observe(ClipFeatures(track=f"track {i}"), False)
+
+    session = Session()
+    await control(
+        driver, session, record_seconds=0, scroll_pause=0, max_iterations=3, preference=preference
+    )
+
+    assert llm.calls == 0
+    assert driver.calls["tap"] == 6
+    assert preference.stats.report()["llm_calls_saved"] == 3
+
+    clips = replay(data_dir.joinpath("sessions", session.id, "journal.jsonl"))
+    assert clips
+    assert all(clip.liked and clip.decided and not clip.skipped for clip in clips.values())
+    assert all(clip.track == "study beats - someone" for clip in clips.values())
+
+
+@pytest.mark.asyncio
+async def test_control_loop_stores_features(data_dir):
+    """Tests analyzed clips are stored with the features the preference model trains on"""
+    replay_session = ReplaySession(
+        recordings=[PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")],
+        page_sources=[PAGE_SOURCE],
+        links=["https://www.tiktok.com/@someone/video/1"],
+    )
+    set_client(FakeGenAIClient())
+
+    await control(
+        ReplayDriver(replay_session), Session(), record_seconds=0, scroll_pause=0, max_iterations=2
+    )
+
+    stored = stored_examples(data_dir.joinpath("analytics"))
+    assert [like for _, like in stored] == [True, False]
+    features = stored[0][0]
+    assert features.caption == "Three ways to study for the MCAT #premed"
+    assert features.author == "someone"
+    assert features.track == "study beats - someone"
+    assert features.phash is not None
+
+
+@pytest.mark.asyncio
+async def test_control_loop_reuse(replay_session):
+    """Tests repeated clips reuse the first analysis instead of calling the LLM"""
+    driver = ReplayDriver(replay_session)
+    llm = FakeGenAIClient()
+    set_client(llm)
+    reuse = AnalysisReuse(threshold=0.95, transcriber=lambda fp: "The same trending sound again")
+
+    await control(
+        driver, Session(), record_seconds=0, scroll_pause=0, max_iterations=4, reuse=reuse
+    )
+
+    # One analysis plus one embedding per clip
+    assert llm.calls == 5
+    assert (reuse.hits, reuse.misses) == (3, 1)
+    # Every clip reuses the first, liked analysis
+    assert driver.calls["tap"] == 8
+
+
+@pytest.mark.asyncio
+async def test_control_loop_reuse_errors(replay_session):
+    """Tests clips whose reuse lookup fails are still analyzed by the LLM"""
+    driver = ReplayDriver(replay_session)
+    llm = FakeGenAIClient()
+    set_client(llm)
+
+    def transcriber(fp):
+        raise RuntimeError("No decodable audio")
+
+    reuse = AnalysisReuse(transcriber=transcriber)
+    await control(
+        driver, Session(), record_seconds=0, scroll_pause=0, max_iterations=2, reuse=reuse
+    )
+
+    assert llm.calls == 2
+    assert (reuse.hits, reuse.misses) == (0, 2)
+    assert driver.calls["tap"] == 2
+
+
+@pytest.mark.asyncio
+async def test_control_loop_prescreen(data_dir):
+    """Tests loading screens are scrolled past without an LLM call"""
+    blank_fp = data_dir.joinpath("blank.mp4")
+    (
+        ffmpeg.output(
+            ffmpeg.input("color=black:size=180x320:duration=2", f="lavfi"),
+            str(blank_fp),
+            vcodec="libx264",
+            preset="ultrafast",
+        ).run(capture_stdout=True, capture_stderr=True)
+    )
+    driver = ReplayDriver(ReplaySession(recordings=[blank_fp]))
+    llm = FakeGenAIClient()
+    set_client(llm)
+
+    await control(
+        driver,
+        Session(),
+        record_seconds=0,
+        scroll_pause=0,
+        max_iterations=3,
+        prescreen=PreScreener(),
+    )
+
+    assert llm.calls == 0
+    assert driver.calls["gesture"] == 3
+    assert driver.calls["click"] == 0
+
+
+@pytest.mark.asyncio
+async def test_control_loop_metrics(replay_session):
+    """Tests each control loop stage is timed when metrics are enabled"""
+    driver = ReplayDriver(replay_session)
+    set_client(FakeGenAIClient())
+
+    metrics.enable()
+    try:
+        await control(driver, Session(), record_seconds=0, scroll_pause=0, max_iterations=2)
+    finally:
+        metrics.disable()
+
+    for stage in ("control.iteration", "control.analyze", "brain.generate_content"):
+        assert metrics.histograms[stage].count == 2
+    metrics.reset()
+
+
+def test_fake_embeddings_deterministic():
+    """Tests fake embeddings are stable and unit length"""
+    llm = FakeGenAIClient(embedding_dim=16)
+
+    assert llm.embedding("hello") == llm.embedding("hello")
+    assert llm.embedding("hello") != llm.embedding("world")
+    assert sum(value * value for value in llm.embedding("hello")) == pytest.approx(1.0)
+
+
+def test_replay_session_requires_recordings():
+    with pytest.raises(ValueError):
+        ReplayDriver(ReplaySession(recordings=[]))
+
+
+@pytest.mark.asyncio
+async def test_control_loop_shell(replay_session, tmp_path):
+    """Tests scrolling goes through the adb shell instead of Appium gestures"""
+    tools = write_fake_tools(tmp_path.joinpath("tools"))
+    tools.attach()
+    driver = ReplayDriver(replay_session)
+    set_client(FakeGenAIClient())
+
+    with AdbShell(adb_path=tools.adb) as shell:
+        await control(
+            driver, Session(), record_seconds=0, scroll_pause=0, max_iterations=3, shell=shell
+        )
+
+    assert driver.calls["gesture"] == 0
+    swipes = tools.state.joinpath("input-5554").read_text().splitlines()
+    assert swipes == ["swipe 540 1800 540 600 150"] * 3
+
+
+@pytest.mark.asyncio
+async def test_control_loop_dwell(replay_session):
+    """Tests the dwell controller ends still screens early and scrolls again when stuck"""
+    driver = ReplayDriver(replay_session)
+    set_client(FakeGenAIClient())
+    policy = DwellPolicy(min_seconds=0.05, interval=0.01, settle_seconds=0.05)
+
+    start = time.perf_counter()
+    await control(
+        driver,
+        Session(),
+        max_iterations=2,
+        dwell=DwellController.for_driver(driver, policy),
+    )
+
+    # The replayed screen never changes, so every scroll is tried twice
+    assert driver.calls["gesture"] == 4
+    assert time.perf_counter() - start < 5
+
+
+@pytest.mark.asyncio
+async def test_control_loop_resume(replay_session, data_dir):
+    """Tests a resumed session finishes the analyses a failed run left pending, once each"""
+    driver = ReplayDriver(replay_session)
+    set_client(FakeGenAIClient(error_rate=1.0))
+    session = Session()
+    save_session_metadata(session)
+    await control(driver, session, record_seconds=0, scroll_pause=0, max_iterations=3)
+
+    journal = SessionJournal(session.id)
+    pending = journal.pending()
+    journal.close()
+    # Recordings are named by the second, so fast iterations can share a clip
+    assert len(pending) == len(list(data_dir.glob(f"sessions/{session.id}/recording_*.mp4")))
+    # One analysis was saved right before the crash, but never journaled, and has been packed
+    with zipfile.ZipFile(pending[0].path.parent.joinpath(ARCHIVE_NAME), "w") as zf:
+        zf.writestr(f"{pending[0].clip}.json", DEFAULT_ANALYSES[0].model_dump_json())
+
+    llm = FakeGenAIClient()
+    set_client(llm)
+    resumed = Session.load(session.id)
+    await control(driver, resumed, record_seconds=0, scroll_pause=0, max_iterations=0)
+
+    assert llm.calls == len(pending) - 1
+    assert SessionJournal(session.id).pending() == []
+    rows = read_analyses(data_dir.joinpath("analytics"), columns=["video_id"])
+    assert sorted(rows["video_id"].to_pylist()) == sorted(clip.clip for clip in pending)
+
+
+@pytest.mark.asyncio
+async def test_control_loop_replays_likes(replay_session, monkeypatch):
+    """Tests a like a crashed run decided on but never sent is sent on resume"""
+    monkeypatch.setattr("kronik.control.tiktok.LINK_SETTLE_SECONDS", 0)
+    session = Session()
+    link = "https://www.tiktok.com/@tiktok/video/1"
+    with SessionJournal(session.id) as journal:
+        for clip, clip_link in (("a", link), ("b", None)):
+            journal.append(events.RECORDED, clip, path=f"{clip}.mp4")
+            journal.append(events.LINK, clip, link=clip_link)
+            journal.append(events.ANALYZED, clip, like=True)
+
+    driver = ReplayDriver(replay_session)
+    set_client(FakeGenAIClient())
+    await control(driver, session, record_seconds=0, scroll_pause=0, max_iterations=0)
+
+    assert driver.scripts == [
+        ("mobile: deepLink", ({"url": link, "package": "com.zhiliaoapp.musically"},))
+    ]
+    assert driver.calls["tap"] == 2
+    assert [clip.clip for clip in SessionJournal(session.id).unliked()] == ["b"]
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from kronik.device.fake import write_fake_tools
+from kronik.device.screenrecord import AdbRecorder, SessionRecorder
+from kronik.device.shell import AdbShell
+from kronik.session import Session
+from kronik.utils.av import probe
+
+
+@pytest.fixture
+def shell(tmp_path, monkeypatch):
+    monkeypatch.setattr("kronik.session.DATA_DIR", tmp_path)
+    tools = write_fake_tools(tmp_path.joinpath("tools"))
+    tools.attach()
+    with AdbShell(adb_path=tools.adb) as shell:
+        yield shell
+
+
+@pytest.fixture
+def recorder(shell, tmp_path):
+    return AdbRecorder(
+        shell, segment_seconds=1, remote_dir=str(tmp_path.joinpath("sdcard")), poll_seconds=0.2
+    )
+
+
+def test_segmented_recording(recorder, tmp_path):
+    """Tests finished segments are pulled while recording and joined on stop"""
+    session = Session()
+    filepath = recorder.start_screenrecord(session)
+    assert recorder.start_screenrecord(session) is None
+
+    time.sleep(2.5)
+    assert len(recorder.recording.segments) >= 1
+
+    assert recorder.stop_screenrecord(session, filepath) == filepath
+    assert float(probe(filepath)["format"]["duration"]) >= 2
+    # Nothing is left behind on the device or next to the recording
+    assert list(tmp_path.joinpath("sdcard").iterdir()) == []
+    assert list(filepath.parent.joinpath(".segments").iterdir()) == []
+    assert recorder.stop_screenrecord(session) is None
+
+
+def test_short_recording(recorder):
+    """Tests a recording shorter than a segment is a single file"""
+    session = Session()
+    filepath = recorder.start_screenrecord(session)
+    time.sleep(0.5)
+    recorder.stop_screenrecord(session, filepath)
+
+    assert recorder.recording is None
+    assert 0 < float(probe(filepath)["format"]["duration"]) < 1.5
+
+
+def test_session_recording(shell, tmp_path):
+    """Tests clips are cut from one recording that keeps going, starting where the feed scrolled"""
+    recorder = SessionRecorder(shell)
+    session = Session()
+    recorder.start_screenrecord(session)
+    assert recorder.start_screenrecord(session) is None
+    time.sleep(1.5)
+    first = recorder.stop_screenrecord(session, tmp_path.joinpath("first.mp4"))
+    assert recorder.is_recording
+
+    time.sleep(1)
+    recorder.scrolled()
+    recorder.start_screenrecord(session)
+    time.sleep(1)
+    second = recorder.stop_screenrecord(session, tmp_path.joinpath("second.mp4"))
+
+    assert float(probe(first)["format"]["duration"]) > 0
+    # The second clip skips the second before the scroll and ends at the recorder's latency
+    assert 0.5 < float(probe(second)["format"]["duration"]) < 1.0
+    assert recorder.stop_screenrecord(session) is None
+
+    recorder.close()
+    assert not recorder.is_recording
+    assert not recorder.filepath.exists()
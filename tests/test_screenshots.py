@@ -0,0 +1,61 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from kronik.device.replay import ReplayDriver, ReplaySession
+from kronik.device.screenshots import ScreenshotStore
+from kronik.session import Session
+
+
+def write_png(fp, value: int, size=(1080, 2400)):
+    pixels = np.zeros((size[1], size[0], 4), np.uint8)
+    pixels[..., :3] = np.linspace(0, value, size[0], dtype=np.uint8)[None, :, None]
+    pixels[..., 3] = 255
+    Image.fromarray(pixels, "RGBA").save(fp)
+    return fp
+
+
+@pytest.fixture
+def driver(tmp_path, monkeypatch):
+    monkeypatch.setattr("kronik.session.DATA_DIR", tmp_path)
+    screenshots = [
+        write_png(tmp_path.joinpath(f"{i}.png"), v) for i, v in enumerate((255, 250, 60))
+    ]
+    return ReplayDriver(ReplaySession(recordings=[tmp_path], screenshots=screenshots))
+
+
+def test_capture(driver):
+    """Tests screenshots are returned in memory and saved downscaled"""
+    store = ScreenshotStore(Session())
+    shot = store.capture(driver)
+    fp = shot.saved.result()
+    store.close()
+
+    with Image.open(io.BytesIO(shot.png)) as image:
+        assert image.size == (1080, 2400)
+    assert fp.suffix == ".webp"
+    with Image.open(fp) as image:
+        assert image.size == (324, 720)
+    assert store.stats.bytes_saved == fp.stat().st_size
+
+
+def test_every_nth(driver):
+    store = ScreenshotStore(Session(), format="jpeg", every=2)
+    saved = [store.capture(driver).saved.result() for _ in range(4)]
+    store.close()
+
+    assert [fp is not None for fp in saved] == [True, False, True, False]
+    assert saved[0].suffix == ".jpg"
+
+
+def test_only_changes(driver):
+    """Tests a screenshot close to the last one kept is dropped"""
+    store = ScreenshotStore(Session(), min_change=0.05)
+    saved = [store.capture(driver).saved.result() for _ in range(3)]
+    store.close()
+
+    # The second screenshot differs from the first by a few levels, the third by a lot
+    assert [fp is not None for fp in saved] == [True, False, True]
+    assert store.stats.skipped == 1
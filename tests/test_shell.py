@@ -0,0 +1,75 @@
+import pytest
+
+from kronik.device.fake import write_fake_tools
+from kronik.device.shell import AdbShell, AdbShellError, ShellResult
+
+
+@pytest.fixture
+def tools(tmp_path):
+    tools = write_fake_tools(tmp_path)
+    tools.attach()
+    return tools
+
+
+@pytest.fixture
+def shell(tools):
+    with AdbShell(adb_path=tools.adb, timeout=2) as shell:
+        yield shell
+
+
+def test_run(shell):
+    """Tests output, stderr and exit codes are split per command"""
+    result = shell.run("echo out; echo err >&2; exit_code() { return 3; }; exit_code")
+    assert result.output == "out\nerr"
+    assert result.code == 3
+    assert not result.ok
+
+    # Output without a trailing newline still ends at the marker
+    assert shell.run("printf partial").output == "partial"
+    assert shell.run("true").output == ""
+    assert shell.getprop("sys.boot_completed") == "1"
+    assert shell.is_booted()
+
+
+def test_commands_do_not_read_stdin(shell):
+    """Tests a command reading stdin cannot swallow the next command"""
+    assert shell.run("cat").ok
+    assert shell.run("echo next").output == "next"
+
+
+def test_timeout_reopens(shell):
+    with pytest.raises(AdbShellError):
+        shell.run("sleep 5", timeout=0.2)
+    assert not shell.is_open
+    assert shell.run("echo again").output == "again"
+
+
+def test_input(shell, tools):
+    assert shell.window_size() == (1080, 2400)
+    shell.swipe((540, 1800), (540, 600))
+    shell.tap(10, 20)
+    shell.keyevent(4)
+    assert tools.state.joinpath("input-5554").read_text().splitlines() == [
+        "swipe 540 1800 540 600 150",
+        "tap 10 20",
+        "keyevent 4",
+    ]
+
+
+def test_window_size_unparsable(shell, monkeypatch):
+    """Tests a `wm size` without a size is a shell error, not a crash of the caller"""
+    monkeypatch.setattr(shell, "run", lambda command: ShellResult("Error: no display", 1))
+    with pytest.raises(AdbShellError):
+        shell.window_size()
+
+
+def test_serial(tools):
+    """Tests commands go to the requested device"""
+    with AdbShell("emulator-5556", adb_path=tools.adb) as shell:
+        with pytest.raises(AdbShellError):
+            shell.run("true", timeout=1)
+
+    tools.attach(5556)
+    with AdbShell("emulator-5556", adb_path=tools.adb) as shell:
+        shell.tap(1, 2)
+    assert tools.state.joinpath("input-5556").read_text() == "tap 1 2\n"
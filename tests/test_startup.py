@@ -0,0 +1,32 @@
+import pytest
+
+from kronik.device.fake import write_fake_tools
+from kronik.device.startup import is_emulator_booted, wait_for_appium
+
+# Nothing listens on the discard port, so the status probe always fails
+UNREACHABLE = "http://127.0.0.1:9"
+
+
+@pytest.mark.asyncio
+async def test_is_emulator_booted(tmp_path):
+    tools = write_fake_tools(tmp_path)
+    assert not await is_emulator_booted(tools.adb)
+    assert not await is_emulator_booted(str(tmp_path.joinpath("missing")))
+
+    tools.attach(booted=False)
+    assert not await is_emulator_booted(tools.adb)
+    tools.attach()
+    assert await is_emulator_booted(tools.adb)
+    assert await is_emulator_booted(tools.adb, serial="emulator-5554")
+    assert not await is_emulator_booted(tools.adb, serial="emulator-5556")
+
+
+@pytest.mark.asyncio
+async def test_wait_for_appium_probe(monkeypatch):
+    """Tests the status probe alone is enough to detect a running server"""
+    probes = []
+    monkeypatch.setattr(
+        "kronik.device.startup._appium_status_ok", lambda url: probes.append(url) or len(probes) > 2
+    )
+    await wait_for_appium(UNREACHABLE, interval=0.01)
+    assert probes == [UNREACHABLE] * 3
@@ -0,0 +1,122 @@
+import os
+import shutil
+import time
+import zipfile
+
+import pytest
+
+from kronik import PROJECT_ROOT
+from kronik.store.journal import ANALYZED, RECORDED, SessionJournal
+from kronik.store.storage import (
+    ARCHIVE_NAME,
+    StorageManager,
+    StoragePolicy,
+    is_proxy,
+    read_packed,
+)
+
+HOUR = 3600.0
+
+
+def write(fp, size: int = 1024, age: float = HOUR):
+    fp.parent.mkdir(parents=True, exist_ok=True)
+    fp.write_bytes(os.urandom(size) if size else b"{}")
+    mtime = time.time() - age
+    os.utime(fp, (mtime, mtime))
+    return fp
+
+
+def policy(**kwargs) -> StoragePolicy:
+    defaults = dict(total_budget=None, session_budget=None, grace_seconds=60, proxy_after=None)
+    return StoragePolicy(**(defaults | kwargs))
+
+
+def test_derived_and_pack(tmp_path):
+    """Tests analyzed audio and screenshots are deleted and small JSON files packed"""
+    session = tmp_path.joinpath("session_a")
+    write(session.joinpath("recording_1.mp4"))
+    write(session.joinpath("recording_1.mp3"))
+    write(session.joinpath("recording_1.json"), 0)
+    write(session.joinpath("recording_2.mp3"))
+    write(session.joinpath("screenshot_1.webp"))
+    write(session.joinpath("metadata.json"), 0)
+    # Still being written
+    write(session.joinpath("screenshot_2.webp"), age=0)
+
+    manager = StorageManager(tmp_path, policy())
+    assert manager.run_once() == 2
+    assert manager.stats.steps == {"derived": 1, "pack": 1}
+
+    names = sorted(fp.name for fp in session.iterdir())
+    assert names == [
+        ARCHIVE_NAME,
+        "metadata.json",
+        "recording_1.mp4",
+        "recording_2.mp3",
+        "screenshot_2.webp",
+    ]
+    assert read_packed(session, "recording_1.json") == "{}"
+    assert read_packed(session, "metadata.json") == "{}"
+
+    # Packing again keeps what was packed before
+    write(session.joinpath("recording_2.json"), 0)
+    assert manager.run_once() == 2
+    with zipfile.ZipFile(session.joinpath(ARCHIVE_NAME)) as zf:
+        assert sorted(zf.namelist()) == ["recording_1.json", "recording_2.json"]
+    assert not session.joinpath("recording_2.mp3").exists()
+
+
+def test_budgets(tmp_path):
+    """Tests the oldest media goes first, and recent files are kept even over budget"""
+    for i, age in enumerate((3, 2, 1)):
+        write(tmp_path.joinpath("session_a", f"recording_{i}.mp4"), 1000, age * HOUR)
+    write(tmp_path.joinpath("session_b", "recording_0.mp4"), 1000, 0.5 * HOUR)
+    write(tmp_path.joinpath("session_b", "recording_1.mp4"), 1000, age=0)
+
+    manager = StorageManager(tmp_path, policy(total_budget=3500, session_budget=2000))
+    manager.run_once()
+
+    assert sorted(fp.name for fp in tmp_path.joinpath("session_a").iterdir()) == ["recording_2.mp4"]
+    assert len(list(tmp_path.joinpath("session_b").iterdir())) == 2
+    assert manager.stats.bytes_freed == 2000
+
+    # Only files inside the grace period are left, so nothing else can be freed
+    manager.policy.total_budget = 1000
+    manager.run_once()
+    assert [fp.name for fp in tmp_path.joinpath("session_b").iterdir()] == ["recording_1.mp4"]
+
+
+def test_pending_clips_kept(tmp_path):
+    """Tests recordings a crashed session has not analyzed yet are kept over budget"""
+    session = tmp_path.joinpath("session_a")
+    for i, age in enumerate((3, 2, 1)):
+        write(session.joinpath(f"recording_{i}.mp4"), 1000, age * HOUR)
+    with SessionJournal("session_a", root=session) as journal:
+        for i in range(3):
+            journal.append(RECORDED, f"recording_{i}", path=str(session / f"recording_{i}.mp4"))
+        journal.append(ANALYZED, "recording_1", like=False)
+
+    manager = StorageManager(tmp_path, policy(total_budget=1000, session_budget=1000))
+    manager.run_once()
+
+    assert sorted(fp.suffix for fp in session.iterdir()) == [".jsonl", ".mp4", ".mp4"]
+    assert not session.joinpath("recording_1.mp4").exists()
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="ffmpeg not installed")
+def test_proxy(tmp_path):
+    """Tests old recordings are re-encoded once, smaller and tagged"""
+    source = PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")
+    video_fp = tmp_path.joinpath("session_a", "recording_1.mp4")
+    video_fp.parent.mkdir()
+    shutil.copy(source, video_fp)
+    mtime = time.time() - 2 * HOUR
+    os.utime(video_fp, (mtime, mtime))
+
+    manager = StorageManager(tmp_path, policy(proxy_after=HOUR, proxy_height=240, proxy_crf=40))
+    assert manager.step() == "proxy"
+    assert manager.step() is None
+
+    assert is_proxy(video_fp)
+    assert video_fp.stat().st_size < source.stat().st_size
+    assert video_fp.stat().st_mtime == pytest.approx(mtime)
@@ -23,7 +23,9 @@ class TestTikTokDownloader:
         self.test_dir = self.TEST_DATA_DIR
         self.test_dir.mkdir(parents=True, exist_ok=True)
 
-        config = DownloadConfig(save_dir=self.test_dir, use_chrome_cookies=False, logs=True)
+        config = DownloadConfig(
+            save_dir=self.test_dir, use_chrome_cookies=False, logs=True, backoff_base=0
+        )
         self.downloader = TikTokDownloader(config)
 
         yield
@@ -53,12 +55,52 @@ class TestTikTokDownloader:
         assert path.name.startswith("test_video")
         assert path.suffix == ".mp4"
 
+    def _write_video(self, url: str, data: bytes = b"video") -> Path:
+        """Simulates yt-dlp writing the completed file"""
+        output_path = self.downloader._get_output_path(url)
+        output_path.write_bytes(data)
+        return output_path
+
+    def test_ydl_options_resume(self):
+        """Tests yt-dlp is configured to resume .part files with backoff"""
+        options = self.downloader._get_ydl_options(self.test_dir / "video.mp4")
+
+        assert options["continuedl"] is True
+        assert options["nopart"] is False
+        assert options["retries"] == self.downloader.config.retries
+        assert options["extractor_retries"] == self.downloader.config.retries
+        assert {"http", "extractor"} <= set(options["retry_sleep_functions"])
+
+    def test_backoff(self):
+        """Tests exponential backoff is capped"""
+        config = DownloadConfig(save_dir=self.test_dir, backoff_base=1.0, backoff_max=5.0)
+        downloader = TikTokDownloader(config)
+
+        assert [downloader._backoff(attempt) for attempt in range(5)] == [1, 2, 4, 5, 5]
+
+    @patch("yt_dlp.utils._utils.time.sleep")
+    def test_backoff_called_by_ytdlp(self, sleep):
+        """Tests yt-dlp can call the backoff functions the way it does between retries"""
+        from yt_dlp.utils import RetryManager
+
+        config = DownloadConfig(save_dir=self.test_dir, backoff_base=1.0, backoff_max=5.0)
+        options = TikTokDownloader(config)._get_ydl_options(self.test_dir / "video.mp4")
+
+        for kind in ("http", "fragment"):
+            sleep_func = options["retry_sleep_functions"][kind]
+            for count in range(1, 4):
+                RetryManager.report_retry(
+                    Exception("reset"), count, 3, sleep_func=sleep_func, info=print, warn=print
+                )
+        assert [call.args[0] for call in sleep.call_args_list] == [1.0, 2.0, 4.0] * 2
+
     @pytest.mark.asyncio
     @patch("yt_dlp.YoutubeDL")
     async def test_successful_download(self, mock_ytdl):
         """Tests successful video download"""
         mock_instance = MagicMock()
         mock_ytdl.return_value.__enter__.return_value = mock_instance
+        self._write_video(self.TEST_URL)
 
         # Mock the extract_info response with required fields
         mock_instance.extract_info.return_value = {
@@ -84,6 +126,82 @@ class TestTikTokDownloader:
         assert result is not None
         path, stats = result
         assert isinstance(path, Path)
+        assert self.downloader._verify_checksum(path)
+        assert self.downloader._checksum_path(path).exists()
+
+    @pytest.mark.asyncio
+    @patch("yt_dlp.YoutubeDL")
+    async def test_download_retry(self, mock_ytdl):
+        """Tests unexpected errors are not retried, but bad files are"""
+        mock_instance = MagicMock()
+        mock_ytdl.return_value.__enter__.return_value = mock_instance
+        mock_instance.extract_info.side_effect = Exception("Unexpected")
+
+        assert await self.downloader.download(self.TEST_URL) is None
+        assert mock_instance.extract_info.call_count == 1
+
+        # The first file is truncated, the second one is complete
+        def write(url, download):
+            self._write_video(url, b"video" * mock_instance.extract_info.call_count)
+            return {"webpage_url": url, "filesize": 10}
+
+        mock_instance.extract_info.side_effect = write
+        mock_instance.extract_info.reset_mock()
+        result = await self.downloader.download(self.TEST_URL)
+        assert result is not None
+        assert mock_instance.extract_info.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch("kronik.utils.tiktok_downloader.asyncio.sleep")
+    @patch("yt_dlp.YoutubeDL")
+    async def test_download_error_retried(self, mock_ytdl, mock_sleep):
+        """Tests a failed webpage fetch, which yt-dlp does not retry, is retried after a backoff"""
+        from yt_dlp.utils import DownloadError
+
+        mock_instance = MagicMock()
+        mock_ytdl.return_value.__enter__.return_value = mock_instance
+        error = DownloadError("Unable to download webpage: HTTP Error 429: Too Many Requests")
+
+        def fail_once(url, download):
+            if mock_instance.extract_info.call_count == 1:
+                raise error
+            self._write_video(url)
+            return {"webpage_url": url}
+
+        mock_instance.extract_info.side_effect = fail_once
+        assert await self.downloader.download(self.TEST_URL) is not None
+        assert mock_instance.extract_info.call_count == 2
+        mock_sleep.assert_awaited_once_with(self.downloader._backoff(0))
+
+        # Only once
+        mock_instance.extract_info.side_effect = error
+        mock_instance.extract_info.reset_mock()
+        assert await self.downloader.download(self.TEST_URL + "1") is None
+        assert mock_instance.extract_info.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch("yt_dlp.YoutubeDL")
+    async def test_download_size_mismatch(self, mock_ytdl):
+        """Tests a download with the wrong size is discarded"""
+        mock_instance = MagicMock()
+        mock_ytdl.return_value.__enter__.return_value = mock_instance
+        mock_instance.extract_info.return_value = {"webpage_url": self.TEST_URL, "filesize": 100}
+        output_path = self._write_video(self.TEST_URL)
+
+        result = await self.downloader.download(self.TEST_URL)
+        assert result is None
+        assert not output_path.exists()
+
+    @pytest.mark.asyncio
+    @patch("yt_dlp.YoutubeDL")
+    async def test_corrupt_file_discarded(self, mock_ytdl):
+        """Tests a completed file that no longer matches its checksum is re-downloaded"""
+        output_path = self._write_video(self.TEST_URL)
+        self.downloader._checksum_path(output_path).write_text("0" * 64)
+        mock_ytdl.return_value.__enter__.return_value.extract_info.return_value = {}
+
+        await self.downloader.download(self.TEST_URL)
+        assert not output_path.exists()
 
     @pytest.mark.asyncio
     @patch("yt_dlp.YoutubeDL")
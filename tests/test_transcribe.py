@@ -1,7 +1,50 @@
+import os
 import unittest
+from unittest.mock import patch
+
+import numpy as np
 
 from kronik import PROJECT_ROOT
 from kronik.utils import transcribe
+from kronik.utils.transcribe import (
+    TranscriptionBackend,
+    TransformersWhisperBackend,
+    _get_backend,
+    default_backend_name,
+    get_backend,
+    register_backend,
+    transcribe_video,
+)
+from kronik.utils.transcription_worker import TranscriptionWorker
+
+
+class StubBackend(TranscriptionBackend):
+    """Backend that reports the clip length instead of running a model"""
+
+    name = "stub"
+    default_model = "stub-model"
+    loads = 0
+
+    def _load(self):
+        StubBackend.loads += 1
+
+    def _transcribe(self, audio):
+        if len(audio) == 0:
+            raise ValueError("Empty clip")
+        return f"{len(audio)} samples"
+
+
+class CrashingBackend(StubBackend):
+    """Backend whose process dies, while loading or on its first clip"""
+
+    name = "crashing"
+
+    def _load(self):
+        if self.model == "load":
+            os._exit(3)
+
+    def _transcribe(self, audio):
+        os._exit(4)
 
 
 class TestTranscribe(unittest.TestCase):
@@ -21,3 +64,90 @@ class TestTranscribe(unittest.TestCase):
             delta=100,
             msg="Transcription length should be roughly 2305 (±100) characters",
         )
+
+
+class TestTranscriptionBackend(unittest.TestCase):
+    def setUp(self):
+        register_backend(StubBackend)
+        _get_backend.cache_clear()
+        StubBackend.loads = 0
+
+    def test_backend_selected_by_config(self):
+        with patch.dict(os.environ, {"KRONIK_TRANSCRIBE_BACKEND": "stub"}):
+            self.assertEqual(default_backend_name(), "stub")
+            self.assertIsInstance(get_backend(), StubBackend)
+
+    def test_backend_loaded_once(self):
+        backend = get_backend("stub")
+        self.assertIs(get_backend("stub"), backend)
+
+        transcribe(np.zeros(16000, np.float32), backend=backend)
+        transcribe(np.zeros(8000, np.float32), backend=backend)
+        self.assertEqual(StubBackend.loads, 1)
+
+    def test_transcribe_buffer(self):
+        text = transcribe(np.zeros(16000, np.float32), backend=get_backend("stub"))
+        self.assertEqual(text, "16000 samples")
+
+    def test_transcribe_video(self):
+        video_fp = PROJECT_ROOT.joinpath("tests", "data", "tiktok-1.mp4")
+        text = transcribe_video(video_fp, backend=get_backend("stub"))
+        self.assertTrue(text.endswith("samples"))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_backend("unknown")
+
+    def test_transformers_backend_tiny_model(self):
+        try:
+            import torch  # noqa: F401
+            import transformers  # noqa: F401
+        except ImportError:
+            self.skipTest("transformers and torch are not installed")
+
+        backend = TransformersWhisperBackend("openai/whisper-tiny")
+        text = backend.transcribe(np.zeros(16000, np.float32))
+        self.assertIsInstance(text, str)
+
+
+class TestTranscriptionWorker(unittest.TestCase):
+    def test_submit_batch(self):
+        audios = [np.zeros(n, np.float32) for n in (16000, 8000, 4000)]
+
+        with TranscriptionWorker(backend=StubBackend, max_batch_size=2) as worker:
+            futures = worker.submit_batch(audios)
+            texts = [future.result(timeout=30) for future in futures]
+            metrics = worker.metrics.snapshot()
+
+        self.assertEqual(texts, ["16000 samples", "8000 samples", "4000 samples"])
+        self.assertEqual(metrics["clips"], 3)
+        self.assertGreaterEqual(metrics["batches"], 2)
+        self.assertGreater(metrics["latency_p50"], 0)
+
+    def test_submit_error(self):
+        with TranscriptionWorker(backend=StubBackend) as worker:
+            future = worker.submit(np.zeros(0, np.float32))
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=30)
+            self.assertEqual(
+                worker.submit(np.zeros(10, np.float32)).result(timeout=30), "10 samples"
+            )
+
+    def test_start_failure(self):
+        worker = TranscriptionWorker(backend="unknown")
+        with self.assertRaises(RuntimeError):
+            worker.start(timeout=30)
+
+    def test_worker_exits(self):
+        """Tests a worker that dies fails its start or its outstanding futures instead of hanging"""
+        worker = TranscriptionWorker(backend=CrashingBackend, model="load")
+        with self.assertRaisesRegex(RuntimeError, "exited while starting"):
+            worker.start(timeout=30)
+
+        with TranscriptionWorker(backend=CrashingBackend) as worker:
+            futures = worker.submit_batch([np.zeros(10, np.float32)] * 3)
+            for future in futures:
+                with self.assertRaisesRegex(RuntimeError, "exited"):
+                    future.result(timeout=30)
+            with self.assertRaises(RuntimeError):
+                worker.submit(np.zeros(10, np.float32))